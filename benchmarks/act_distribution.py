@@ -0,0 +1,87 @@
+#  Copyright (c). All Rights Reserved.
+#  General Optimal control Problem Solver (GOPS)
+#  Intelligent Driving Lab (iDLab), Tsinghua University
+#
+#  Creator: iDLab
+#  Lab Leader: Prof. Shengbo Eben Li
+#  Email: lisb04@gmail.com
+#
+#  Description: microbenchmark of fused and torch.distributions based gauss distributions
+#  Update: 2026-10-19, iDLab: create action distribution benchmark
+
+
+import argparse
+import timeit
+
+import numpy as np
+import torch
+
+from gops.apprfunc.mlp import StochaPolicy
+from gops.utils.act_distribution_type import (
+    GaussDistribution,
+    TanhGaussDistribution,
+    TorchGaussDistribution,
+    TorchTanhGaussDistribution,
+)
+
+
+def create_policy(dist_cls, obs_dim, act_dim):
+    return StochaPolicy(
+        obs_dim=obs_dim,
+        act_dim=act_dim,
+        hidden_sizes=[64],
+        hidden_activation="relu",
+        output_activation="linear",
+        act_high_lim=np.ones(act_dim, dtype=np.float32),
+        act_low_lim=-np.ones(act_dim, dtype=np.float32),
+        min_log_std=-20,
+        max_log_std=2,
+        std_type="mlp_shared",
+        action_distribution_cls=dist_cls,
+    )
+
+
+def sample(policy, obs):
+    with torch.no_grad():
+        return policy.get_act_dist(policy(obs)).sample()
+
+
+def rsample_backward(policy, obs):
+    policy.zero_grad()
+    action, log_prob = policy.get_act_dist(policy(obs)).rsample()
+    ((action ** 2).sum() + log_prob.sum()).backward()
+
+
+def run(batch_sizes, obs_dim, act_dim, number, repeat):
+    classes = [
+        ("TanhGauss torch", TorchTanhGaussDistribution),
+        ("TanhGauss fused", TanhGaussDistribution),
+        ("Gauss torch", TorchGaussDistribution),
+        ("Gauss fused", GaussDistribution),
+    ]
+    print("{:8s}{:20s}{:>20s}{:>22s}".format("", "", "sample (no grad)", "rsample + backward"))
+    for batch_size in batch_sizes:
+        obs = torch.randn(batch_size, obs_dim)
+        for i, (name, dist_cls) in enumerate(classes):
+            policy = create_policy(dist_cls, obs_dim, act_dim)
+            times = [
+                min(timeit.repeat(lambda: fn(policy, obs), number=number, repeat=repeat))
+                / number
+                * 1e6
+                for fn in (sample, rsample_backward)
+            ]
+            prefix = "B={}".format(batch_size) if i == 0 else ""
+            print("{:8s}{:20s}{:>17.0f} us{:>19.0f} us".format(prefix, name, *times))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 256])
+    parser.add_argument("--obs_dim", type=int, default=8)
+    parser.add_argument("--act_dim", type=int, default=6)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--num_threads", type=int, default=1)
+    args = parser.parse_args()
+    torch.set_num_threads(args.num_threads)
+    run(args.batch_sizes, args.obs_dim, args.act_dim, args.number, args.repeat)
@@ -9,6 +9,8 @@
 #  Description: base class for algorithms
 #  Update: 2022-12-03, Wenxuan Wang: create bass class for algorithms
 #  Update: 2023-08-28, Guojian Zhan: support lr schedule
+#  Update: 2026-10-19, iDLab: support mixed precision training
+#  Update: 2026-10-19, iDLab: check training of recurrent policies
 
 
 from abc import ABCMeta, ABC, abstractmethod
@@ -18,6 +20,7 @@ from typing import Tuple, Type
 from gops.utils.common_utils import set_seed
 from gops.create_pkg.create_apprfunc import create_apprfunc
 from gops.utils.common_utils import get_apprfunc_dict
+from gops.utils.mixed_precision import MixedPrecision
 import torch
 
 
@@ -53,12 +56,28 @@ class AlgorithmBase(metaclass=ABCMeta):
 
     Args:
         int     index       : used for calculating offset of random seed for subprocess.
+        str     amp         : mixed precision type of loss computation, "bf16", "fp16" or None.
+                              fp16 gradients are scaled, so it is only supported by serial trainers.
     """
-    
+
+    # whether policy is trained on chunks of sequence_replay_buffer from hidden state
+    # warmed up on burn-in steps, which recurrent execution of rnn policies requires
+    sequence_training = False
 
     def __init__(self, index, **kwargs):
         self.networks = None
         set_seed(kwargs["trainer"], kwargs["seed"], index + 300)
+        amp = kwargs.get("amp", None)
+        if amp == "fp16":
+            assert "serial" in kwargs["trainer"], "fp16 is only supported by serial trainers."
+        self.amp = MixedPrecision(amp, "cuda" if kwargs.get("use_gpu", False) else "cpu")
+        if kwargs.get("policy_recurrent", False):
+            # hidden state carried over an episode does not match a policy trained on
+            # observation windows from zero hidden state
+            assert (
+                self.sequence_training
+                and kwargs.get("buffer_name") == "sequence_replay_buffer"
+            ), "Recurrent policy execution requires training on sequence_replay_buffer."
 
     @property
     @abstractmethod
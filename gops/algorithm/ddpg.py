@@ -12,6 +12,8 @@
 #             ICLR(2016)，San Juan, Puerto Rico. 
 #  Update: 2020-11-03, Hao Sun: create ddpg
 #  Update: 2022-12-03, Yujie Yang: rewrite ddpg class
+#  Update: 2026-10-19, iDLab: mixed precision training
+#  Update: 2026-10-19, iDLab: sequence training of rnn policies
 
 __all__ = ["ApproxContainer", "DDPG"]
 
@@ -74,8 +76,15 @@ class DDPG(AlgorithmBase):
         float   tau         : param for soft update of target network. Default to 0.005.
         int     delay_update: delay update steps for actor. Default to 1.
         string  buffer_name : buffer type. Default to 'replay_buffer'.
+
+    With 'sequence_replay_buffer', policy must be an rnn policy and is trained on
+    chunks of trajectories: hidden state is warmed up on the ``buffer_burn_in`` steps
+    of a chunk, and losses are averaged over the remaining steps where ``mask`` is 1.
+    Action value is evaluated at every step on its own, so it must not be an rnn.
     """
 
+    sequence_training = True
+
     def __init__(
         self, 
         index: int = 0, 
@@ -85,12 +94,18 @@ class DDPG(AlgorithmBase):
         buffer_name: str = "replay_buffer", 
         **kwargs
     ):
-        super().__init__(index, **kwargs)
+        super().__init__(index, buffer_name=buffer_name, **kwargs)
         self.networks = ApproxContainer(**kwargs)
         self.gamma = gamma
         self.tau = tau
         self.delay_update = delay_update
         self.per_flag = buffer_name == "prioritized_replay_buffer"
+        self.sequence_flag = buffer_name == "sequence_replay_buffer"
+        self.burn_in = kwargs.get("buffer_burn_in", 0)
+        if self.sequence_flag:
+            assert hasattr(
+                self.networks.policy, "forward_sequence"
+            ), "Sequence training requires an rnn policy."
 
     @property
     def adjustable_parameters(self):
@@ -105,7 +120,19 @@ class DDPG(AlgorithmBase):
         start_time = time.perf_counter()
 
         self.networks.q_optimizer.zero_grad()
-        if not self.per_flag:
+        if self.sequence_flag:
+            o, a, r, o2, d, mask = (
+                data["obs"],
+                data["act"],
+                data["rew"],
+                data["obs2"],
+                data["done"],
+                data["mask"],
+            )
+            with self.amp.autocast():
+                loss_q, q = self._compute_loss_q_seq(o, a, r, o2, d, mask)
+            self.amp.backward(loss_q)
+        elif not self.per_flag:
             o, a, r, o2, d = (
                 data["obs"],
                 data["act"],
@@ -113,8 +140,9 @@ class DDPG(AlgorithmBase):
                 data["obs2"],
                 data["done"],
             )
-            loss_q, q = self._compute_loss_q(o, a, r, o2, d)
-            loss_q.backward()
+            with self.amp.autocast():
+                loss_q, q = self._compute_loss_q(o, a, r, o2, d)
+            self.amp.backward(loss_q)
         else:
             o, a, r, o2, d, idx, weight = (
                 data["obs"],
@@ -125,15 +153,20 @@ class DDPG(AlgorithmBase):
                 data["idx"],
                 data["weight"],
             )
-            loss_q, q, abs_err = self._compute_loss_q_per(o, a, r, o2, d, idx, weight)
-            loss_q.backward()
+            with self.amp.autocast():
+                loss_q, q, abs_err = self._compute_loss_q_per(o, a, r, o2, d, idx, weight)
+            self.amp.backward(loss_q)
 
         for p in self.networks.q.parameters():
             p.requires_grad = False
 
         self.networks.policy_optimizer.zero_grad()
-        loss_policy = self._compute_loss_policy(o)
-        loss_policy.backward()
+        with self.amp.autocast():
+            if self.sequence_flag:
+                loss_policy = self._compute_loss_policy_seq(o, mask)
+            else:
+                loss_policy = self._compute_loss_policy(o)
+        self.amp.backward(loss_policy)
 
         for p in self.networks.q.parameters():
             p.requires_grad = True
@@ -175,17 +208,52 @@ class DDPG(AlgorithmBase):
         abs_err = torch.abs(q - backup)
         return loss_q, torch.mean(q), abs_err
 
+    def _compute_loss_q_seq(self, o, a, r, o2, d, mask):
+        # Data are chunks [B, burn_in + seq_len, ...], losses are computed on steps
+        # after burn-in, before the end of the first episode of chunk
+        b = self.burn_in
+        mask = mask[:, b:]
+
+        # Q-values
+        q = self.networks.q(o[:, b:], a[:, b:])
+
+        # Target actions at next observations, with hidden state carried over the
+        # chunk, next observation of a step being observation of its next step
+        act_targ, _ = self.networks.policy_target.forward_sequence(
+            torch.cat((o[:, :1], o2), dim=1)
+        )
+        q_policy_targ = self.networks.q_target(o2[:, b:], act_targ[:, b + 1 :])
+        backup = r[:, b:] + self.gamma * (1 - d[:, b:]) * q_policy_targ
+
+        # masked MSE loss against Bellman backup
+        num = mask.sum().clamp(min=1)
+        loss_q = (mask * (q - backup) ** 2).sum() / num
+        return loss_q, (mask * q).sum() / num
+
     def _compute_loss_policy(self, o):
         q_policy = self.networks.q(o, self.networks.policy(o))
         return -q_policy.mean()
 
+    def _compute_loss_policy_seq(self, o, mask):
+        b = self.burn_in
+        mask = mask[:, b:]
+        # warm up hidden state on burn-in steps without gradient
+        hidden = None
+        if b > 0:
+            with torch.no_grad():
+                _, hidden = self.networks.policy.forward_sequence(o[:, :b])
+        act, _ = self.networks.policy.forward_sequence(o[:, b:], hidden)
+        q_policy = self.networks.q(o[:, b:], act)
+        return -(mask * q_policy).sum() / mask.sum().clamp(min=1)
+
     def _update(self, iteration):
         polyak = 1 - self.tau
         delay_update = self.delay_update
 
-        self.networks.q_optimizer.step()
+        self.amp.step(self.networks.q_optimizer)
         if iteration % delay_update == 0:
-            self.networks.policy_optimizer.step()
+            self.amp.step(self.networks.policy_optimizer)
+        self.amp.update()
 
         with torch.no_grad():
             for p, p_targ in zip(
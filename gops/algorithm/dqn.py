@@ -11,6 +11,7 @@
 #            Human-level control through deep reinforcement learning. 
 #            Nature 518: 529-533. 
 #  Update: 2021-03-05, Wenxuan Wang: create DQN algorithm
+#  Update: 2026-10-19, iDLab: mixed precision training
 
 
 __all__ = ["ApproxContainer", "DQN"]
@@ -110,8 +111,9 @@ class DQN(AlgorithmBase):
                 data["obs2"],
                 data["done"],
             )
-            loss_q = self._compute_loss_q(o, a, r, o2, d)
-            loss_q.backward()
+            with self.amp.autocast():
+                loss_q = self._compute_loss_q(o, a, r, o2, d)
+            self.amp.backward(loss_q)
         # compute gradient with priority
         else:
             o, a, r, o2, d, idx, weight = (
@@ -123,8 +125,9 @@ class DQN(AlgorithmBase):
                 data["idx"],
                 data["weight"],
             )
-            loss_q, abs_err = self._compute_loss_per(o, a, r, o2, d, idx, weight)
-            loss_q.backward()
+            with self.amp.autocast():
+                loss_q, abs_err = self._compute_loss_per(o, a, r, o2, d, idx, weight)
+            self.amp.backward(loss_q)
 
         end_time = time.perf_counter()
 
@@ -161,7 +164,8 @@ class DQN(AlgorithmBase):
     def _update(self, iteration):
         polyak = 1 - self.tau
 
-        self.networks.q_optimizer.step()
+        self.amp.step(self.networks.q_optimizer)
+        self.amp.update()
 
         with torch.no_grad():
             for p, p_targ in zip(
@@ -13,6 +13,7 @@
 #             IEEE Transactions on Neural Network and Learning Systems 33(11): 6584-6598.
 #  Update: 2021-03-05, Ziqing Gu: create DSAC algorithm
 #  Update: 2021-03-05, Wenxuan Wang: debug DSAC algorithm
+#  Update: 2026-10-19, iDLab: mixed precision training
 
 __all__ = ["ApproxContainer", "DSAC"]
 
@@ -166,24 +167,27 @@ class DSAC(AlgorithmBase):
         start_time = time.time()
 
         obs = data["obs"]
-        logits = self.networks.policy(obs)
-        policy_mean = torch.tanh(logits[..., 0]).mean().item()
-        policy_std = logits[..., 1].mean().item()
+        with self.amp.autocast():
+            logits = self.networks.policy(obs)
+            policy_mean = torch.tanh(logits[..., 0]).mean().item()
+            policy_std = logits[..., 1].mean().item()
 
-        act_dist = self.networks.create_action_distributions(logits)
-        new_act, new_log_prob = act_dist.rsample()
+            act_dist = self.networks.create_action_distributions(logits)
+            new_act, new_log_prob = act_dist.rsample()
         data.update({"new_act": new_act, "new_log_prob": new_log_prob})
 
         self.networks.q_optimizer.zero_grad()
-        loss_q, q, std = self._compute_loss_q(data)
-        loss_q.backward()
+        with self.amp.autocast():
+            loss_q, q, std = self._compute_loss_q(data)
+        self.amp.backward(loss_q)
 
         for p in self.networks.q.parameters():
             p.requires_grad = False
 
         self.networks.policy_optimizer.zero_grad()
-        loss_policy, entropy = self._compute_loss_policy(data)
-        loss_policy.backward()
+        with self.amp.autocast():
+            loss_policy, entropy = self._compute_loss_policy(data)
+        self.amp.backward(loss_policy)
 
         for p in self.networks.q.parameters():
             p.requires_grad = True
@@ -191,7 +195,7 @@ class DSAC(AlgorithmBase):
         if self.auto_alpha:
             self.networks.alpha_optimizer.zero_grad()
             loss_alpha = self._compute_loss_alpha(data)
-            loss_alpha.backward()
+            self.amp.backward(loss_alpha)
 
         tb_info = {
             "DSAC/critic_avg_q-RL iter": q.item(),
@@ -207,7 +211,8 @@ class DSAC(AlgorithmBase):
         return tb_info
 
     def _q_evaluate(self, obs, act, qnet, use_min=False):
-        StochaQ = qnet(obs, act)
+        # distributional loss is computed in fp32 under mixed precision
+        StochaQ = qnet(obs, act).float()
         mean, std = StochaQ[..., 0], StochaQ[..., -1]
         normal = Normal(torch.zeros(mean.shape), torch.ones(std.shape))
         if use_min:
@@ -277,13 +282,13 @@ class DSAC(AlgorithmBase):
         return loss_alpha
 
     def _update(self, iteration: int):
-        self.networks.q_optimizer.step()
+        self.amp.step(self.networks.q_optimizer)
 
         if iteration % self.delay_update == 0:
-            self.networks.policy_optimizer.step()
+            self.amp.step(self.networks.policy_optimizer)
 
             if self.auto_alpha:
-                self.networks.alpha_optimizer.step()
+                self.amp.step(self.networks.alpha_optimizer)
 
             with torch.no_grad():
                 polyak = 1 - self.tau
@@ -298,3 +303,4 @@ class DSAC(AlgorithmBase):
                 ):
                     p_targ.data.mul_(polyak)
                     p_targ.data.add_((1 - polyak) * p.data)
+        self.amp.update()
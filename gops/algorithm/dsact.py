@@ -13,6 +13,7 @@
 #             IEEE transactions on neural networks and learning systems, 2021.
 #  Update: 2021-03-05, Ziqing Gu: create DSAC algorithm
 #  Update: 2021-03-05, Wenxuan Wang: debug DSAC algorithm
+#  Update: 2026-10-19, iDLab: mixed precision training
 
 __all__=["ApproxContainer","DSACT"]
 import math
@@ -173,19 +174,21 @@ class DSACT(AlgorithmBase):
         start_time = time.time()
 
         obs = data["obs"]
-        logits = self.networks.policy(obs)
-        logits_mean, logits_std = torch.chunk(logits, chunks=2, dim=-1)
-        policy_mean = torch.tanh(logits_mean).mean().item()
-        policy_std = logits_std.mean().item()
-
-        act_dist = self.networks.create_action_distributions(logits)
-        new_act, new_log_prob = act_dist.rsample()
+        with self.amp.autocast():
+            logits = self.networks.policy(obs)
+            logits_mean, logits_std = torch.chunk(logits, chunks=2, dim=-1)
+            policy_mean = torch.tanh(logits_mean).mean().item()
+            policy_std = logits_std.mean().item()
+
+            act_dist = self.networks.create_action_distributions(logits)
+            new_act, new_log_prob = act_dist.rsample()
         data.update({"new_act": new_act, "new_log_prob": new_log_prob})
 
         self.networks.q1_optimizer.zero_grad()
         self.networks.q2_optimizer.zero_grad()
-        loss_q, q1, q2, std1, std2, min_std1, min_std2 = self._compute_loss_q(data)
-        loss_q.backward()
+        with self.amp.autocast():
+            loss_q, q1, q2, std1, std2, min_std1, min_std2 = self._compute_loss_q(data)
+        self.amp.backward(loss_q)
 
         for p in self.networks.q1.parameters():
             p.requires_grad = False
@@ -194,8 +197,9 @@ class DSACT(AlgorithmBase):
             p.requires_grad = False
 
         self.networks.policy_optimizer.zero_grad()
-        loss_policy, entropy = self._compute_loss_policy(data)
-        loss_policy.backward()
+        with self.amp.autocast():
+            loss_policy, entropy = self._compute_loss_policy(data)
+        self.amp.backward(loss_policy)
 
         for p in self.networks.q1.parameters():
             p.requires_grad = True
@@ -205,7 +209,7 @@ class DSACT(AlgorithmBase):
         if self.auto_alpha:
             self.networks.alpha_optimizer.zero_grad()
             loss_alpha = self._compute_loss_alpha(data)
-            loss_alpha.backward()
+            self.amp.backward(loss_alpha)
 
         tb_info = {
             "DSAC2/critic_avg_q1-RL iter": q1.item(),
@@ -228,7 +232,8 @@ class DSACT(AlgorithmBase):
         return tb_info
 
     def _q_evaluate(self, obs, act, qnet):
-        StochaQ = qnet(obs, act)
+        # distributional loss is computed in fp32 under mixed precision
+        StochaQ = qnet(obs, act).float()
         mean, std = StochaQ[..., 0], StochaQ[..., -1]
         normal = Normal(torch.zeros_like(mean), torch.ones_like(std))
         z = normal.sample()
@@ -339,14 +344,14 @@ class DSACT(AlgorithmBase):
         return loss_alpha
 
     def _update(self, iteration: int):
-        self.networks.q1_optimizer.step()
-        self.networks.q2_optimizer.step()
+        self.amp.step(self.networks.q1_optimizer)
+        self.amp.step(self.networks.q2_optimizer)
 
         if iteration % self.delay_update == 0:
-            self.networks.policy_optimizer.step()
+            self.amp.step(self.networks.policy_optimizer)
 
             if self.auto_alpha:
-                self.networks.alpha_optimizer.step()
+                self.amp.step(self.networks.alpha_optimizer)
 
             with torch.no_grad():
                 polyak = 1 - self.tau
@@ -366,3 +371,4 @@ class DSACT(AlgorithmBase):
                 ):
                     p_targ.data.mul_(polyak)
                     p_targ.data.add_((1 - polyak) * p.data)
+        self.amp.update()
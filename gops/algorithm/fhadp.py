@@ -12,12 +12,15 @@
 #  Update: 2021-03-05, Fawang Zhang: create FHADP algorithm
 #  Update: 2022-12-04, Jiaxin Gao: supplementary comment information
 #  Update: 2023-08-28, Guojian Zhan: support lr schedule
+#  Update: 2026-10-19, iDLab: micro batch gradient accumulation
+#  Update: 2026-10-19, iDLab: optimal gap from closed-form value of LQ model
+#  Update: 2026-10-19, iDLab: mixed precision loss with fp32 model rollout
 
 __all__ = ["FHADP"]
 
 import time
 from copy import deepcopy
-from typing import Tuple
+from typing import Optional, Tuple
 
 import torch
 from torch.optim import Adam
@@ -26,6 +29,7 @@ from gops.create_pkg.create_apprfunc import create_apprfunc
 from gops.create_pkg.create_env_model import create_env_model
 from gops.utils.common_utils import get_apprfunc_dict
 from gops.utils.gops_typing import DataDict, InfoDict
+from gops.utils.micro_batch import MicroBatchAccumulator
 from gops.utils.tensorboard_setup import tb_tags
 
 
@@ -62,6 +66,11 @@ class FHADP(AlgorithmBase):
 
     :param int pre_horizon: envmodel predict horizon.
     :param float gamma: discount factor.
+    :param float micro_batch_memory: memory budget in MB of model rollout graph, batch is
+        split into micro batches fitting in it and gradient is accumulated. None to disable.
+
+    If env model has closed-form optimal value (e.g. LQ), gap between optimal value and
+    value of policy over the horizon is recorded.
     """
 
     def __init__(
@@ -69,6 +78,7 @@ class FHADP(AlgorithmBase):
         *,
         pre_horizon: int,
         gamma: float = 1.0,
+        micro_batch_memory: Optional[float] = None,
         index: int = 0,
         **kwargs,
     ):
@@ -78,6 +88,7 @@ class FHADP(AlgorithmBase):
         self.pre_horizon = pre_horizon
         self.gamma = gamma
         self.tb_info = dict()
+        self.micro_batch = MicroBatchAccumulator(micro_batch_memory, amp=self.amp)
 
     @property
     def adjustable_parameters(self) -> Tuple[str]:
@@ -86,7 +97,8 @@ class FHADP(AlgorithmBase):
 
     def _local_update(self, data: DataDict, iteration: int) -> InfoDict:
         self._compute_gradient(data)
-        self.networks.policy_optimizer.step()
+        self.amp.step(self.networks.policy_optimizer)
+        self.amp.update()
         return self.tb_info
 
     def get_remote_update_info(self, data: DataDict, iteration: int) -> Tuple[InfoDict, DataDict]:
@@ -99,27 +111,37 @@ class FHADP(AlgorithmBase):
     def _remote_update(self, update_info: DataDict):
         for p, grad in zip(self.networks.policy.parameters(), update_info["grad"]):
             p.grad = grad
-        self.networks.policy_optimizer.step()
+        self.amp.step(self.networks.policy_optimizer)
+        self.amp.update()
 
     def _compute_gradient(self, data: DataDict):
         start_time = time.time()
         self.networks.policy.zero_grad()
-        loss_policy, loss_info = self._compute_loss_policy(deepcopy(data))
-        loss_policy.backward()
+        loss_info = self.micro_batch.accumulate(
+            deepcopy(data), self._compute_loss_policy, "policy"
+        )
         end_time = time.time()
-        self.tb_info.update(loss_info)
+        self.tb_info.update({k: v.item() for k, v in loss_info.items()})
         self.tb_info[tb_tags["alg_time"]] = (end_time - start_time) * 1000  # ms
 
     def _compute_loss_policy(self, data: DataDict) -> Tuple[torch.Tensor, InfoDict]:
         o, d = data["obs"], data["done"]
         info = data
         v_pi = 0
+        # model dynamics is kept in fp32 under mixed precision
+        model_forward = self.amp.fp32(self.envmodel.forward)
         for step in range(self.pre_horizon):
             a = self.networks.policy(o, step + 1)
-            o, r, d, info = self.envmodel.forward(o, a, d, info)
+            o, r, d, info = model_forward(o, a, d, info)
             v_pi += r * (self.gamma ** step)
         loss_policy = -v_pi.mean()
         loss_info = {
-            tb_tags["loss_actor"]: loss_policy.item()
+            tb_tags["loss_actor"]: loss_policy
         }
+        if hasattr(self.envmodel, "optimal_value"):
+            with torch.no_grad():
+                v_opt = self.amp.fp32(self.envmodel.optimal_value)(
+                    data["obs"], self.gamma, self.pre_horizon
+                )
+            loss_info[tb_tags["loss_actor_optimal_gap"]] = (v_opt - v_pi.detach()).mean()
         return loss_policy, loss_info
@@ -11,11 +11,15 @@
 #             Reinforcement Learning for Sequential Decision and Optimal Control. Springer, Singapore.
 #  Update: 2021-03-05, Wenxuan Wang: create infADP algorithm
 #  Update: 2022-12-04, Jiaxin Gao: supplementary comment information
+#  Update: 2026-10-19, iDLab: share model rollout between value and policy loss
+#  Update: 2026-10-19, iDLab: micro batch gradient accumulation
+#  Update: 2026-10-19, iDLab: closed-form value target of LQ model
+#  Update: 2026-10-19, iDLab: mixed precision loss with fp32 model rollout
 
 __all__ = ["INFADP"]
 
 from copy import deepcopy
-from typing import Tuple
+from typing import Optional, Tuple
 
 import torch
 from torch.optim import Adam
@@ -24,6 +28,8 @@ import time
 from gops.create_pkg.create_apprfunc import create_apprfunc
 from gops.create_pkg.create_env_model import create_env_model
 from gops.utils.common_utils import get_apprfunc_dict
+from gops.utils.micro_batch import MicroBatchAccumulator
+from gops.utils.model_rollout import RolloutCache
 from gops.utils.tensorboard_setup import tb_tags
 from gops.algorithm.base import AlgorithmBase, ApprBase
 
@@ -73,6 +79,10 @@ class INFADP(AlgorithmBase):
     :param float tau: param for soft update of target network.
     :param int pev_step: number of steps for policy evaluation.
     :param int pim_step: number of steps for policy improvement.
+    :param float micro_batch_memory: memory budget in MB of model rollout graph, batch is
+        split into micro batches fitting in it and gradient is accumulated. None to disable.
+    :param bool closed_form_value: whether to bootstrap at the end of model rollout with
+        closed-form optimal value of env model (e.g. LQ) instead of target value network.
     """
 
     def __init__(
@@ -83,6 +93,8 @@ class INFADP(AlgorithmBase):
         pev_step: int = 1,
         pim_step: int = 1,
         forward_step: int = 10,
+        micro_batch_memory: Optional[float] = None,
+        closed_form_value: bool = False,
         **kwargs
     ):
         super().__init__(index, **kwargs)
@@ -94,6 +106,13 @@ class INFADP(AlgorithmBase):
         self.pim_step = pim_step
         self.forward_step = forward_step
         self.tb_info = dict()
+        self.rollout_cache = RolloutCache()
+        self.micro_batch = MicroBatchAccumulator(micro_batch_memory, amp=self.amp)
+        if closed_form_value:
+            assert hasattr(
+                self.envmodel, "optimal_value"
+            ), "Env model has no closed-form optimal value."
+        self.closed_form_value = closed_form_value
 
     @property
     def adjustable_parameters(self):
@@ -129,7 +148,8 @@ class INFADP(AlgorithmBase):
     def _update(self, update_list):
         tau = self.tau
         for net_name in update_list:
-            self.networks.optimizer_dict[net_name].step()
+            self.amp.step(self.networks.optimizer_dict[net_name])
+        self.amp.update()
 
         with torch.no_grad():
             for net_name in update_list:
@@ -147,17 +167,15 @@ class INFADP(AlgorithmBase):
 
         if iteration % (self.pev_step + self.pim_step) < self.pev_step:
             self.networks.v.zero_grad()
-            loss_v, v = self._compute_loss_v(data)
-            loss_v.backward()
-            self.tb_info[tb_tags["loss_critic"]] = loss_v.item()
-            self.tb_info[tb_tags["critic_avg_value"]] = v.item()
+            loss_info = self.micro_batch.accumulate(data, self._compute_loss_v, "v")
             update_list.append("v")
         else:
             self.networks.policy.zero_grad()
-            loss_policy = self._compute_loss_policy(data)
-            loss_policy.backward()
-            self.tb_info[tb_tags["loss_actor"]] = loss_policy.item()
+            loss_info = self.micro_batch.accumulate(
+                data, self._compute_loss_policy, "policy"
+            )
             update_list.append("policy")
+        self.tb_info.update({k: v.item() for k, v in loss_info.items()})
 
         end_time = time.time()
 
@@ -173,25 +191,18 @@ class INFADP(AlgorithmBase):
             data["done"],
         )
         v = self.networks.v(o)
-        info_init = data
+        rollout = self._get_rollout(data, create_graph=False)
 
         with torch.no_grad():
-            for step in range(self.forward_step):
-                if step == 0:
-                    a = self.networks.policy(o)
-                    o2, r, d, info = self.envmodel.forward(o, a, d, info_init)
-                    backup = r
-                else:
-                    o = o2
-                    a = self.networks.policy(o)
-                    o2, r, d, info = self.envmodel.forward(o, a, d, info)
-                    backup += self.gamma**step * r
-
-            backup += (
-                (~d) * self.gamma**self.forward_step * self.networks.v_target(o2)
+            backup = rollout.ret + (~rollout.last_done) * self.gamma**self.forward_step * (
+                self._terminal_value(rollout.last_obs)
             )
         loss_v = ((v - backup) ** 2).mean()
-        return loss_v, torch.mean(v)
+        loss_info = {
+            tb_tags["loss_critic"]: loss_v,
+            tb_tags["critic_avg_value"]: torch.mean(v),
+        }
+        return loss_v, loss_info
 
     def _compute_loss_policy(self, data):
         o, a, r, o2, d = (
@@ -201,24 +212,31 @@ class INFADP(AlgorithmBase):
             data["obs2"],
             data["done"],
         )
-        info_init = data
-        v_pi = torch.zeros(1)
         for p in self.networks.v.parameters():
             p.requires_grad = False
-        for step in range(self.forward_step):
-            if step == 0:
-                a = self.networks.policy(o)
-                o2, r, d, info = self.envmodel.forward(o, a, d, info_init)
-                v_pi = r
-            else:
-                o = o2
-                a = self.networks.policy(o)
-                o2, r, d, info = self.envmodel.forward(o, a, d, info)
-                v_pi += self.gamma**step * r
-        v_pi += (~d) * self.gamma**self.forward_step * self.networks.v_target(o2)
+        rollout = self._get_rollout(data, create_graph=True)
+        v_pi = rollout.ret + (~rollout.last_done) * self.gamma**self.forward_step * (
+            self._terminal_value(rollout.last_obs)
+        )
         for p in self.networks.v.parameters():
             p.requires_grad = True
-        return -v_pi.mean()
+        loss_policy = -v_pi.mean()
+        return loss_policy, {tb_tags["loss_actor"]: loss_policy}
+
+    def _terminal_value(self, obs):
+        if self.closed_form_value:
+            return self.amp.fp32(self.envmodel.optimal_value)(obs, self.gamma)
+        return self.networks.v_target(obs)
+
+    def _get_rollout(self, data, create_graph):
+        return self.rollout_cache.get(
+            data,
+            self.networks.policy,
+            self.amp.fp32(self.envmodel.forward),
+            self.forward_step,
+            self.gamma,
+            create_graph=create_graph,
+        )
 
 
 if __name__ == "__main__":
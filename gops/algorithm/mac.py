@@ -11,12 +11,16 @@
 #             Mixed reinforcement learning for efficient policy optimization in stochastic environments. 
 #             IEEE ICCAS, Pusan, Korea.
 #  Update: 2021-03-05, Yao Mu: create MAC algorithm
+#  Update: 2026-10-19, iDLab: iterative bayes estimator in torch
+#  Update: 2026-10-19, iDLab: share model rollout between value and policy loss
+#  Update: 2026-10-19, iDLab: micro batch gradient accumulation
+#  Update: 2026-10-19, iDLab: mixed precision loss with fp32 model rollout
 
 
 __all__ = ["MAC"]
 
 from copy import deepcopy
-from typing import Tuple
+from typing import Optional, Tuple
 
 import torch
 from torch.optim import Adam
@@ -25,9 +29,10 @@ import time
 from gops.create_pkg.create_apprfunc import create_apprfunc
 from gops.create_pkg.create_env_model import create_env_model
 from gops.utils.common_utils import get_apprfunc_dict
+from gops.utils.micro_batch import MicroBatchAccumulator
+from gops.utils.model_rollout import RolloutCache
 from gops.utils.tensorboard_setup import tb_tags
 from gops.algorithm.base import AlgorithmBase, ApprBase
-import numpy as np
 
 
 class ApproxContainer(ApprBase):
@@ -93,6 +98,11 @@ class MAC(AlgorithmBase):
     :param int pev_step: number of steps for policy evaluation.
     :param int pim_step: number of steps for policy improvement.
     :param int forward_step: envmodel forward step.
+    :param float micro_batch_memory: memory budget in MB of model rollout graph, batch is
+        split into micro batches fitting in it and gradient is accumulated. None to disable.
+    :param bool ibe_warm_start: whether iterative bayes estimator of model error starts
+        from covariance estimated at last update, instead of diagonal sample variance of
+        the batch. Estimates then depend on former batches. Default to False.
     """
     def __init__(
         self, 
@@ -102,6 +112,8 @@ class MAC(AlgorithmBase):
         pev_step: int = 1,
         pim_step: int = 1,
         forward_step: int = 10,
+        micro_batch_memory: Optional[float] = None,
+        ibe_warm_start: bool = False,
         **kwargs
     ):
         super().__init__(index, **kwargs)
@@ -117,6 +129,10 @@ class MAC(AlgorithmBase):
         self.forward_step = forward_step
         self.tb_info = dict()
         self.delta = None
+        self.ibe_warm_start = ibe_warm_start
+        self.ibe_var = None
+        self.rollout_cache = RolloutCache()
+        self.micro_batch = MicroBatchAccumulator(micro_batch_memory, amp=self.amp)
 
     @property
     def adjustable_parameters(self):
@@ -152,7 +168,8 @@ class MAC(AlgorithmBase):
     def _update(self, update_list):
         tau = self.tau
         for net_name in update_list:
-            self.networks.optimizer_dict[net_name].step()
+            self.amp.step(self.networks.optimizer_dict[net_name])
+        self.amp.update()
 
         with torch.no_grad():
             for net_name in update_list:
@@ -170,6 +187,22 @@ class MAC(AlgorithmBase):
         o2 = o2 + self.delta
         return o2, r, d
 
+    def _model_step(self, o, a, d, info):
+        o2, r, d = self.dynamic_model_forward(o, a, d)
+        return o2, r, d, info
+
+    def _get_rollout(self, data, create_graph):
+        return self.rollout_cache.get(
+            data,
+            self.networks.policy,
+            self.amp.fp32(self._model_step),
+            self.forward_step,
+            self.gamma,
+            info={},
+            create_graph=create_graph,
+        )
+
+    @torch.no_grad()
     def update_ibe_model(self, o, a, d, o2):
         data = o2 - self.envmodel.forward(o, a, d, {})[0]
         zero_prior_mean = torch.zeros_like(data[0])
@@ -177,28 +210,40 @@ class MAC(AlgorithmBase):
         self.delta = self.iterative_bayes_estimator(
             data, zero_prior_mean, diag_variance
         )
+        # rollouts with former model error are outdated
+        self.rollout_cache.clear()
 
     def iterative_bayes_estimator(self, data, basic_mu, basic_var):
+        """Estimate gaussian model error by iterating posterior mean and covariance,
+        and draw one sample of model error for each data.
+
+        Pseudo-inverses are computed by eigen decomposition on the device of data.
+        Iteration starts from diagonal sample variance of data, or from covariance
+        estimated at last update if ibe_warm_start is set.
+        """
         N, input_dim = data.shape
-        var = torch.diag(torch.var(data, 0))
+        if (
+            self.ibe_warm_start
+            and self.ibe_var is not None
+            and self.ibe_var.shape[0] == input_dim
+        ):
+            var = self.ibe_var
+        else:
+            var = torch.diag(torch.var(data, 0))
         data_sum = torch.sum(data, 0).unsqueeze(1)
-        basic_mu = basic_mu.unsqueeze(1)
+        basic_precision = _psd_pinv(basic_var)[0]
+        basic_term = torch.mm(basic_precision, basic_mu.unsqueeze(1))
 
         for i in range(4):
-            K = torch.pinverse(torch.pinverse(basic_var) + N * torch.pinverse(var))
-            Z = torch.mm(torch.pinverse(basic_var), basic_mu) + torch.mm(
-                torch.pinverse(var), data_sum
-            )
-            mu = torch.mm(K, Z)
+            precision = _psd_pinv(var)[0]
+            Z = basic_term + torch.mm(precision, data_sum)
+            mu = torch.mm(_psd_pinv(basic_precision + N * precision)[0], Z)
             var = torch.mm((data - mu.t()).t(), data - mu.t()) / N
-        mu = mu.detach().cpu().numpy()
-        var = var.detach().cpu().numpy()
-        sample = torch.tensor(
-            np.random.multivariate_normal(np.squeeze(mu), var, N), dtype=torch.float32
-        ).detach()
-        if self.use_gpu:
-            sample = sample.cuda()
-        return sample
+        self.ibe_var = var
+        # samples have no variance in null directions of singular covariance
+        root = _psd_pinv(var)[1]
+        noise = torch.randn(N, input_dim, dtype=data.dtype, device=data.device)
+        return mu.t() + torch.mm(noise, root.t())
 
     def _compute_gradient(self, data, iteration):
         update_list = []
@@ -207,17 +252,17 @@ class MAC(AlgorithmBase):
 
         if iteration % (self.pev_step + self.pim_step) < self.pev_step:
             self.networks.v.zero_grad()
-            loss_v, v = self.compute_loss_v(deepcopy(data))
-            loss_v.backward()
-            self.tb_info[tb_tags["loss_critic"]] = loss_v.item()
-            self.tb_info[tb_tags["critic_avg_value"]] = v.item()
+            # model error is estimated from the whole batch
+            self.update_ibe_model(data["obs"], data["act"], data["done"], data["obs2"])
+            loss_info = self.micro_batch.accumulate(data, self.compute_loss_v, "v")
             update_list.append("v")
         else:
             self.networks.policy.zero_grad()
-            loss_policy = self.compute_loss_policy(deepcopy(data))
-            loss_policy.backward()
-            self.tb_info[tb_tags["loss_actor"]] = loss_policy.item()
+            loss_info = self.micro_batch.accumulate(
+                data, self.compute_loss_policy, "policy"
+            )
             update_list.append("policy")
+        self.tb_info.update({k: v.item() for k, v in loss_info.items()})
 
         end_time = time.perf_counter()
 
@@ -234,25 +279,18 @@ class MAC(AlgorithmBase):
             data["done"],
         )
 
-        self.update_ibe_model(o, a, d, o2)
         v = self.networks.v(o)
+        rollout = self._get_rollout(data, create_graph=False)
         with torch.no_grad():
-            for step in range(self.forward_step):
-                if step == 0:
-                    a = self.networks.policy(o)
-                    o2, r, d = self.dynamic_model_forward(o, a, d)
-                    backup = r
-                else:
-                    o = o2
-                    a = self.networks.policy(o)
-                    o2, r, d = self.dynamic_model_forward(o, a, d)
-                    backup += self.gamma**step * r
-
-            backup += (
-                (~d) * self.gamma**self.forward_step * self.networks.v_target(o2)
+            backup = rollout.ret + (~rollout.last_done) * self.gamma**self.forward_step * (
+                self.networks.v_target(rollout.last_obs)
             )
         loss_v = ((v - backup) ** 2).mean()
-        return loss_v, torch.mean(v)
+        loss_info = {
+            tb_tags["loss_critic"]: loss_v,
+            tb_tags["critic_avg_value"]: torch.mean(v),
+        }
+        return loss_v, loss_info
 
     def compute_loss_policy(self, data):
         o, a, r, o2, d = (
@@ -262,20 +300,26 @@ class MAC(AlgorithmBase):
             data["obs2"],
             data["done"],
         )
-        v_pi = torch.zeros(1)
         for p in self.networks.v.parameters():
             p.requires_grad = False
-        for step in range(self.forward_step):
-            if step == 0:
-                a = self.networks.policy(o)
-                o2, r, d = self.dynamic_model_forward(o, a, d)
-                v_pi = r
-            else:
-                o = o2
-                a = self.networks.policy(o)
-                o2, r, d = self.dynamic_model_forward(o, a, d)
-                v_pi += self.gamma**step * r
-        v_pi += (~d) * self.gamma**self.forward_step * self.networks.v_target(o2)
+        rollout = self._get_rollout(data, create_graph=True)
+        v_pi = rollout.ret + (~rollout.last_done) * self.gamma**self.forward_step * (
+            self.networks.v_target(rollout.last_obs)
+        )
         for p in self.networks.v.parameters():
             p.requires_grad = True
-        return -v_pi.mean()
+        loss_policy = -v_pi.mean()
+        return loss_policy, {tb_tags["loss_actor"]: loss_policy}
+
+
+def _psd_pinv(matrix: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Pseudo-inverse and square root R (matrix = R R^T) of a symmetric positive
+    semi-definite matrix. As torch.linalg.pinv, eigenvalues below dim * eps times the
+    largest one are treated as zero, so null directions have zero inverse."""
+    eigvals, eigvecs = torch.linalg.eigh(matrix)
+    rtol = matrix.shape[0] * torch.finfo(matrix.dtype).eps
+    nonzero = eigvals > rtol * eigvals.abs().max()
+    eigvals = torch.where(nonzero, eigvals, torch.zeros_like(eigvals))
+    inv_eigvals = torch.where(nonzero, 1 / eigvals, torch.zeros_like(eigvals))
+    pinv = torch.mm(eigvecs * inv_eigvals, eigvecs.t())
+    return pinv, eigvecs * eigvals.sqrt()
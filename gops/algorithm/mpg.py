@@ -11,13 +11,15 @@
 #             Mixed policy gradient. 
 #             https://arxiv.org/abs/2102.11513.
 #  Update Date: 2022-06-05, Yang Guan: create MPG algorithm
+#  Update Date: 2026-10-19, iDLab: micro batch gradient accumulation
 
 
 __all__ = ["ApproxContainer", "MPG"]
 
 import time
 from copy import deepcopy
-from typing import Tuple
+from functools import partial
+from typing import Optional, Tuple
 
 import numpy as np
 import torch
@@ -28,6 +30,7 @@ from gops.create_pkg.create_apprfunc import create_apprfunc
 from gops.create_pkg.create_env_model import create_env_model
 from gops.utils.tensorboard_setup import tb_tags
 from gops.utils.common_utils import get_apprfunc_dict
+from gops.utils.micro_batch import MicroBatchAccumulator
 
 
 class ApproxContainer(ApprBase):
@@ -117,6 +120,7 @@ class MPG(AlgorithmBase):
         kappa: float = 0.5,
         delay_update: int = 1,
         forward_step: int = 10,
+        micro_batch_memory: Optional[float] = None,
         **kwargs,
     ) -> None:
         """
@@ -129,6 +133,8 @@ class MPG(AlgorithmBase):
             :param: float tau: target update.
             :param: int delay_update: delay update of policy network.
             :param: int forward_step: forward step in calculating model return.
+            :param: float micro_batch_memory: memory budget in MB of model rollout graph, batch is
+                split into micro batches fitting in it and gradient is accumulated. None to disable.
         """
         super(MPG, self).__init__(index, **kwargs)
         self.networks = ApproxContainer(**kwargs)
@@ -143,6 +149,7 @@ class MPG(AlgorithmBase):
             self.kappa = kappa
         self.delay_update = delay_update
         self.forward_step = forward_step
+        self.micro_batch = MicroBatchAccumulator(micro_batch_memory)
 
     @property
     def adjustable_parameters(self):
@@ -176,14 +183,34 @@ class MPG(AlgorithmBase):
             self.networks.q1_model_optimizer.zero_grad()
             self.networks.q2_model_optimizer.zero_grad()
 
-        # compute q loss and backward
         start_time = time.time()
-        q_info, backup_info = self._compute_loss_q(o, a, r, o2, d)
-        loss_q = q_info["MPG/loss_q-RL iter"]
-        loss_q.backward()
+        # value backups are computed on the whole batch, since model backup is chosen by
+        # comparing with standard deviation of data backup over the whole batch
+        data = dict(data, backup_data=self._compute_value_backup(o, a, r, o2, d))
+        backup_std = None
         if self.pge_method == "mixed_state":
-            loss_q_model = q_info["MPG/loss_q_model-RL iter"]
-            loss_q_model.backward()
+            data["backup_model"] = self._compute_value_backup_model(o, a, r, o2, d)
+            backup_std = data["backup_data"].std()
+
+        # compute q loss and policy loss and backward on micro batches
+        loss_info = self.micro_batch.accumulate(
+            data,
+            partial(self._compute_loss, iteration=iteration, backup_std=backup_std),
+            "loss",
+        )
+
+        # log information
+        end_time = time.time()
+        tb_info = {tb_tags["alg_time"]: (end_time - start_time) * 1000}
+        tb_info.update({k: v.item() for k, v in loss_info.items()})
+        return tb_info
+
+    # compute q loss and policy loss of a batch
+    def _compute_loss(self, data: dict, iteration, backup_std):
+        q_info = self._compute_loss_q(data)
+        loss = q_info["MPG/loss_q-RL iter"]
+        if self.pge_method == "mixed_state":
+            loss = loss + q_info["MPG/loss_q_model-RL iter"]
 
         for p in self.networks.q1.parameters():
             p.requires_grad = False
@@ -195,9 +222,7 @@ class MPG(AlgorithmBase):
             for p in self.networks.q2_model.parameters():
                 p.requires_grad = False
 
-        # compute policy loss and backward
-        loss_pi, pi_tb_info = self._compute_loss_pi(data, iteration, backup_info)
-        loss_pi.backward()
+        loss_pi, pi_tb_info = self._compute_loss_pi(data, iteration, backup_std)
 
         for p in self.networks.q1.parameters():
             p.requires_grad = True
@@ -209,13 +234,9 @@ class MPG(AlgorithmBase):
             for p in self.networks.q2_model.parameters():
                 p.requires_grad = True
 
-        # log information
-        end_time = time.time()
-        tb_info = {tb_tags["alg_time"]: (end_time - start_time) * 1000}
-        q_tb_info = {k: v.item() for k, v in q_info.items()}
-        tb_info.update(q_tb_info)
-        tb_info.update(pi_tb_info)
-        return tb_info
+        # q networks are not in graph of policy loss, so one backward gives both gradients
+        q_info.update(pi_tb_info)
+        return loss + loss_pi, q_info
 
     # compute value backup/target for data-driven policy gradient
     def _compute_value_backup(self, o, a, r, o2, d):
@@ -240,13 +261,13 @@ class MPG(AlgorithmBase):
         return backup_model
 
     # compute q loss for data-driven and model-driven policy gradient
-    def _compute_loss_q(self, o, a, r, o2, d):
+    def _compute_loss_q(self, data):
+        o, a = data["obs"], data["act"]
         q1 = self.networks.q1(o, a)
         q2 = self.networks.q2(o, a)
 
         # Bellman backup for Q functions
-        backup_data = self._compute_value_backup(o, a, r, o2, d)
-        backup_info = {"backup_data": backup_data}
+        backup_data = data["backup_data"]
 
         # MSE loss against Bellman backup for data-driven policy gradient
         loss_q1 = ((q1 - backup_data) ** 2).mean()
@@ -266,8 +287,7 @@ class MPG(AlgorithmBase):
             q2_model = self.networks.q2_model(o, a)
 
             # Bellman backup for Q functions
-            backup_model = self._compute_value_backup_model(o, a, r, o2, d)
-            backup_info.update({"backup_model": backup_model})
+            backup_model = data["backup_model"]
 
             # MSE loss against Bellman backup for model-driven policy gradient
             loss_q1_model = ((q1_model - backup_model) ** 2).mean()
@@ -282,7 +302,7 @@ class MPG(AlgorithmBase):
                     "MPG/q2_model_mean-RL iter": q2_model.mean(),
                 }
             )
-        return q_info, backup_info
+        return q_info
 
     # weights of data-driven policy gradient and model-driven policy gradient
     def _compute_weights(self, iteration):
@@ -309,7 +329,7 @@ class MPG(AlgorithmBase):
         return ws
 
     # compute policy loss for data-driven and model-driven policy gradient
-    def _compute_loss_pi(self, data, iteration, backup_info):
+    def _compute_loss_pi(self, data, iteration, backup_std):
         # get data including state, action, reward, next state and done
         o, a, r, o2, d = (
             data["obs"],
@@ -349,32 +369,28 @@ class MPG(AlgorithmBase):
             model_loss = -model_return.mean()
             loss = data_w * data_loss + model_w * model_loss
             pi_tb_info = {
-                "MPG/data_w-RL iter": data_w.item(),
-                "MPG/model_w-RL iter": model_w.item(),
-                "MPG/data_loss-RL iter": data_loss.item(),
-                "MPG/model_loss-RL iter": model_loss.item(),
-                "MPG/loss_pi-RL iter": loss.item(),
+                "MPG/data_w-RL iter": data_w,
+                "MPG/model_w-RL iter": model_w,
+                "MPG/data_loss-RL iter": data_loss,
+                "MPG/model_loss-RL iter": model_loss,
+                "MPG/loss_pi-RL iter": loss,
             }
         else:
             assert (
                 self.pge_method == "mixed_state"
             ), "the pge_method entry should be mixed_state or mixed_weight"
-            backup_data, backup_model = (
-                backup_info["backup_data"],
-                backup_info["backup_model"],
-            )
+            backup_data, backup_model = data["backup_data"], data["backup_model"]
             with torch.no_grad():
                 model_condi = (
-                    torch.abs_(backup_data - backup_model)
-                    < self.kappa * backup_data.std()
+                    torch.abs(backup_data - backup_model) < self.kappa * backup_std
                 )
             loss = torch.where(model_condi, -model_return, -data_return).mean()
             model_ratio = model_condi.float().mean()
             pi_tb_info = {
-                "MPG/model_ratio-RL iter": model_ratio.item(),
-                "MPG/data_loss-RL iter": -data_return.mean().item(),
-                "MPG/model_loss-RL iter": -model_return.mean().item(),
-                "MPG/loss_pi-RL iter": loss.item(),
+                "MPG/model_ratio-RL iter": model_ratio,
+                "MPG/data_loss-RL iter": -data_return.mean(),
+                "MPG/model_loss-RL iter": -model_return.mean(),
+                "MPG/loss_pi-RL iter": loss,
             }
         return loss, pi_tb_info
 
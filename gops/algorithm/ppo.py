@@ -11,6 +11,7 @@
 #             Proximal policy optimization algorithms. 
 #             https://arxiv.org/abs/1707.06347.
 #  Update: 2021-03-05, Yuxuan Jiang: create PPO algorithm
+#  Update: 2026-10-19, iDLab: mixed precision training
 
 
 __all__ = ["ApproxContainer", "PPO"]
@@ -131,7 +132,8 @@ class PPO(AlgorithmBase):
         data["adv"] = (data["adv"] - data["adv"].mean()) / (
             data["adv"].std() + self.EPS
         )
-        with torch.no_grad():
+        # old logits are computed in the same precision as new ones
+        with torch.no_grad(), self.amp.autocast():
             data["val"] = self.networks.value(data["obs"])
             data["logits"] = self.networks.policy(data["obs"])
 
@@ -143,17 +145,19 @@ class PPO(AlgorithmBase):
                 mb_end = self.mini_batch_size * (n + 1)
                 mb_indices = self.indices[mb_start:mb_end]
                 mb_sample = {k: v[mb_indices] for k, v in data.items()}
-                (
-                    loss_total,
-                    loss_surrogate,
-                    loss_value,
-                    loss_entropy,
-                    approximate_kl,
-                    clip_fra,
-                ) = self._compute_loss(mb_sample, iteration)
+                with self.amp.autocast():
+                    (
+                        loss_total,
+                        loss_surrogate,
+                        loss_value,
+                        loss_entropy,
+                        approximate_kl,
+                        clip_fra,
+                    ) = self._compute_loss(mb_sample, iteration)
                 self.approximate_optimizer.zero_grad()
-                loss_total.backward()
-                self.approximate_optimizer.step()
+                self.amp.backward(loss_total)
+                self.amp.step(self.approximate_optimizer)
+                self.amp.update()
                 if self.schedule_adam == "linear":
                     decay_rate = 1 - (iteration / self.max_iteration)
                     assert decay_rate >= 0, "the decay_rate is less than 0!"
@@ -11,11 +11,14 @@
 #             Ternary Policy Iteration Algorithm for Nonlinear Robust Control. 
 #             https://arxiv.org/abs/2007.06810.
 #  Update Date: 2022-09-17, Jie Li: create RPI algorithm
+#  Update Date: 2026-10-19, iDLab: micro batch gradient accumulation
 
 
 __all__ = ["ApproxContainer", "RPI"]
 
 from copy import deepcopy
+from typing import Optional
+
 import numpy as np
 import torch
 import torch.nn as nn
@@ -26,6 +29,7 @@ import time
 from gops.create_pkg.create_apprfunc import create_apprfunc
 from gops.create_pkg.create_env_model import create_env_model
 from gops.utils.common_utils import get_apprfunc_dict
+from gops.utils.micro_batch import MicroBatchAccumulator
 from gops.utils.act_distribution_type import DiracDistribution
 from gops.utils.tensorboard_setup import tb_tags
 from gops.algorithm.base import AlgorithmBase, ApprBase
@@ -118,6 +122,7 @@ class RPI(AlgorithmBase):
         max_step_update_value: int = 10000,
         print_interval: int = 1,
         learning_rate: float = 1e-3,
+        micro_batch_memory: Optional[float] = None,
         **kwargs,
     ) -> None:
         """
@@ -126,6 +131,8 @@ class RPI(AlgorithmBase):
             :param: int max_step_update_value: max gradient step in policy evaluation.
             :param: int print_interval: print interval.
             :param: float learning_rate: learning rate of value function.
+            :param: float micro_batch_memory: memory budget in MB of hamiltonian graph, batch is
+                split into micro batches fitting in it and gradient is accumulated. None to disable.
         """
         super().__init__(index, **kwargs)
 
@@ -156,6 +163,7 @@ class RPI(AlgorithmBase):
             betas=(0.9, 0.99),
             weight_decay=0,
         )
+        self.micro_batch = MicroBatchAccumulator(micro_batch_memory)
 
     # terminal condition for policy evaluation
     def continue_evaluation(self):
@@ -182,8 +190,7 @@ class RPI(AlgorithmBase):
             data = self.sample()
 
             self.approximate_optimizer.zero_grad()
-            loss_value = self._compute_loss(data)
-            loss_value.backward()
+            loss_info = self.micro_batch.accumulate(data, self._compute_loss, "value")
             self.approximate_optimizer.step()
 
             # judge whether to continue policy evaluation
@@ -201,7 +208,7 @@ class RPI(AlgorithmBase):
         grad_info = dict()
         grad_info["iteration"] = iteration
         grad_info["num_update_value"] = self.num_update_value
-        grad_info[tb_tags["loss_critic"]] = loss_value.item()
+        grad_info[tb_tags["loss_critic"]] = loss_info[tb_tags["loss_critic"]].item()
         grad_info[tb_tags["alg_time"]] = (end_time - start_time) * 1000  # ms
 
         # print information
@@ -223,18 +230,24 @@ class RPI(AlgorithmBase):
         # value loss
         loss_value = self._calculate_hamiltonian(batch_observation, batch_input)
 
-        return loss_value
+        return loss_value, {tb_tags["loss_critic"]: loss_value}
 
     # for policy evaluation terminal condition
     def _calculate_norm_hamiltonian(self, set_state):
+        hamiltonian_info = self.micro_batch.accumulate(
+            {"obs": set_state}, self._compute_norm_hamiltonian, "hamiltonian", backward=False
+        )
+        return hamiltonian_info["hamiltonian"].item()
+
+    def _compute_norm_hamiltonian(self, data):
         # name completion
-        batch_observation = set_state
-        batch_input = self.networks.action_and_adversary(set_state)
+        batch_observation = data["obs"]
+        batch_input = self.networks.action_and_adversary(batch_observation)
 
         # hamiltonian
         hamiltonian = self._calculate_hamiltonian(batch_observation, batch_input)
 
-        return hamiltonian.detach().item()
+        return hamiltonian, {"hamiltonian": hamiltonian}
 
     def _calculate_hamiltonian(self, batch_observation, batch_input):
         """
@@ -276,7 +289,7 @@ class RPI(AlgorithmBase):
         :return: torch.tensor loss: value loss.
         """
         # dV / dt = \partial V / \partial t * f(x, u, w)
-        dv_dt = torch.diag(torch.mm(delta_value, delta_state.t()), 0)
+        dv_dt = torch.sum(delta_value * delta_state, dim=1)
         # hamiltonian
         hamiltonian = utility + dv_dt
         # value loss
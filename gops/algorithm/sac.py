@@ -11,6 +11,7 @@
 #             Soft actor-critic: off-policy maximum entropy deep reinforcement learning with a stochastic actor. 
 #             ICML, Stockholm, Sweden.
 #  Update: 2021-03-05, Yujie Yang: create SAC algorithm
+#  Update: 2026-10-19, iDLab: mixed precision training
 
 __all__ = ["ApproxContainer", "SAC"]
 
@@ -158,15 +159,17 @@ class SAC(AlgorithmBase):
         start_time = time.time()
 
         obs = data["obs"]
-        logits = self.networks.policy(obs)
-        act_dist = self.networks.create_action_distributions(logits)
-        new_act, new_logp = act_dist.rsample()
+        with self.amp.autocast():
+            logits = self.networks.policy(obs)
+            act_dist = self.networks.create_action_distributions(logits)
+            new_act, new_logp = act_dist.rsample()
         data.update({"new_act": new_act, "new_logp": new_logp})
 
         self.networks.q1_optimizer.zero_grad()
         self.networks.q2_optimizer.zero_grad()
-        loss_q, q1, q2 = self._compute_loss_q(data)
-        loss_q.backward()
+        with self.amp.autocast():
+            loss_q, q1, q2 = self._compute_loss_q(data)
+        self.amp.backward(loss_q)
 
         for p in self.networks.q1.parameters():
             p.requires_grad = False
@@ -174,8 +177,9 @@ class SAC(AlgorithmBase):
             p.requires_grad = False
 
         self.networks.policy_optimizer.zero_grad()
-        loss_policy, entropy = self._compute_loss_policy(data)
-        loss_policy.backward()
+        with self.amp.autocast():
+            loss_policy, entropy = self._compute_loss_policy(data)
+        self.amp.backward(loss_policy)
 
         for p in self.networks.q1.parameters():
             p.requires_grad = True
@@ -185,7 +189,7 @@ class SAC(AlgorithmBase):
         if self.auto_alpha:
             self.networks.alpha_optimizer.zero_grad()
             loss_alpha = self._compute_loss_alpha(data)
-            loss_alpha.backward()
+            self.amp.backward(loss_alpha)
 
         tb_info = {
             tb_tags["loss_critic"]: loss_q.item(),
@@ -239,13 +243,14 @@ class SAC(AlgorithmBase):
         return loss_alpha
 
     def _update(self, iteration: int):
-        self.networks.q1_optimizer.step()
-        self.networks.q2_optimizer.step()
+        self.amp.step(self.networks.q1_optimizer)
+        self.amp.step(self.networks.q2_optimizer)
 
-        self.networks.policy_optimizer.step()
+        self.amp.step(self.networks.policy_optimizer)
 
         if self.auto_alpha:
-            self.networks.alpha_optimizer.step()
+            self.amp.step(self.networks.alpha_optimizer)
+        self.amp.update()
 
         with torch.no_grad():
             polyak = 1 - self.tau
@@ -11,20 +11,26 @@
 #             Model-Based Chance-Constrained Reinforcement Learning via Separated Proportional-Integral Lagrangian. 
 #             IEEE Transactions on Neural Networks and Learning Systems. Doi: 10.1109/TNNLS.2022.3175595.
 #  Update: 2021-03-05, Baiyu Peng: create SPIL algorithm
+#  Update: 2026-10-19, iDLab: share model rollout between value and policy loss
+#  Update: 2026-10-19, iDLab: vectorized constraint statistics and PID multiplier in torch
+#  Update: 2026-10-19, iDLab: micro batch gradient accumulation
+#  Update: 2026-10-19, iDLab: mixed precision loss with fp32 model rollout
 
 
 __all__ = ["SPIL"]
 
 from copy import deepcopy
-from typing import Any, Tuple
+from functools import partial
+from typing import Any, Optional, Tuple
 
 import torch
 from torch.optim import Adam
 import time
-import numpy as np
 from gops.create_pkg.create_apprfunc import create_apprfunc
 from gops.create_pkg.create_env_model import create_env_model
 from gops.utils.common_utils import get_apprfunc_dict
+from gops.utils.micro_batch import MicroBatchAccumulator
+from gops.utils.model_rollout import RolloutCache
 from gops.utils.tensorboard_setup import tb_tags
 from gops.algorithm.base import AlgorithmBase, ApprBase
 
@@ -80,6 +86,8 @@ class SPIL(AlgorithmBase):
     :param int pev_step: initial policy evaluation step.
     :param int pim_step: initial policy improvement step.
     :param int forward_step: predictive step in virtual horizon.
+    :param float micro_batch_memory: memory budget in MB of model rollout graph, batch is
+        split into micro batches fitting in it and gradient is accumulated. None to disable.
     """
 
     def __init__(
@@ -90,6 +98,7 @@ class SPIL(AlgorithmBase):
         pev_step: int = 1,
         pim_step: int = 1,
         forward_step: int = 25,
+        micro_batch_memory: Optional[float] = None,
         **kwargs: Any,
     ):
         super().__init__(index, **kwargs)
@@ -100,15 +109,18 @@ class SPIL(AlgorithmBase):
         self.pev_step = pev_step
         self.pim_step = pim_step
         self.forward_step = forward_step
+        self.rollout_cache = RolloutCache()
+        self.micro_batch = MicroBatchAccumulator(micro_batch_memory, amp=self.amp)
 
         self.n_constraint = kwargs["constraint_dim"]
-        self.delta_i = np.array([0.0] * kwargs["constraint_dim"])
+        self.delta_i = torch.zeros(kwargs["constraint_dim"])
         self.Kp = 60
         self.Ki = 0.02
         self.Kd = 0
         self.tb_info = dict()
-        self.safe_prob_pre = np.array([0.0] * kwargs["constraint_dim"])
-        self.chance_thre = np.array([0.97] * kwargs["constraint_dim"])
+        self.safe_prob = torch.zeros(kwargs["constraint_dim"])
+        self.safe_prob_pre = torch.zeros(kwargs["constraint_dim"])
+        self.chance_thre = torch.full((kwargs["constraint_dim"],), 0.97)
 
     @property
     def adjustable_parameters(self):
@@ -144,7 +156,8 @@ class SPIL(AlgorithmBase):
     def _update(self, update_list: list):
         tau = self.tau
         for net_name in update_list:
-            self.networks.optimizer_dict[net_name].step()
+            self.amp.step(self.networks.optimizer_dict[net_name])
+        self.amp.update()
 
         with torch.no_grad():
             for net_name in update_list:
@@ -160,16 +173,21 @@ class SPIL(AlgorithmBase):
 
         start_time = time.time()
         self.networks.v.zero_grad()
-        loss_v, v = self._compute_loss_v(deepcopy(data))
-        loss_v.backward()
-        self.tb_info[tb_tags["loss_critic"]] = loss_v.item()
-        self.tb_info[tb_tags["critic_avg_value"]] = v.item()
+        loss_info = self.micro_batch.accumulate(
+            data, partial(self._compute_loss_v, batch=data), "v"
+        )
+        self.safe_prob = loss_info.pop("safe_prob")
         update_list.append("v")
+        # multiplier is updated once with safe probability of the whole batch
+        weight = self._spil_get_weight()
         self.networks.policy.zero_grad()
-        loss_policy = self._compute_loss_policy(deepcopy(data))
-        loss_policy.backward()
-        self.tb_info[tb_tags["loss_actor"]] = loss_policy.item()
+        loss_info.update(
+            self.micro_batch.accumulate(
+                data, partial(self._compute_loss_policy, weight=weight), "policy"
+            )
+        )
         update_list.append("policy")
+        self.tb_info.update({k: v.item() for k, v in loss_info.items()})
 
         end_time = time.time()
 
@@ -177,7 +195,7 @@ class SPIL(AlgorithmBase):
 
         return update_list
 
-    def _compute_loss_v(self, data: dict):
+    def _compute_loss_v(self, data: dict, batch: dict):
         o, a, r, o2, d = (
             data["obs"],
             data["act"],
@@ -186,30 +204,25 @@ class SPIL(AlgorithmBase):
             data["done"],
         )
         v = self.networks.v(o)
-        traj_issafe = torch.ones(o.shape[0], self.n_constraint)
-        info = data
+        # if the whole batch fits in one micro batch, rollout is computed with graph and
+        # reused by policy loss, otherwise policy loss rolls out its own micro batches
+        rollout = self._get_rollout(data, create_graph=data is batch)
 
         with torch.no_grad():
-            for step in range(self.forward_step):
-                if step == 0:
-                    a = self.networks.policy(o)
-                    o2, r, d, info = self.envmodel.forward(o, a, d, info)
-                    r_sum = r
-                    traj_issafe *= info["constraint"] <= 0
-
-                else:
-                    o = o2
-                    a = self.networks.policy(o)
-                    o2, r, d, info = self.envmodel.forward(o, a, d, info)
-                    r_sum += self.gamma**step * r
-                    traj_issafe *= info["constraint"] <= 0
-
-            r_sum += self.gamma**self.forward_step * self.networks.v_target(o2)
+            # a trajectory is safe if all constraints are satisfied at all steps
+            traj_issafe = (rollout.constraints <= 0).all(0)
+            r_sum = rollout.ret + self.gamma**self.forward_step * self.networks.v_target(
+                rollout.last_obs
+            )
         loss_v = ((v - r_sum) ** 2).mean()
-        self.safe_prob = traj_issafe.mean(0).numpy()
-        return loss_v, torch.mean(v)
-
-    def _compute_loss_policy(self, data: dict):
+        loss_info = {
+            tb_tags["loss_critic"]: loss_v,
+            tb_tags["critic_avg_value"]: torch.mean(v),
+            "safe_prob": traj_issafe.float().mean(0),
+        }
+        return loss_v, loss_info
+
+    def _compute_loss_policy(self, data: dict, weight: Tuple[torch.Tensor, torch.Tensor]):
         o, a, r, c, o2, d = (
             data["obs"],
             data["act"],
@@ -229,38 +242,37 @@ class SPIL(AlgorithmBase):
             )
             return sig
 
-        info = data
-        for step in range(self.forward_step):
-            if step == 0:
-                a = self.networks.policy(o)
-                o2, r, d, info = self.envmodel.forward(o, a, d, info)
-                c = info["constraint"]
-                c = Phi(c)
-                r_sum = r
-                c_sum = c
-                c_mul = c
-            else:
-                o = o2
-                a = self.networks.policy(o)
-                o2, r, d, info = self.envmodel.forward(o, a, d, info)
-                c = info["constraint"]
-                c = Phi(c)
-                r_sum = r_sum + self.gamma**step * r
-                c_sum = c_sum + c
-                c_mul = c_mul * c
-        w_r, w_c = self._spil_get_weight()
-        loss_pi = (w_r * r_sum + (c_mul * torch.Tensor(w_c)).sum(1)).mean()
-        return -loss_pi
+        rollout = self._get_rollout(data, create_graph=True)
+        c_mul = torch.prod(Phi(rollout.constraints), 0)
+        w_r, w_c = weight
+        loss_pi = -(w_r * rollout.ret + (c_mul * w_c).sum(1)).mean()
+        return loss_pi, {tb_tags["loss_actor"]: loss_pi}
+
+    def _get_rollout(self, data: dict, create_graph: bool):
+        return self.rollout_cache.get(
+            data,
+            self.networks.policy,
+            self.amp.fp32(self.envmodel.forward),
+            self.forward_step,
+            self.gamma,
+            create_graph=create_graph,
+        )
 
     def _spil_get_weight(self):
+        # PID states are kept on the device of safe probability, without syncing to CPU
+        device = self.safe_prob.device
+        self.chance_thre = self.chance_thre.to(device)
+        self.delta_i = self.delta_i.to(device)
+        self.safe_prob_pre = self.safe_prob_pre.to(device)
+
         delta_p = self.chance_thre - self.safe_prob
         # integral separation
-        delta_p_sepa = np.where(np.abs(delta_p) > 0.1, delta_p * 0.7, delta_p)
-        delta_p_sepa = np.where(np.abs(delta_p) > 0.2, delta_p * 0, delta_p_sepa)
-        self.delta_i = np.clip(self.delta_i + delta_p_sepa, 0, 99999)
+        delta_p_sepa = torch.where(torch.abs(delta_p) > 0.1, delta_p * 0.7, delta_p)
+        delta_p_sepa = torch.where(torch.abs(delta_p) > 0.2, delta_p * 0, delta_p_sepa)
+        self.delta_i = torch.clamp(self.delta_i + delta_p_sepa, 0, 99999)
 
-        delta_d = np.clip(self.safe_prob_pre - self.safe_prob, 0, 3333)
-        lam = np.clip(
+        delta_d = torch.clamp(self.safe_prob_pre - self.safe_prob, 0, 3333)
+        lam = torch.clamp(
             self.Ki * self.delta_i + self.Kp * delta_p + self.Kd * delta_d, 0, 3333
         )
         self.safe_prob_pre = self.safe_prob
@@ -11,6 +11,7 @@
 #             Addressing function approximation error in actor-critic methods. 
 #             ICML, Stockholm, Sweden.
 #  Update: 2021-03-05, Wenxuan Wang: create TD3 algorithm
+#  Update: 2026-10-19, iDLab: mixed precision training
 
 __all__ = ["ApproxContainer", "TD3"]
 
@@ -120,8 +121,9 @@ class TD3(AlgorithmBase):
                 data["obs2"],
                 data["done"],
             )
-            loss_q, loss_q1, loss_q2 = self._compute_loss_q(o, a, r, o2, d)
-            loss_q.backward()
+            with self.amp.autocast():
+                loss_q, loss_q1, loss_q2 = self._compute_loss_q(o, a, r, o2, d)
+            self.amp.backward(loss_q)
         else:
             o, a, r, o2, d, idx, weight = (
                 data["obs"],
@@ -132,18 +134,20 @@ class TD3(AlgorithmBase):
                 data["idx"],
                 data["weight"],
             )
-            loss_q, loss_q1, loss_q2, abs_err = self._compute_loss_q_per(
-                o, a, r, o2, d, idx, weight
-            )
-            loss_q.backward()
+            with self.amp.autocast():
+                loss_q, loss_q1, loss_q2, abs_err = self._compute_loss_q_per(
+                    o, a, r, o2, d, idx, weight
+                )
+            self.amp.backward(loss_q)
 
         for p in self.networks.q1.parameters():
             p.requires_grad = False
         for p in self.networks.q2.parameters():
             p.requires_grad = False
 
-        loss_policy = self._compute_loss_pi(o)
-        loss_policy.backward()
+        with self.amp.autocast():
+            loss_policy = self._compute_loss_pi(o)
+        self.amp.backward(loss_policy)
 
         for p in self.networks.q1.parameters():
             p.requires_grad = True
@@ -227,11 +231,12 @@ class TD3(AlgorithmBase):
         return -q1_pi.mean()
 
     def _update(self, iteration):
-        self.networks.q1_optimizer.step()
-        self.networks.q2_optimizer.step()
+        self.amp.step(self.networks.q1_optimizer)
+        self.amp.step(self.networks.q2_optimizer)
 
         if iteration % self.delay_update == 0:
-            self.networks.policy_optimizer.step()
+            self.amp.step(self.networks.policy_optimizer)
+        self.amp.update()
 
         with torch.no_grad():
             polyak = 1 - self.tau
@@ -12,12 +12,12 @@
 #             ICML, Lille, France.
 #  Update: 2021-03-05, Yuxuan Jiang: create TRPO algorithm
 #  Update: 2023-03-01, Xujie Song: add advantage normalization
+#  Update: 2026-10-19, iDLab: reuse KL gradient graph and batch line search
 
 
 __all__ = ["TRPO"]
 
 import time
-from copy import deepcopy
 from typing import Callable, Tuple
 
 import torch
@@ -25,6 +25,7 @@ import torch.nn as nn
 import torch.nn.functional as F
 from torch.optim import Adam
 import torch.autograd
+from torch.func import functional_call, vmap
 
 from gops.algorithm.base import AlgorithmBase, ApprBase
 from gops.create_pkg.create_apprfunc import create_apprfunc
@@ -133,67 +134,48 @@ class TRPO(AlgorithmBase):
         def get_surrogate_advantage(logp: torch.Tensor):
             return torch.mean(torch.exp(logp - logp_old) * adv)
 
-        logits = self.networks.policy(obs)
+        policy = self.networks.policy
+        params = list(policy.parameters())
+        logits = policy(obs)
         pi = self.networks.create_action_distributions(logits=logits)
         surrogate_advantage = get_surrogate_advantage(pi.log_prob(act))
-        g_params = torch.autograd.grad(
-            surrogate_advantage, self.networks.policy.parameters(), retain_graph=True
+        g_vec = self._flatten(
+            torch.autograd.grad(surrogate_advantage, params, retain_graph=True)
         )
-        # FIXME: CNN layer's g would be non-contiguous, needing further investigation
-        # Current workaround is making sure it's contiguous
-        # See also: Two more `contiguous` in `hvp`
-        g_params = [g_param.contiguous() for g_param in g_params]
-        g_vec = nn.utils.convert_parameters.parameters_to_vector(g_params)
         x0_vec = torch.zeros_like(g_vec)
         d_kl = pi.kl_divergence(pi_old).mean()
-
-        def hvp(f: torch.Tensor, x: torch.Tensor):
-            g_params = torch.autograd.grad(
-                f, self.networks.policy.parameters(), create_graph=True
-            )
-            g_params = [g_param.contiguous() for g_param in g_params]
-            g_vec = nn.utils.convert_parameters.parameters_to_vector(g_params)
-            hvp_params = torch.autograd.grad(
-                torch.dot(g_vec, x),
-                self.networks.policy.parameters(),
-                retain_graph=True,
-            )
-            hvp_params = [hvp_param.contiguous() for hvp_param in hvp_params]
-            return nn.utils.convert_parameters.parameters_to_vector(hvp_params)
-
-        def cg_func(x: torch.Tensor):
-            return hvp(d_kl, x).add_(x, alpha=self.damping_factor)
-
+        cg_func = self._fisher_vector_product(d_kl, params)
         x_vec, _ = self._conjugate_gradient(
             cg_func, g_vec, x0_vec, self.rtol, self.atol, self.max_cg
         )
 
-        weight_old = nn.utils.convert_parameters.parameters_to_vector(
-            self.networks.policy.parameters()
-        )
-        new_policy = self._create_new_policy()
+        weight_old = self._flatten([p.detach() for p in params])
         trpo_step = (
             torch.sqrt(2 * self.delta / (torch.dot(g_vec, x_vec) + EPSILON)) * x_vec
         )
+        step_sizes = self.alpha ** torch.arange(
+            self.max_search, dtype=weight_old.dtype, device=weight_old.device
+        )
+        weight_new = weight_old + step_sizes.unsqueeze(1) * trpo_step
 
-        def update_policy(alpha: float):
-            weight_new = weight_old.add(trpo_step, alpha=alpha)
-            nn.utils.convert_parameters.vector_to_parameters(
-                weight_new, new_policy.parameters()
-            )
-
-        for i in range(self.max_search):
-            update_policy(self.alpha**i)
-            logits_new = new_policy(obs)
-            pi_new = self.networks.create_action_distributions(logits=logits_new)
-            logp_new = pi_new.log_prob(act)
-
-            if (
-                get_surrogate_advantage(logp_new) > 0
-                and pi_new.kl_divergence(pi_old).mean() < self.delta
-            ):
-                self.networks.policy.load_state_dict(new_policy.state_dict())
-                break
+        # The full step is tried alone since it is accepted most of the time,
+        # the remaining backtracking candidates are evaluated in one batched forward.
+        weight_accepted = None
+        with torch.no_grad():
+            for candidates in (weight_new[:1], weight_new[1:]):
+                if candidates.shape[0] == 0:
+                    break
+                logits_new = self._batched_policy_forward(candidates, obs)
+                pi_new = self.networks.create_action_distributions(logits=logits_new)
+                logp_new = pi_new.log_prob(act)
+                surrogate_new = torch.mean(torch.exp(logp_new - logp_old) * adv, dim=-1)
+                kl_new = pi_new.kl_divergence(pi_old).mean(dim=-1)
+                accepted = torch.nonzero((surrogate_new > 0) & (kl_new < self.delta))
+                if accepted.numel() > 0:
+                    weight_accepted = candidates[accepted[0, 0]]
+                    break
+        if weight_accepted is not None:
+            nn.utils.convert_parameters.vector_to_parameters(weight_accepted, params)
         else:
             print("fail to improve policy!")
 
@@ -216,11 +198,56 @@ class TRPO(AlgorithmBase):
         tb_info[tb_tags["loss_actor"]] = -surrogate_advantage.item()
         return tb_info
 
-    def _create_new_policy(self):
-        new_policy = deepcopy(self.networks.policy)
-        for p in new_policy.parameters():
-            p.requires_grad_(False)
-        return new_policy
+    @staticmethod
+    def _flatten(tensors) -> torch.Tensor:
+        # reshape also handles non-contiguous gradients of CNN layers
+        return torch.cat([t.reshape(-1) for t in tensors])
+
+    def _fisher_vector_product(
+        self, d_kl: torch.Tensor, params: list
+    ) -> Callable[[torch.Tensor], torch.Tensor]:
+        """Function computing damped Fisher-vector product, i.e. hessian of KL
+        divergence w.r.t. parameters times x, plus damping_factor * x.
+
+        KL gradient graph is built once and reused by every Fisher-vector product.
+        """
+        kl_grad_vec = self._flatten(
+            torch.autograd.grad(d_kl, params, create_graph=True)
+        )
+
+        def cg_func(x: torch.Tensor):
+            fvp = self._flatten(
+                torch.autograd.grad(kl_grad_vec, params, x, retain_graph=True)
+            )
+            return fvp.add_(x, alpha=self.damping_factor)
+
+        return cg_func
+
+    def _batched_policy_forward(
+        self, weights: torch.Tensor, obs: torch.Tensor
+    ) -> torch.Tensor:
+        """Policy forward with stacked parameter vectors.
+
+        Args:
+            weights: Stacked parameter vectors, shape (N, S)
+            obs: Observations, shape (B, ...)
+
+        Returns:
+            Logits of each parameter set, shape (N, B, ...)
+        """
+        stacked_params = {}
+        offset = 0
+        for name, param in self.networks.policy.named_parameters():
+            numel = param.numel()
+            stacked_params[name] = weights[:, offset : offset + numel].reshape(
+                -1, *param.shape
+            )
+            offset += numel
+
+        def forward(params):
+            return functional_call(self.networks.policy, params, (obs,))
+
+        return vmap(forward)(stacked_params)
 
     @staticmethod
     def _conjugate_gradient(
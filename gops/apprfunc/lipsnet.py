@@ -8,6 +8,7 @@
 #
 #  Description: LipsNet
 #  Update: 2023-06-14, Xujie Song: create LipsNet function
+#  Update: 2026-10-19, iDLab: add analytic single-pass Jacobian norm
 
 
 __all__ = [
@@ -75,16 +76,47 @@ class Lips_K(nn.Module):
             return F.softplus(self.K).repeat(x.shape[0]).unsqueeze(1)
 
 
+# Derivative of an elementwise activation, given its input z and output y.
+# Return None for identity, and NotImplemented for unsupported activations.
+def activation_grad(act, z, y):
+    if isinstance(act, nn.Identity):
+        return None
+    elif isinstance(act, nn.ReLU):
+        return (z > 0).to(z.dtype)
+    elif isinstance(act, nn.LeakyReLU):
+        return torch.where(z > 0, torch.ones_like(z), torch.full_like(z, act.negative_slope))
+    elif isinstance(act, nn.Tanh):
+        return 1 - y ** 2
+    elif isinstance(act, nn.Sigmoid):
+        return y * (1 - y)
+    elif isinstance(act, nn.ELU):
+        return torch.where(z > 0, torch.ones_like(z), y + act.alpha)
+    elif isinstance(act, nn.SELU):
+        # scale = 1.0507..., alpha = 1.6732... as defined in torch.nn.SELU
+        scale, alpha = 1.0507009873554804934193349852946, 1.6732632423543772848170429916717
+        return torch.where(z > 0, torch.full_like(z, scale), y + scale * alpha)
+    elif isinstance(act, nn.GELU) and act.approximate == "none":
+        cdf = 0.5 * (1 + torch.erf(z / np.sqrt(2)))
+        pdf = torch.exp(-0.5 * z ** 2) / np.sqrt(2 * np.pi)
+        return cdf + z * pdf
+    elif isinstance(act, nn.Softplus):
+        return torch.where(z * act.beta > act.threshold, torch.ones_like(z), torch.sigmoid(z * act.beta))
+    return NotImplemented
+
+
 # Define MLP function through MGN
 class LipsNet(nn.Module):
+    """
+    jac_type: method to compute Jacobian of mlp w.r.t. its input.
+        "analytic": chain layer-wise Jacobians in the same pass that computes the output,
+                    falls back to "jacrev" if an activation is not supported.
+        "jacrev": functorch vmap(jacrev(mlp)), requires 1.12 <= PyTorch version <= 2.2.
+    """
     def __init__(self, sizes, activation, output_activation=nn.Identity,
                  lips_init_value=100, eps=1e-5, lips_auto_adjust=True,
                  loss_lambda=0.1,
-                 local_lips=False, lips_hidden_sizes=None) -> None:
+                 local_lips=False, lips_hidden_sizes=None, jac_type="analytic") -> None:
         super().__init__()
-        # display PyTorch version
-        print("Your PyTorch version is", torch.__version__)
-        print("To use LipsNet, the PyTorch version must be >=1.12 and <=2.2")
 
         # declare network
         layers = []
@@ -93,6 +125,19 @@ class LipsNet(nn.Module):
                        activation()]
         layers += [nn.Linear(sizes[-2], sizes[-1]), output_activation()]
         self.mlp = nn.Sequential(*layers)
+        # choose Jacobian computation method
+        assert jac_type in ("analytic", "jacrev")
+        if jac_type == "analytic":
+            probe = torch.zeros(1)
+            for layer in self.mlp[1::2]:
+                if activation_grad(layer, probe, layer(probe)) is NotImplemented:
+                    jac_type = "jacrev"
+                    break
+        self.jac_type = jac_type
+        if jac_type == "jacrev":
+            # display PyTorch version
+            print("Your PyTorch version is", torch.__version__)
+            print("To use LipsNet with jacrev, the PyTorch version must be >=1.12 and <=2.2")
         # init weight
         for i in range(len(self.mlp)):
                 if isinstance(self.mlp[i], nn.Linear):
@@ -126,14 +171,16 @@ class LipsNet(nn.Module):
             # L2 loss
             self.regular_loss += self.loss_lambda * (K_value ** 2).mean()
         
-        # forward process
-        f_out = self.mlp(x)
-        # calcute jac matrix
-        if K_value.requires_grad:
-            jacobi = vmap(jacrev(self.mlp))(x)
+        # forward process and jac matrix
+        if self.jac_type == "analytic":
+            f_out, jacobi = self.forward_with_jacobian(x)
         else:
-            with torch.no_grad():
+            f_out = self.mlp(x)
+            if K_value.requires_grad:
                 jacobi = vmap(jacrev(self.mlp))(x)
+            else:
+                with torch.no_grad():
+                    jacobi = vmap(jacrev(self.mlp))(x)
         # jacobi.dim: (x.shape[0], f_out.shape[1], x.shape[1])
         #             (batch     , f output dim  , x intput dim)
         # calcute jac norm
@@ -142,10 +189,44 @@ class LipsNet(nn.Module):
         f_out_Lips = K_value * f_out / (norm + self.eps)
         # f_out_Lips = self.K_record * f_out / (norm + f_out.abs())
         return f_out_Lips
-    
+
+    def forward_with_jacobian(self, x):
+        # mlp output and its Jacobian J = D_n W_n ... D_1 W_1 in a single pass,
+        # where D_i is the diagonal derivative of the i-th activation.
+        # No extra graph is built under torch.no_grad(), e.g. in sampler and evaluator.
+        weights, grads = [], []
+        out = x
+        for layer in self.mlp:
+            z = out
+            out = layer(z)
+            if isinstance(layer, nn.Linear):
+                weights.append(layer.weight)
+            else:
+                grads.append(activation_grad(layer, z, out))
+        # contract the chain from its narrower end
+        if x.shape[1] <= out.shape[1]:
+            jacobi = weights[0].expand(x.shape[0], -1, -1)
+            for i in range(len(weights)):
+                if i > 0:
+                    jacobi = torch.matmul(weights[i], jacobi)
+                if grads[i] is not None:
+                    jacobi = grads[i].unsqueeze(2) * jacobi
+        else:
+            jacobi = weights[-1].expand(x.shape[0], -1, -1)
+            if grads[-1] is not None:
+                jacobi = grads[-1].unsqueeze(2) * jacobi
+            for i in reversed(range(len(weights) - 1)):
+                if grads[i] is not None:
+                    jacobi = jacobi * grads[i].unsqueeze(1)
+                jacobi = torch.matmul(jacobi, weights[i])
+        return out, jacobi
+
+
 def backward_hook(module, gout):
-    module.regular_loss.backward(retain_graph=True)
-    module.regular_loss = 0
+    # the loss is already consumed if the module output is backpropagated more than once
+    if torch.is_tensor(module.regular_loss):
+        module.regular_loss.backward(retain_graph=True)
+        module.regular_loss = 0
     return gout
 
 
@@ -176,6 +257,7 @@ class DetermPolicy(nn.Module, Action_Distribution):
             lips_hidden_sizes = [obs_dim] + list(lips_hidden_sizes) + [1]
         
         eps = kwargs.get("eps", 1e-4)
+        jac_type = kwargs.get("jac_type", "analytic")
 
         loss_lambda = kwargs["lambda"]
         assert loss_lambda is not None
@@ -199,7 +281,8 @@ class DetermPolicy(nn.Module, Action_Distribution):
                 lips_auto_adjust,
                 loss_lambda,
                 local_lips,
-                lips_hidden_sizes
+                lips_hidden_sizes,
+                jac_type
         )
 
         self.register_buffer("act_high_lim", torch.from_numpy(kwargs["act_high_lim"]))
@@ -266,6 +349,7 @@ class StochaPolicy(nn.Module, Action_Distribution):
             lips_hidden_sizes = [obs_dim] + list(lips_hidden_sizes) + [1]
         
         eps = kwargs.get("eps", 1e-4)
+        jac_type = kwargs.get("jac_type", "analytic")
 
         loss_lambda = kwargs["lambda"]
         assert loss_lambda is not None
@@ -288,7 +372,8 @@ class StochaPolicy(nn.Module, Action_Distribution):
                 lips_auto_adjust,
                 loss_lambda,
                 local_lips,
-                lips_hidden_sizes
+                lips_hidden_sizes,
+                jac_type
             )
             self.log_std = mlp(
                 pi_sizes,
@@ -306,7 +391,8 @@ class StochaPolicy(nn.Module, Action_Distribution):
                 lips_auto_adjust,
                 loss_lambda,
                 local_lips,
-                lips_hidden_sizes
+                lips_hidden_sizes,
+                jac_type
             )
             self.log_std = nn.Parameter(torch.zeros(1, act_dim)) # not used
         elif self.std_type == "parameter":
@@ -320,7 +406,8 @@ class StochaPolicy(nn.Module, Action_Distribution):
                 lips_auto_adjust,
                 loss_lambda,
                 local_lips,
-                lips_hidden_sizes
+                lips_hidden_sizes,
+                jac_type
             )
             self.log_std = nn.Parameter(torch.zeros(1, act_dim))
 
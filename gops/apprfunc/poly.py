@@ -8,6 +8,7 @@
 #
 #  Description: Structural definition for approximation function
 #  Update: 2021-03-05, Wenjun Zou: create poly function
+#  Update: 2026-10-19, iDLab: generate unique monomials by index table
 
 __all__ = [
     "DetermPolicy",
@@ -22,66 +23,52 @@ __all__ = [
 import numpy as np
 import torch
 import torch.nn as nn
+from functools import lru_cache
+from itertools import combinations_with_replacement
 from math import factorial
 from gops.utils.act_distribution_cls import Action_Distribution
 
 
-# Define polynomial function
-# TODO: More concise
-def make_features(x, degree):
-    def n_matmul(x, n):
-        def matmul_crossing(a, b):
-            batchsize = a.size(0)
-            return torch.matmul(
-                torch.transpose(a.unsqueeze(1), -1, -2), b.unsqueeze(1)
-            ).reshape(batchsize, -1)
+# Index table of unique monomials in input_dim variables with min_degree <= order <= degree.
+# Each row holds degree factor indices, and index input_dim stands for constant 1.
+@lru_cache(maxsize=None)
+def monomial_index(input_dim, degree, min_degree=1):
+    rows = []
+    for d in range(min_degree, degree + 1):
+        for comb in combinations_with_replacement(range(input_dim), d):
+            rows.append(list(comb) + [input_dim] * (degree - d))
+    return torch.tensor(rows, dtype=torch.long).reshape(-1, degree)
+
 
-        a = x
-        b = x
-        if n == 0:
-            return torch.ones_like(a)
-        for _ in range(n - 1):
-            a = matmul_crossing(a, b)
-        return a
+# Compute monomials in one gather and product
+def gather_monomials(x, index):
+    x = torch.cat((x, torch.ones_like(x[:, :1])), 1)
+    return x[:, index.to(x.device)].prod(-1)
 
-    return torch.cat([n_matmul(x, i) for i in range(1, degree + 1)], 1)
+
+# Define polynomial function
+# Features are unique monomials of order 1 to degree, sorted by order
+def make_features(x, degree):
+    return gather_monomials(x, monomial_index(x.shape[1], degree))
 
 
 # input_dim: dimention of state, degree: degree of polynomial function
 # return dimention of feature
 def get_features_dim(input_dim, degree):
-    x = torch.zeros([1, input_dim])
-    return make_features(x, degree).size(1)
+    return monomial_index(input_dim, degree).shape[0]
 
 
 def combination(m, n):
     return int(factorial(m) / (factorial(n) * factorial(m - n)))
 
 
+# Features are unique monomials of order exactly degree
 def create_features(x, degree=2):
-    batch = x.shape[0]
-    obs_dim = x.shape[1]
-    if degree == 2:
-        features_dim = combination(degree + obs_dim - 1, degree)
-    else:
-        raise ValueError("Not set degree properly")
-    features = torch.zeros((batch, features_dim))
-
-    if degree == 2:
-        k = 0
-        for i in range(0, obs_dim):
-            for j in range(i, obs_dim):
-                features[:, k : k + 1] = torch.mul(x[:, i : i + 1], x[:, j : j + 1])
-                k = k + 1
-    else:
-        raise ValueError("Not set degree properly")
-
-    return features
+    return gather_monomials(x, monomial_index(x.shape[1], degree, degree))
 
 
 def count_features_dim(input_dim, degree):
-    x = torch.zeros([1, input_dim])
-    return create_features(x, degree).size(1)
+    return combination(degree + input_dim - 1, degree)
 
 
 class DetermPolicy(nn.Module, Action_Distribution):
@@ -265,7 +252,3 @@ if __name__ == "__main__":
     obs = torch.tensor([[0, 1, 2, 3], [0, 1, 2, 3]])
     print(make_features(obs, 1))
 
-
-if __name__ == "__main__":
-    obs = torch.tensor([[0, 1, 2, 3], [0, 1, 2, 3]])
-    print(make_features(obs, 1))
@@ -8,6 +8,7 @@
 #
 #  Description: Recurrent Neural Network (RNN)
 #  Update: 2021-03-05, Wenjun Zou: create RNN function
+#  Update: 2026-10-19, iDLab: recurrent execution of policies with hidden state
 
 
 __all__ = [
@@ -35,10 +36,58 @@ def mlp(sizes, activation, output_activation=nn.Identity):
     return nn.Sequential(*layers)
 
 
-class DetermPolicy(nn.Module, Action_Distribution):
+def frame_dim(obs_dim):
+    """Dimension of one observation frame, of a window (window_length, dim) or a frame."""
+    return obs_dim if np.isscalar(obs_dim) else obs_dim[-1]
+
+
+class RecurrentPolicy:
+    """Execution of policies with an rnn encoder.
+
+    Called with an observation window of shape [B, T, dim], policy reruns rnn over
+    the whole window from zero hidden state. In recurrent execution, hidden state is
+    carried between calls of :meth:`step`, and each call only consumes the latest
+    frame, so per step cost does not depend on window length. Hidden state carried
+    over an episode differs from the zero hidden state of windows, so recurrent
+    execution is only allowed for algorithms training on sequences (see
+    SequenceReplayBuffer), which warm up hidden state on burn-in steps with
+    :meth:`forward_sequence`.
+
+    Subclasses define ``rnn`` and ``head``, mapping rnn output to policy output.
+    """
+
+    recurrent = False
+
+    def init_hidden(self, batch_size: int, device=None) -> torch.Tensor:
+        return torch.zeros(
+            self.rnn.num_layers, batch_size, self.rnn.hidden_size, device=device
+        )
+
+    def step(self, obs, hidden=None):
+        """Advance hidden state by one frame [B, dim], or the latest frame of a
+        window [B, T, dim], and return policy output and new hidden state.
+        """
+        if obs.dim() == 3:
+            obs = obs[:, -1]
+        out, hidden = self.rnn(obs.unsqueeze(1), hidden)
+        return self.head(out[:, 0]), hidden
+
+    def forward_sequence(self, obs_seq, hidden=None):
+        """Policy outputs at all steps of sequences [B, L, dim] and final hidden state."""
+        out, hidden = self.rnn(obs_seq, hidden)
+        return self.head(out), hidden
+
+    def forward(self, obs):
+        if obs.dim() == 2:
+            obs = obs.unsqueeze(1)
+        out, _ = self.rnn(obs)
+        return self.head(out[:, -1])
+
+
+class DetermPolicy(RecurrentPolicy, nn.Module, Action_Distribution):
     def __init__(self, **kwargs):
         super().__init__()
-        obs_dim = kwargs["obs_dim"][1]
+        obs_dim = frame_dim(kwargs["obs_dim"])
         act_dim = kwargs["act_dim"]
         action_high_limit = kwargs["act_high_lim"]
         action_low_limit = kwargs["act_low_lim"]
@@ -53,11 +102,11 @@ class DetermPolicy(nn.Module, Action_Distribution):
         self.register_buffer("act_high_lim", torch.from_numpy(action_high_limit))
         self.register_buffer("act_low_lim", torch.from_numpy(action_low_limit))
         self.action_distribution_cls = kwargs["action_distribution_cls"]
+        self.recurrent = kwargs.get("recurrent", False)
 
-    def forward(self, obs):
-        _, h = self.rnn(obs)
+    def head(self, h):
         action = (self.act_high_lim - self.act_low_lim) / 2 * torch.tanh(
-            self.pi(h.squeeze(0))
+            self.pi(h)
         ) + (self.act_high_lim + self.act_low_lim) / 2
         return action
 
@@ -65,15 +114,43 @@ class DetermPolicy(nn.Module, Action_Distribution):
 class FiniteHorizonPolicy(nn.Module, Action_Distribution):
     """
     Approximated function of deterministic policy for finite-horizon.
-    Input: observation, time step.
+    Input: observation window, time step.
     Output: action.
     """
 
     def __init__(self, **kwargs):
-        raise NotImplementedError
+        super().__init__()
+        obs_dim = frame_dim(kwargs["obs_dim"])
+        act_dim = kwargs["act_dim"]
+        hidden_sizes = kwargs["hidden_sizes"]
+        action_high_limit = kwargs["act_high_lim"]
+        action_low_limit = kwargs["act_low_lim"]
+        pi_sizes = [hidden_sizes[0] + 1] + list(hidden_sizes[1:]) + [act_dim]
+        self.rnn = nn.RNN(obs_dim, hidden_sizes[0], 1, batch_first=True)
+        self.pi = mlp(
+            pi_sizes,
+            get_activation_func(kwargs["hidden_activation"]),
+            get_activation_func(kwargs["output_activation"]),
+        )
+        self.register_buffer("act_high_lim", torch.from_numpy(action_high_limit))
+        self.register_buffer("act_low_lim", torch.from_numpy(action_low_limit))
+        self.action_distribution_cls = kwargs["action_distribution_cls"]
+
+    def forward(self, obs, virtual_t=1):
+        if obs.dim() == 2:
+            obs = obs.unsqueeze(1)
+        _, h = self.rnn(obs)
+        h = h.squeeze(0)
+        virtual_t = virtual_t * torch.ones(
+            size=[h.shape[0], 1], dtype=torch.float32, device=h.device
+        )
+        action = (self.act_high_lim - self.act_low_lim) / 2 * torch.tanh(
+            self.pi(torch.cat((h, virtual_t), 1))
+        ) + (self.act_high_lim + self.act_low_lim) / 2
+        return action
 
 
-class StochaPolicy(nn.Module, Action_Distribution):
+class StochaPolicy(RecurrentPolicy, nn.Module, Action_Distribution):
     """
     Approximated function of stochastic policy.
     Input: observation.
@@ -82,7 +159,7 @@ class StochaPolicy(nn.Module, Action_Distribution):
 
     def __init__(self, **kwargs):
         super().__init__()
-        obs_dim = kwargs["obs_dim"][1]
+        obs_dim = frame_dim(kwargs["obs_dim"])
         act_dim = kwargs["act_dim"]
         hidden_sizes = kwargs["hidden_sizes"]
         action_high_limit = kwargs["act_high_lim"]
@@ -105,10 +182,9 @@ class StochaPolicy(nn.Module, Action_Distribution):
         )
         self.register_buffer("act_high_lim", torch.from_numpy(action_high_limit))
         self.register_buffer("act_low_lim", torch.from_numpy(action_low_limit))
+        self.recurrent = kwargs.get("recurrent", False)
 
-    def forward(self, obs):
-        _, h = self.rnn(obs)
-        h = h.squeeze(0)
+    def head(self, h):
         action_mean = self.mean(h)
         action_std = torch.clamp(
             self.log_std(h), self.min_log_std, self.max_log_std
@@ -125,7 +201,7 @@ class ActionValue(nn.Module, Action_Distribution):
 
     def __init__(self, **kwargs):
         super().__init__()
-        obs_dim = kwargs["obs_dim"][1]
+        obs_dim = frame_dim(kwargs["obs_dim"])
         act_dim = kwargs["act_dim"]
         hidden_sizes = kwargs["hidden_sizes"]
         self.rnn = nn.RNN(obs_dim, hidden_sizes[0], 1, batch_first=True)
@@ -151,7 +227,7 @@ class ActionValueDis(nn.Module, Action_Distribution):
 
     def __init__(self, **kwargs):
         super().__init__()
-        obs_dim = kwargs["obs_dim"][1]
+        obs_dim = frame_dim(kwargs["obs_dim"])
         act_num = kwargs["act_dim"]
         hidden_sizes = kwargs["hidden_sizes"]
         self.rnn = nn.RNN(obs_dim, hidden_sizes[0], 1, batch_first=True)
@@ -176,7 +252,7 @@ class StateValue(nn.Module, Action_Distribution):
 
     def __init__(self, **kwargs):
         super().__init__()
-        obs_dim = kwargs["obs_dim"][1]
+        obs_dim = frame_dim(kwargs["obs_dim"])
         hidden_sizes = kwargs["hidden_sizes"]
         self.rnn = nn.RNN(obs_dim, hidden_sizes[0], 1, batch_first=True)
         self.v = mlp(
@@ -8,6 +8,7 @@
 
 #  Description: Create environments
 #  Update Date: 2020-11-10, Yuhang Zhang: add create environments code
+#  Update Date: 2026-10-19, iDLab: add batched model vector env
 
 import importlib
 import os
@@ -18,8 +19,10 @@ import gym
 import gymnasium
 import numpy as np
 from gym.wrappers.time_limit import TimeLimit
+from gops.create_pkg.create_env_model import create_env_model
 from gops.env.vector.sync_vector_env import SyncVectorEnv
 from gops.env.vector.async_vector_env import AsyncVectorEnv
+from gops.env.vector.batched_model_vector_env import BatchedModelVectorEnv
 from gops.env.wrapper.action_repeat import ActionRepeatData
 from gops.env.wrapper.convert_type import ConvertType
 from gops.env.wrapper.gym2gymnasium import Gym2Gymnasium
@@ -100,6 +103,10 @@ def create_env(
         if all corresponding parameters are set to None.
 
     :param env: original data type environment.
+    :param Optional[int] vector_env_num: number of sub-environments of vector environment.
+    :param Optional[str] vector_env_type: type of vector environment, "sync", "async" or
+        "batched_model". "batched_model" steps all sub-environments in one batch with the
+        environment model, and only supports environments in env_gen_ocp.
     :param Optional[int] max_episode_steps: parameter for gym.wrappers.time_limit.TimeLimit wrapper.
         if it is set to None but environment has 'max_episode_steps' attribute, it will be filled in
         TimeLimit wrapper alternatively.
@@ -180,6 +187,34 @@ def create_env(
             env = SyncVectorEnv(env_fns)
         elif vector_env_type == "async":
             env = AsyncVectorEnv(env_fns)
+        elif vector_env_type == "batched_model":
+            if obs_noise_type is not None:
+                raise ValueError(
+                    "Observation noise is not supported by batched_model vector env!"
+                )
+            def model_fn():
+                return create_env_model(
+                    env_id,
+                    reward_shift=reward_shift,
+                    reward_scale=reward_scale,
+                    obs_shift=obs_shift,
+                    obs_scale=obs_scale,
+                    clip_obs=False,
+                    mask_at_done=False,
+                    repeat_num=repeat_num,
+                    sum_reward=sum_reward,
+                    action_scale=action_scale,
+                    min_action=min_action,
+                    max_action=max_action,
+                    **kwargs,
+                )
+
+            env = BatchedModelVectorEnv(
+                env_fns,
+                model_fn,
+                max_episode_steps=max_episode_steps,
+                reward_scale=1.0 if reward_scale is None else reward_scale,
+            )
         else:
             raise ValueError(f"Invalid vector_env_type {vector_env_type}!")
 
@@ -13,6 +13,7 @@ class RefTrajContext(Context):
         dt: float = 0.1,
         path_param: Optional[Dict[str, Dict]] = None,
         speed_param: Optional[Dict[str, Dict]] = None,
+        buffer_steps: int = 200,
     ):
         self.ref_traj = MultiRefTrajData(
             path_param=path_param,
@@ -20,6 +21,11 @@ class RefTrajContext(Context):
         )
         self.pre_horizon = pre_horizon
         self.dt = dt
+        # Reference points are precomputed on the dt grid for the next
+        # buffer_steps steps, and the reference window is a view of them.
+        self.buffer_steps = buffer_steps
+        self.ref_buffer = None
+        self.ref_head = 0
         self.state = None
 
     def reset(
@@ -29,57 +35,37 @@ class RefTrajContext(Context):
         path_num: int,
         speed_num: int,
     ) -> ContextState[np.ndarray]:
-        ref_points = []
-        for i in range(2 * self.pre_horizon + 1):
-            ref_x = self.ref_traj.compute_x(
-                ref_time + i * self.dt, path_num, speed_num
-            )
-            ref_y = self.ref_traj.compute_y(
-                ref_time + i * self.dt, path_num, speed_num
-            )
-            ref_phi = self.ref_traj.compute_phi(
-                ref_time + i * self.dt, path_num, speed_num
-            )
-            ref_u = self.ref_traj.compute_u(
-                ref_time + i * self.dt, path_num, speed_num
-            )
-            ref_points.append([ref_x, ref_y, ref_phi, ref_u])
-        ref_points = np.array(ref_points, dtype=np.float32)
-
-        self.state = ContextState(reference=ref_points)
         self.ref_time = ref_time
         self.path_num = path_num
         self.speed_num = speed_num
+        self._fill_ref_buffer()
+
+        self.state = ContextState(reference=self._get_ref_window())
         return self.state
 
     def step(self) -> ContextState[np.ndarray]:
         self.ref_time = self.ref_time + self.dt
 
-        new_ref_point = np.array([
-            self.ref_traj.compute_x(
-                self.ref_time + 2 * self.pre_horizon * self.dt, 
-                self.path_num, self.speed_num
-            ),
-            self.ref_traj.compute_y(
-                self.ref_time + 2 * self.pre_horizon * self.dt, 
-                self.path_num, self.speed_num
-            ),
-            self.ref_traj.compute_phi(
-                self.ref_time + 2 * self.pre_horizon * self.dt, 
-                self.path_num, self.speed_num
-            ),
-            self.ref_traj.compute_u(
-                self.ref_time + 2 * self.pre_horizon * self.dt, 
-                self.path_num, self.speed_num
-            ),
-        ], dtype=np.float32)
-        ref_points = self.state.reference.copy()
-        ref_points[:-1] = ref_points[1:]
-        ref_points[-1] = new_ref_point
-        self.state.reference = ref_points
+        self.ref_head += 1
+        if self.ref_head + 2 * self.pre_horizon + 1 > self.ref_buffer.shape[0]:
+            self._fill_ref_buffer()
+        # a new view is assigned, so previously returned references stay unchanged
+        self.state.reference = self._get_ref_window()
 
         return self.state
 
+    def _fill_ref_buffer(self):
+        ref_times = self.ref_time + np.arange(
+            2 * self.pre_horizon + 1 + self.buffer_steps
+        ) * self.dt
+        self.ref_buffer = self.ref_traj.compute_ref_points(
+            ref_times, self.path_num, self.speed_num
+        ).astype(np.float32)
+        self.ref_head = 0
+
+    def _get_ref_window(self) -> np.ndarray:
+        return self.ref_buffer[self.ref_head:self.ref_head + 2 * self.pre_horizon + 1]
+
     def get_zero_state(self) -> ContextState[np.ndarray]:
         return ContextState(
             reference=np.zeros((2 * self.pre_horizon + 1, 4), dtype=np.float32),
@@ -1,10 +1,11 @@
 from abc import ABCMeta, abstractmethod
-from typing import Optional, TypeVar, Callable, Sequence
+from typing import Optional, TypeVar, Callable, Sequence, Tuple
 
 import torch
 from torch.types import Device
 
 from gops.env.env_gen_ocp.pyth_base import ContextState, State
+from gops.utils.math_utils import batch_jacobian
 
 S=TypeVar('S', State, ContextState, torch.Tensor)
 
@@ -41,6 +42,17 @@ class RobotModel(Model):
     def get_next_state(self, state: torch.Tensor, action: torch.Tensor) -> torch.Tensor:
         ...
 
+    def jacobian(
+        self, state: torch.Tensor, action: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Jacobians of next robot state w.r.t. robot state and action, of shape
+        [B, robot_state_dim, robot_state_dim] and [B, robot_state_dim, action_dim].
+
+        Computed by autograd through get_next_state by default,
+        subclass can override it with analytic jacobians.
+        """
+        return batch_jacobian(self.get_next_state, state, action)
+
 
 class EnvModel(Model, metaclass=ABCMeta):
     dt: Optional[float] = None
@@ -105,6 +117,9 @@ class EnvModel(Model, metaclass=ABCMeta):
     
     def robot_model_get_next_state(self, robot_state: torch.Tensor, action: torch.Tensor) -> torch.Tensor:
         return self.robot_model.get_next_state(robot_state, action)
+
+    def robot_model_jacobian(self, robot_state: torch.Tensor, action: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        return self.robot_model.jacobian(robot_state, action)
     
     def forward(self, obs, action, done, info):
         state = info["state"]
@@ -37,6 +37,18 @@ class ContextState(Generic[stateType]):
                 value.append(v)
         return self.__class__(*value)
 
+    def copy(self) -> 'ContextState[stateType]':
+        value = []
+        for field in fields(self):
+            v = getattr(self, field.name)
+            if isinstance(v, np.ndarray):
+                value.append(v.copy())
+            elif isinstance(v, torch.Tensor):
+                value.append(v.clone())
+            else:
+                value.append(deepcopy(v))
+        return self.__class__(*value)
+
     def cuda(self) -> 'ContextState[torch.Tensor]':
         value = []
         for field in fields(self):
@@ -97,6 +109,14 @@ class State(Generic[stateType]):
         context_state = self.context_state.tensor2array()
         return self.__class__(robot_state, context_state)
 
+    def copy(self) -> 'State[stateType]':
+        if isinstance(self.robot_state, torch.Tensor):
+            robot_state = self.robot_state.clone()
+        else:
+            robot_state = self.robot_state.copy()
+        context_state = self.context_state.copy()
+        return self.__class__(robot_state, context_state)
+
     def cuda(self) -> 'State[torch.Tensor]':
         assert isinstance(self.robot_state, torch.Tensor)
         robot_state = self.robot_state.cuda()
@@ -191,7 +211,8 @@ class Env(gym.Env, metaclass=ABCMeta):
         return self._get_obs(), reward, terminated, self._get_info()
 
     def _get_info(self) -> dict:
-        info = {'state': deepcopy(self._state)}
+        # copy arrays of state field by field, which is much faster than deepcopy
+        info = {'state': self._state.copy()}
         try:
             info['constraint'] = self._get_constraint()
         except NotImplementedError:
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 import torch
 
@@ -51,4 +51,71 @@ class CpDynMdl(RobotModel):
         theta = theta + self.dt * theta_dot
         theta_dot = theta_dot + self.dt * thetaacc
 
-        return torch.stack([x, x_dot, theta, theta_dot]).transpose(1, 0)
\ No newline at end of file
+        return torch.stack([x, x_dot, theta, theta_dot]).transpose(1, 0)
+
+    def jacobian(
+        self,
+        robot_state: torch.Tensor,
+        robot_action: torch.Tensor,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        gravity = self.param.gravity
+        masspole = self.param.masspole
+        total_mass = self.param.total_mass
+        length = self.param.length
+        polemass_length = self.param.polemass_length
+        force_mag = self.param.force_mag
+        dt = self.dt
+
+        theta, theta_dot = robot_state[:, 2], robot_state[:, 3]
+        force = force_mag * robot_action[:, 0]
+
+        costheta = torch.cos(theta)
+        sintheta = torch.sin(theta)
+        temp = (force + polemass_length * theta_dot * theta_dot * sintheta) / total_mass
+        num = gravity * sintheta - costheta * temp
+        den = length * (4.0 / 3.0 - masspole * costheta * costheta / total_mass)
+        thetaacc = num / den
+
+        # derivatives w.r.t. (theta, theta_dot, action)
+        dtemp = (
+            polemass_length * theta_dot * theta_dot * costheta / total_mass,
+            2 * polemass_length * theta_dot * sintheta / total_mass,
+            torch.full_like(theta, force_mag / total_mass),
+        )
+        dnum = (
+            gravity * costheta + sintheta * temp - costheta * dtemp[0],
+            -costheta * dtemp[1],
+            -costheta * dtemp[2],
+        )
+        dden_dtheta = 2 * length * masspole * costheta * sintheta / total_mass
+        dthetaacc = (
+            (dnum[0] * den - num * dden_dtheta) / den ** 2,
+            dnum[1] / den,
+            dnum[2] / den,
+        )
+        dxacc = (
+            dtemp[0]
+            - polemass_length / total_mass * (dthetaacc[0] * costheta - thetaacc * sintheta),
+            dtemp[1] - polemass_length / total_mass * dthetaacc[1] * costheta,
+            dtemp[2] - polemass_length / total_mass * dthetaacc[2] * costheta,
+        )
+
+        jac_state = torch.zeros(
+            (robot_state.shape[0], 4, 4),
+            dtype=robot_state.dtype,
+            device=robot_state.device,
+        )
+        jac_state[:, 0, 0] = 1
+        jac_state[:, 0, 1] = dt
+        jac_state[:, 1, 1] = 1
+        jac_state[:, 1, 2] = dt * dxacc[0]
+        jac_state[:, 1, 3] = dt * dxacc[1]
+        jac_state[:, 2, 2] = 1
+        jac_state[:, 2, 3] = dt
+        jac_state[:, 3, 2] = dt * dthetaacc[0]
+        jac_state[:, 3, 3] = 1 + dt * dthetaacc[1]
+        zeros = torch.zeros_like(theta)
+        jac_action = torch.stack(
+            (zeros, dt * dxacc[2], zeros, dt * dthetaacc[2]), dim=-1
+        ).unsqueeze(-1)
+        return jac_state, jac_action
\ No newline at end of file
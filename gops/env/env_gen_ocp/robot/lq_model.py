@@ -1,4 +1,4 @@
-from typing import Optional, Sequence
+from typing import Optional, Sequence, Tuple
 import torch
 from gops.env.env_gen_ocp.env_model.pyth_base_model import RobotModel
 from gops.env.env_gen_ocp.robot.lq import LqModel as np_LqModel
@@ -38,10 +38,16 @@ class LqModel(RobotModel):
         self.state_dim = self.A.shape[0]
         IA = torch.eye(self.state_dim, device=device) - self.A * self.time_step
         self.inv_IA = torch.linalg.pinv(IA)
+        # discrete transition x' = A_d x + B_d u
+        self.A_d = self.inv_IA
+        self.B_d = self.inv_IA @ self.B * self.time_step
 
     def get_next_state(self, state: torch.Tensor, action: torch.Tensor) -> torch.Tensor:
-        tmp = torch.mm(self.B, action.T) * self.time_step + state.T
-        tmp = tmp.float()
-        x_next = torch.mm(self.inv_IA, tmp).T
+        return torch.addmm(state.float() @ self.A_d.T, action.float(), self.B_d.T)
 
-        return x_next
+    def jacobian(self, state: torch.Tensor, action: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        # x' = (I - A * dt)^-1 (x + B * u * dt) is linear
+        batch_size = state.shape[0]
+        jac_state = self.A_d
+        jac_action = self.B_d
+        return jac_state.expand(batch_size, -1, -1), jac_action.expand(batch_size, -1, -1)
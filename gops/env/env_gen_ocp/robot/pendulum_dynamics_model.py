@@ -1,4 +1,4 @@
-from typing import Optional, Sequence
+from typing import Optional, Sequence, Tuple
 
 import torch
 from torch.types import Device
@@ -39,3 +39,29 @@ class PendulumDynamicsModel(RobotModel):
 
         next_state = torch.stack((newth, newthdot), dim=-1)
         return next_state
+
+    def jacobian(self, state: torch.Tensor, action: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        th, thdot = state[:, 0], state[:, 1]
+
+        g = self.param.g
+        m = self.param.m
+        l = self.param.l
+        dt = self.dt
+
+        u = action[:, 0]
+
+        newthdot = thdot + (3 * g / (2 * l) * torch.sin(th) + 3.0 / (m * l**2) * u) * dt
+        # derivative of clamped speed vanishes out of speed limit
+        unclamped = (
+            (newthdot >= -self.param.max_speed) & (newthdot <= self.param.max_speed)
+        ).to(state.dtype)
+        dthdot_dth = 3 * g / (2 * l) * torch.cos(th) * dt * unclamped
+        dthdot_dthdot = unclamped
+        dthdot_du = 3.0 / (m * l**2) * dt * unclamped
+
+        jac_state = torch.stack((
+            torch.stack((1 + dthdot_dth * dt, dthdot_dthdot * dt), dim=-1),
+            torch.stack((dthdot_dth, dthdot_dthdot), dim=-1),
+        ), dim=1)
+        jac_action = torch.stack((dthdot_du * dt, dthdot_du), dim=-1).unsqueeze(-1)
+        return jac_state, jac_action
@@ -1,4 +1,4 @@
-from typing import Optional, Sequence
+from typing import Optional, Sequence, Tuple
 
 import torch
 
@@ -56,3 +56,38 @@ class Veh2DoFModel(RobotModel):
             / (I_z * u - self.dt * (l_f ** 2 * k_f + l_r ** 2 * k_r)),
         ]
         return torch.stack(next_state, 1)
+
+    def jacobian(self, state: torch.Tensor, action: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        phi, v = state[:, 1], state[:, 2]
+
+        k_f = self.vehicle_params.kf
+        k_r = self.vehicle_params.kr
+        l_f = self.vehicle_params.lf
+        l_r = self.vehicle_params.lr
+        m   = self.vehicle_params.m
+        I_z = self.vehicle_params.Iz
+        u   = self.vehicle_params.u
+        dt = self.dt
+
+        # lateral velocity and yaw rate are linear in state and action
+        den_v = m * u - dt * (k_f + k_r)
+        den_w = I_z * u - dt * (l_f ** 2 * k_f + l_r ** 2 * k_r)
+        jac_state = torch.zeros(
+            (state.shape[0], 4, 4), dtype=state.dtype, device=state.device
+        )
+        jac_state[:, 0, 0] = 1
+        jac_state[:, 0, 1] = dt * (u * torch.cos(phi) - v * torch.sin(phi))
+        jac_state[:, 0, 2] = dt * torch.cos(phi)
+        jac_state[:, 1, 1] = 1
+        jac_state[:, 1, 3] = dt
+        jac_state[:, 2, 2] = m * u / den_v
+        jac_state[:, 2, 3] = dt * (l_f * k_f - l_r * k_r - m * u ** 2) / den_v
+        jac_state[:, 3, 2] = dt * (l_f * k_f - l_r * k_r) / den_w
+        jac_state[:, 3, 3] = I_z * u / den_w
+
+        jac_action = torch.zeros(
+            (state.shape[0], 4, 1), dtype=state.dtype, device=state.device
+        )
+        jac_action[:, 2, 0] = -dt * k_f * u / den_v
+        jac_action[:, 3, 0] = -dt * l_f * k_f * u / den_w
+        return jac_state, jac_action
@@ -1,4 +1,4 @@
-from typing import Optional, Sequence
+from typing import Optional, Sequence, Tuple
 
 import torch
 
@@ -56,4 +56,58 @@ class Veh3DoFModel(RobotModel):
             )
             / (I_z * u - self.dt * (l_f ** 2 * k_f + l_r ** 2 * k_r)),
         ]
-        return torch.stack(next_state, 1)
\ No newline at end of file
+        return torch.stack(next_state, 1)
+
+    def jacobian(self, state: torch.Tensor, action: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        phi, u, v, w = state[:, 2], state[:, 3], state[:, 4], state[:, 5]
+        steer = action[:, 0]
+        k_f = self.vehicle_params.kf
+        k_r = self.vehicle_params.kr
+        l_f = self.vehicle_params.lf
+        l_r = self.vehicle_params.lr
+        m = self.vehicle_params.m
+        I_z = self.vehicle_params.Iz
+        dt = self.dt
+
+        cos_phi, sin_phi = torch.cos(phi), torch.sin(phi)
+        num_v = (
+            m * v * u
+            + dt * (l_f * k_f - l_r * k_r) * w
+            - dt * k_f * steer * u
+            - dt * m * torch.square(u) * w
+        )
+        den_v = m * u - dt * (k_f + k_r)
+        num_w = I_z * w * u + dt * (l_f * k_f - l_r * k_r) * v - dt * l_f * k_f * steer * u
+        den_w = I_z * u - dt * (l_f ** 2 * k_f + l_r ** 2 * k_r)
+
+        jac_state = torch.zeros(
+            (state.shape[0], 6, 6), dtype=state.dtype, device=state.device
+        )
+        jac_state[:, 0, 0] = 1
+        jac_state[:, 0, 2] = -dt * (u * sin_phi + v * cos_phi)
+        jac_state[:, 0, 3] = dt * cos_phi
+        jac_state[:, 0, 4] = -dt * sin_phi
+        jac_state[:, 1, 1] = 1
+        jac_state[:, 1, 2] = dt * (u * cos_phi - v * sin_phi)
+        jac_state[:, 1, 3] = dt * sin_phi
+        jac_state[:, 1, 4] = dt * cos_phi
+        jac_state[:, 2, 2] = 1
+        jac_state[:, 2, 5] = dt
+        jac_state[:, 3, 3] = 1
+        # longitudinal speed appears in both numerator and denominator
+        jac_state[:, 4, 3] = (
+            (m * v - dt * k_f * steer - 2 * dt * m * u * w) / den_v - num_v * m / den_v ** 2
+        )
+        jac_state[:, 4, 4] = m * u / den_v
+        jac_state[:, 4, 5] = dt * (l_f * k_f - l_r * k_r - m * torch.square(u)) / den_v
+        jac_state[:, 5, 3] = (I_z * w - dt * l_f * k_f * steer) / den_w - num_w * I_z / den_w ** 2
+        jac_state[:, 5, 4] = dt * (l_f * k_f - l_r * k_r) / den_w
+        jac_state[:, 5, 5] = I_z * u / den_w
+
+        jac_action = torch.zeros(
+            (state.shape[0], 6, 2), dtype=state.dtype, device=state.device
+        )
+        jac_action[:, 3, 1] = dt
+        jac_action[:, 4, 0] = -dt * k_f * u / den_v
+        jac_action[:, 5, 0] = -dt * l_f * k_f * u / den_w
+        return jac_state, jac_action
\ No newline at end of file
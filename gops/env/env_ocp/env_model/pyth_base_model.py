@@ -9,6 +9,7 @@
 #  Description: base class for pyth environments
 #  Update: 2022-10-25, Yujie Yang: create base model
 #  Update: 2022-10-27, Zhilong Zheng: redefine get_constraint and get_terminal_cost
+#  Update: 2026-10-19, iDLab: add jacobian of transition
 
 from abc import ABCMeta, abstractmethod
 from typing import Callable, Optional, Sequence, Tuple, Union
@@ -16,6 +17,7 @@ from typing import Callable, Optional, Sequence, Tuple, Union
 import torch
 
 from gops.utils.gops_typing import InfoDict
+from gops.utils.math_utils import batch_jacobian
 
 
 class PythBaseModel(metaclass=ABCMeta):
@@ -80,6 +82,24 @@ class PythBaseModel(metaclass=ABCMeta):
     # if you need
     get_terminal_cost: Callable[[torch.Tensor], torch.Tensor] = None
 
+    def jacobian(
+        self,
+        state: torch.Tensor,
+        action: torch.Tensor,
+        info: Optional[InfoDict] = None,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Jacobians of next observation w.r.t. observation and action of transition,
+        of shape [B, obs_dim, obs_dim] and [B, obs_dim, action_dim].
+
+        Computed by autograd through forward by default,
+        subclass can override it with analytic jacobians.
+        """
+        info = {} if info is None else info
+        done = torch.zeros(state.shape[0], dtype=torch.bool, device=state.device)
+        return batch_jacobian(
+            lambda s, a: self.forward(s, a, done, info)[0], state, action
+        )
+
     @property
     def unwrapped(self):
         return self
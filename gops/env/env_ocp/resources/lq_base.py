@@ -9,11 +9,13 @@
 #  Description: Linear Quadratic control environment base
 #  Update Date: 2022-08-12, Yuhang Zhang: create environment base
 #  Update Date: 2022-10-24, Yujie Yang: add wrapper
+#  Update Date: 2026-10-19, iDLab: add analytic jacobian of lq model
+#  Update Date: 2026-10-19, iDLab: add closed-form multi-step prediction and optimal value
 
 
 import math
 import warnings
-from typing import Tuple, Union
+from typing import Dict, Optional, Tuple, Union
 
 import gym
 import matplotlib.pyplot as plt
@@ -55,8 +57,14 @@ class LQDynamics:
         # IA = (1 - A * dt)
         IA = torch.eye(self.state_dim, device=device) - self.A * self.time_step
         self.inv_IA = torch.linalg.pinv(IA)
+        # discrete transition x' = A_d x + B_d u
+        self.A_d = self.inv_IA
+        self.B_d = self.inv_IA @ self.B * self.time_step
 
         self.device = device
+        # closed-form matrices are cached by horizon and discount factor
+        self._prediction_matrices: Dict[int, Tuple[torch.Tensor, torch.Tensor]] = {}
+        self._riccati: Dict[Tuple[float, Optional[int]], Tuple[torch.Tensor, torch.Tensor]] = {}
 
     def compute_control_matrix(self):
         gamma = 0.99
@@ -99,14 +107,136 @@ class LQDynamics:
             ).unsqueeze(0)
             numpy_flag = True
 
-        tmp = torch.mm(self.B, u_t.T) * self.time_step + x_t.T
-
-        x_next = torch.mm(self.inv_IA, tmp).T
+        x_next = torch.addmm(x_t @ self.A_d.T, u_t, self.B_d.T)
 
         if numpy_flag:
             x_next = x_next.detach().numpy().squeeze(0)
         return x_next
 
+    def prediction_matrices(self, horizon: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Matrices of multi-step prediction [x_1, ..., x_T] = F x_0 + G [u_0, ..., u_{T-1}],
+        where F stacks A_d^k and G is block lower triangular with blocks A_d^(k-j-1) B_d.
+
+        Returns
+        -------
+        F: [T*state_dim, state_dim]
+        G: [T*state_dim, T*action_dim]
+        """
+        if horizon not in self._prediction_matrices:
+            n, m = self.B_d.shape
+            A = self.A_d.double()
+            powers = [torch.eye(n, dtype=torch.float64, device=self.device)]
+            for _ in range(horizon):
+                powers.append(A @ powers[-1])
+            # A_d^k B_d for k = 0, ..., T-1
+            ab = [p @ self.B_d.double() for p in powers[:-1]]
+            G = torch.zeros(horizon * n, horizon * m, dtype=torch.float64, device=self.device)
+            for k in range(horizon):
+                for j in range(k + 1):
+                    G[k * n : (k + 1) * n, j * m : (j + 1) * m] = ab[k - j]
+            F = torch.cat(powers[1:])
+            self._prediction_matrices[horizon] = (F.float(), G.float())
+        return self._prediction_matrices[horizon]
+
+    def multi_step_prediction(self, x_0: torch.Tensor, u_seq: torch.Tensor) -> torch.Tensor:
+        """
+        Predict states of an action sequence in one matmul
+
+        Parameters
+        ----------
+        x_0: [b,state_dim]
+        u_seq: [b,T,action_dim]
+
+        Returns
+        -------
+        x_seq: [b,T,state_dim], states after each action
+        """
+        batch_size, horizon = u_seq.shape[:2]
+        F, G = self.prediction_matrices(horizon)
+        x_seq = torch.addmm(x_0 @ F.T, u_seq.reshape(batch_size, -1), G.T)
+        return x_seq.reshape(batch_size, horizon, self.state_dim)
+
+    def riccati(
+        self, gamma: float = 0.99, horizon: Optional[int] = None
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Optimal feedback gain K and value matrix P of discounted cost sum of x'Qx + u'Ru,
+        i.e. u = -K x and optimal cost x'Px, over infinite horizon (by DARE) if horizon is None,
+        otherwise over horizon steps (by Riccati recursion from zero terminal cost).
+        """
+        key = (gamma, horizon)
+        if key not in self._riccati:
+            A = self.A_d.cpu().numpy().astype("float64")
+            B = self.B_d.cpu().numpy().astype("float64")
+            Q = np.diag(self.Q.cpu().numpy()).astype("float64")
+            R = np.diag(self.R.cpu().numpy()).astype("float64")
+            if horizon is None:
+                # discounting is absorbed into dynamics
+                P = solve_discrete_are(A * np.sqrt(gamma), B * np.sqrt(gamma), Q, R)
+                K = gamma * np.linalg.pinv(R + gamma * B.T @ P @ B) @ B.T @ P @ A
+            else:
+                P = np.zeros_like(Q)
+                K = np.zeros((B.shape[1], A.shape[0]))
+                for _ in range(horizon):
+                    K = gamma * np.linalg.pinv(R + gamma * B.T @ P @ B) @ B.T @ P @ A
+                    P = Q + K.T @ R @ K + gamma * (A - B @ K).T @ P @ (A - B @ K)
+            self._riccati[key] = (
+                torch.as_tensor(K, dtype=torch.float32, device=self.device),
+                torch.as_tensor(P, dtype=torch.float32, device=self.device),
+            )
+        return self._riccati[key]
+
+    def optimal_value(
+        self, x_t: torch.Tensor, gamma: float = 0.99, horizon: Optional[int] = None
+    ) -> torch.Tensor:
+        """
+        Closed-form optimal value (discounted sum of rewards) without state and action bounds
+
+        Parameters
+        ----------
+        x_t: [b,state_dim]
+
+        Returns
+        -------
+        value: [b,]
+        """
+        _, P = self.riccati(gamma, horizon)
+        if horizon is None:
+            shift_sum = 1 / (1 - gamma)
+        else:
+            shift_sum = sum(gamma ** k for k in range(horizon))
+        cost = torch.sum(x_t @ P * x_t, dim=-1)
+        return self.reward_scale * (self.reward_shift * shift_sum - cost)
+
+    def optimal_rollout(
+        self, x_0: torch.Tensor, horizon: int, gamma: float = 0.99
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Closed-loop rollout of infinite horizon optimal controller from a batch of states,
+        with powers of closed-loop matrix computed once
+
+        Parameters
+        ----------
+        x_0: [b,state_dim]
+
+        Returns
+        -------
+        x_seq: [b,T+1,state_dim]
+        u_seq: [b,T,action_dim]
+        r_seq: [b,T]
+        """
+        K, _ = self.riccati(gamma)
+        A_cl = (self.A_d - self.B_d @ K).double()
+        powers = [torch.eye(self.state_dim, dtype=torch.float64, device=self.device)]
+        for _ in range(horizon):
+            powers.append(A_cl @ powers[-1])
+        powers = torch.cat(powers).float()
+        x_seq = (x_0 @ powers.T).reshape(x_0.shape[0], horizon + 1, self.state_dim)
+        u_seq = -x_seq[:, :-1] @ K.T
+        r_seq = self.compute_reward(x_seq[:, :-1], u_seq)
+        return x_seq, u_seq, r_seq
+
     def compute_reward(
         self, x_t: Union[torch.Tensor, np.ndarray], u_t: Union[torch.Tensor, np.ndarray]
     ) -> Union[torch.Tensor, np.ndarray]:
@@ -192,7 +322,8 @@ class PythLqEnv(PythBaseEnv):
         return True
 
     def control_policy(self, state, info):
-        return -self.control_matrix @ state
+        # state of shape [state_dim] or [b,state_dim]
+        return -state @ self.control_matrix.T
 
     def reset(self, init_state=None, **kwargs):
         self.step_counter = 0
@@ -353,8 +484,40 @@ class PythLqModel(PythBaseModel):
         info = {"constraint": None}
         return next_obs, reward, done, info
 
+    def jacobian(
+        self,
+        state: torch.Tensor,
+        action: torch.Tensor,
+        info: Optional[InfoDict] = None,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        # x' = (I - A * dt)^-1 (x + B * u * dt) is linear
+        batch_size = state.shape[0]
+        jac_state = self.dynamics.A_d
+        jac_action = self.dynamics.B_d
+        return (
+            jac_state.expand(batch_size, -1, -1),
+            jac_action.expand(batch_size, -1, -1),
+        )
+
+    def multi_step_forward(
+        self, obs: torch.Tensor, actions: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Next observations and rewards of action sequence of shape [B, T, action_dim]
+        in one matmul, of shape [B, T, obs_dim] and [B, T].
+        """
+        next_obs = self.dynamics.multi_step_prediction(obs, actions)
+        prev_obs = torch.cat((obs.unsqueeze(1), next_obs[:, :-1]), dim=1)
+        reward = self.dynamics.compute_reward(prev_obs, actions)
+        return next_obs, reward
+
+    def optimal_value(
+        self, obs: torch.Tensor, gamma: float = 0.99, horizon: Optional[int] = None
+    ) -> torch.Tensor:
+        """Closed-form optimal value of infinite horizon, or of `horizon` steps."""
+        return self.dynamics.optimal_value(obs, gamma, horizon)
+
     def get_terminal_cost(self, obs: torch.Tensor) -> torch.Tensor:
-        return obs @ self.P @ obs.T
+        return torch.sum(obs @ self.P * obs, dim=-1)
 
 
 def test_check():
@@ -8,11 +8,12 @@
 #
 #  Description: reference trajectory for data environment
 #  Update: 2022-11-16, Yujie Yang: create reference trajectory
+#  Update: 2026-10-19, iDLab: support array of time in reference points
 
 from abc import ABCMeta, abstractmethod
 from copy import deepcopy
 from dataclasses import dataclass
-from typing import Dict, Optional, Sequence
+from typing import Dict, Optional, Sequence, Union
 
 import numpy as np
 
@@ -66,6 +67,12 @@ class MultiRefTrajData:
             TriangleRefTrajData(ref_speeds, **self.path_param["straight_lane"]),
         ]
 
+    def compute_ref_points(
+        self, t: Union[float, np.ndarray], path_num: int, speed_num: int
+    ) -> np.ndarray:
+        """Compute stacked (x, y, phi, u) of reference points, with shape np.shape(t) + (4,)."""
+        return self.ref_trajs[path_num].compute_ref_points(t, speed_num)
+
     def compute_x(self, t: float, path_num: int, speed_num: int) -> float:
         return self.ref_trajs[path_num].compute_x(t, speed_num)
 
@@ -139,6 +146,20 @@ class RefTrajData(metaclass=ABCMeta):
         dy = self.compute_y(t + dt, speed_num) - self.compute_y(t, speed_num)
         return np.arctan2(dy, dx)
 
+    def compute_ref_points(
+        self, t: Union[float, np.ndarray], speed_num: int
+    ) -> np.ndarray:
+        # x and y at t are shared between position and heading
+        dt = 0.001
+        t = np.asarray(t, dtype=np.float64)
+        x = self.compute_x(t, speed_num)
+        y = self.compute_y(t, speed_num)
+        dx = self.compute_x(t + dt, speed_num) - x
+        dy = self.compute_y(t + dt, speed_num) - y
+        phi = np.arctan2(dy, dx)
+        u = self.compute_u(t, speed_num)
+        return np.stack(np.broadcast_arrays(x, y, phi, u), axis=-1)
+
 
 @dataclass
 class SineRefTrajData(RefTrajData):
@@ -166,19 +187,16 @@ class DoubleLaneRefTrajData(RefTrajData):
         return self.ref_speeds[speed_num].compute_integrate_u(t)
 
     def compute_y(self, t: float, speed_num: int) -> float:
-        if t <= self.t1:
-            y = self.y1
-        elif t <= self.t2:
-            k = (self.y2 - self.y1) / (self.t2 - self.t1)
-            y = k * (t - self.t1) + self.y1
-        elif t <= self.t3:
-            y = self.y2
-        elif t <= self.t4:
-            k = (self.y1 - self.y2) / (self.t4 - self.t3)
-            y = k * (t - self.t3) + self.y2
-        else:
-            y = self.y1
-        return y
+        k1 = (self.y2 - self.y1) / (self.t2 - self.t1)
+        k2 = (self.y1 - self.y2) / (self.t4 - self.t3)
+        t = np.asarray(t)
+        y = np.select(
+            [t <= self.t1, t <= self.t2, t <= self.t3, t <= self.t4],
+            [self.y1, k1 * (t - self.t1) + self.y1, self.y2, k2 * (t - self.t3) + self.y2],
+            default=self.y1,
+        )
+        # [()] returns a scalar for scalar input and the array itself otherwise
+        return y[()]
 
 
 @dataclass
@@ -190,12 +208,11 @@ class TriangleRefTrajData(RefTrajData):
         return self.ref_speeds[speed_num].compute_integrate_u(t)
 
     def compute_y(self, t: float, speed_num: int) -> float:
-        s = t % self.T
-        if s <= self.T / 2:
-            y = 2 * self.A / self.T * s
-        else:
-            y = -2 * self.A / self.T * (s - self.T)
-        return y
+        s = np.remainder(t, self.T)
+        y = np.where(
+            s <= self.T / 2, 2 * self.A / self.T * s, -2 * self.A / self.T * (s - self.T)
+        )
+        return y[()]
 
 
 @dataclass
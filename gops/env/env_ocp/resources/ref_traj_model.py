@@ -8,6 +8,7 @@
 #
 #  Description: reference trajectory for model environment
 #  Update: 2022-11-16, Yujie Yang: create reference trajectory
+#  Update: 2026-10-19, iDLab: add fused computation of reference points
 
 from abc import ABCMeta, abstractmethod
 from copy import deepcopy
@@ -51,6 +52,21 @@ class MultiRefTrajModel:
             CircleRefTrajModel(ref_speeds, **self.path_param["circle"]),
         ]
 
+    def compute_ref_points(
+        self, t: torch.Tensor, path_num: torch.Tensor, speed_num: torch.Tensor
+    ) -> torch.Tensor:
+        """
+        Compute stacked (x, y, phi, u) of reference points, with shape t.shape + (4,).
+        Samples are grouped by path, so each sample only evaluates its own path.
+        """
+        t, path_num, speed_num = torch.broadcast_tensors(t, path_num, speed_num)
+        ref_points = t.new_zeros(t.shape + (4,))
+        for i, ref_traj in enumerate(self.ref_trajs):
+            mask = path_num == i
+            if mask.any():
+                ref_points[mask] = ref_traj.compute_ref_points(t[mask], speed_num[mask])
+        return ref_points
+
     def compute_x(
         self, t: torch.Tensor, path_num: torch.Tensor, speed_num: torch.Tensor
     ) -> torch.Tensor:
@@ -147,6 +163,19 @@ class RefTrajModel(metaclass=ABCMeta):
         dy = self.compute_y(t + dt, speed_num) - self.compute_y(t, speed_num)
         return torch.atan2(dy, dx)
 
+    def compute_ref_points(
+        self, t: torch.Tensor, speed_num: torch.Tensor
+    ) -> torch.Tensor:
+        # x and y at t are shared between position and heading
+        dt = 0.001
+        x = self.compute_x(t, speed_num)
+        y = self.compute_y(t, speed_num)
+        dx = self.compute_x(t + dt, speed_num) - x
+        dy = self.compute_y(t + dt, speed_num) - y
+        phi = torch.atan2(dy, dx)
+        u = self.compute_u(t, speed_num)
+        return torch.stack((x, y, phi, u), dim=-1)
+
 
 @dataclass
 class SineRefTrajModel(RefTrajModel):
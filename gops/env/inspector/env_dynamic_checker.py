@@ -8,6 +8,8 @@
 #
 #  Description: Check dynamic system to see whether its behaviors are reasonable!
 #  Update: 2022-12-05, Xujie Song: create env_dynamic_checker
+#  Update: 2026-10-19, iDLab: compute action by shared policy inference
+#  Update: 2026-10-19, iDLab: reset hidden state of recurrent policy at episode start
 
 import numpy as np
 import warnings
@@ -24,6 +26,7 @@ import matplotlib.colors as mcolors
 from gops.create_pkg.create_alg import create_approx_contrainer
 from gops.utils.common_utils import change_type, get_args_from_json
 from gops.utils.plot_evaluation import cm2inch
+from gops.utils.policy_inference import PolicyInference
 from gops.create_pkg.create_env import create_env
 
 # define figure sytle
@@ -68,12 +71,7 @@ def load_policy(args, policy_path):
     return networks
 
 def compute_action(obs, networks):
-    batch_obs = torch.from_numpy(np.expand_dims(obs, axis=0).astype("float32"))
-    logits = networks.policy(batch_obs)
-    action_distribution = networks.create_action_distributions(logits)
-    action = action_distribution.mode()
-    action = action.detach().numpy()[0]
-    return action
+    return PolicyInference.of(networks).act(np.expand_dims(obs, axis=0), "mode")[0][0]
 
 
 def draw_figures(
@@ -236,6 +234,9 @@ def check_dynamic(
         else:
             obs, info = env.reset()
 
+        if close_loop:
+            PolicyInference.of(controller).reset()
+
         if obs.shape[0] == state_dim:
             use_obs = True
         else:
@@ -8,12 +8,14 @@
 #
 #  Description: Check the correctness of model-type environment
 #  Update: 2022-12-05, Yuhang Zhang: create file
+#  Update: 2026-10-19, iDLab: check jacobian of transition
 
 import torch
 import numpy as np
 import importlib
 import gops.create_pkg.create_env_model as ce
 from gops.env.inspector.env_data_checker import check_env_file_structures
+from gops.utils.math_utils import batch_jacobian
 
 
 def check_env_model_file_structures(env_file_name):
@@ -97,6 +99,38 @@ def check_model0(env, env_model):
             "constraint" in info.keys()
         ), "Constraint function must be implemented in info variable"
 
+    if hasattr(env_model, "jacobian"):
+        check_model_jacobian(env_model, s_torch, a_torch)
+
+
+def check_model_jacobian(env_model, s, a, info=None, rtol=1e-3, atol=1e-5):
+    """
+    check whether jacobian of env model is consistent with autograd through forward
+    :param env_model: env model
+    :param s: batch of observation
+    :param a: batch of action
+    :param info: info of forward
+    :return:
+    """
+    jac_s, jac_a = env_model.jacobian(s, a, info)
+
+    batch_size, obs_dim = s.shape
+    act_dim = a.shape[1]
+    assert jac_s.shape == (batch_size, obs_dim, obs_dim), "Wrong jacobian w.r.t. state"
+    assert jac_a.shape == (batch_size, obs_dim, act_dim), "Wrong jacobian w.r.t. action"
+
+    info = {} if info is None else info
+    beyond_done = torch.full([batch_size], False, dtype=torch.bool)
+    jac_s_ref, jac_a_ref = batch_jacobian(
+        lambda x, u: env_model.forward(x, u, beyond_done, info)[0], s, a
+    )
+    assert torch.allclose(
+        jac_s, jac_s_ref, rtol=rtol, atol=atol
+    ), "Jacobian w.r.t. state is inconsistent with env dynamics"
+    assert torch.allclose(
+        jac_a, jac_a_ref, rtol=rtol, atol=atol
+    ), "Jacobian w.r.t. action is inconsistent with env dynamics"
+
 
 def check_model(env_name):
     """
@@ -8,15 +8,20 @@
 
 #  Description: Create environments
 #  Update Date: 2023-07-23, Zheng Zhilong: add seed methods
+#  Update Date: 2026-10-19, iDLab: add shared memory transport of additional info
+#  Update Date: 2026-10-19, iDLab: add worker groups stepping many envs per process
 
 
 """An async vector environment."""
 import multiprocessing as mp
+import os
 import sys
 import time
 from copy import deepcopy
+from dataclasses import fields
 from enum import Enum
-from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 from numpy.typing import NDArray
@@ -40,6 +45,7 @@ from gymnasium.vector.utils import (
     read_from_shared_memory,
     write_to_shared_memory,
 )
+from gops.env.env_gen_ocp.pyth_base import State
 from gops.env.vector.vector_env import VectorEnv
 
 
@@ -57,7 +63,9 @@ class AsyncState(Enum):
 class AsyncVectorEnv(VectorEnv):
     """Vectorized environment that runs multiple environments in parallel.
 
-    It uses ``multiprocessing`` processes, and pipes for communication.
+    It uses ``multiprocessing`` processes, and pipes for communication. Each process runs one
+    environment by default, or a group of environments stepped in a loop if ``envs_per_worker > 1``,
+    which exchanges one message per group instead of one per environment.
 
     Example:
         >>> import gymnasium as gym
@@ -80,6 +88,9 @@ class AsyncVectorEnv(VectorEnv):
         context: Optional[str] = None,
         daemon: bool = True,
         worker: Optional[Callable] = None,
+        shared_info: bool = True,
+        envs_per_worker: int = 1,
+        pin_workers: bool = False,
     ):
         """Vectorized environment that runs multiple environments in parallel.
 
@@ -99,6 +110,13 @@ class AsyncVectorEnv(VectorEnv):
                 so for some environments you may want to have it set to ``False``.
             worker: If set, then use that worker in a subprocess instead of a default one.
                 Can be useful to override some inner vector env logic, for instance, how resets on termination or truncation are handled.
+            shared_info: If ``True`` and ``shared_memory`` is ``True``, then the infos declared in ``additional_info``
+                of the environment (arrays with shape and dtype, or :class:`State`) are communicated back through
+                shared variables instead of being pickled through pipes. The copy behavior follows ``copy``.
+            envs_per_worker: Number of consecutive sub-environments owned by each worker process. If larger than 1,
+                commands and results of a group are sent in one message, and a custom ``worker`` must handle lists of
+                data like ``_worker_group``. This is efficient for many environments with cheap dynamics.
+            pin_workers: If ``True``, then worker processes are pinned to available cores in turn (Linux only).
 
         Warnings:
             worker is an advanced mode option. It provides a high degree of flexibility and a high chance
@@ -117,6 +135,7 @@ class AsyncVectorEnv(VectorEnv):
         self.copy = copy
         dummy_env = env_fns[0]()
         self.metadata = dummy_env.metadata
+        additional_info = getattr(dummy_env, "additional_info", None) or {}
 
         if (observation_space is None) or (action_space is None):
             observation_space = observation_space or dummy_env.observation_space
@@ -152,13 +171,45 @@ class AsyncVectorEnv(VectorEnv):
                 self.single_observation_space, n=self.num_envs, fn=np.zeros
             )
 
+        self.shared_info = self.shared_memory and shared_info and len(additional_info) > 0
+        if self.shared_info:
+            _info_buffer = create_info_shared_memory(additional_info, n=self.num_envs, ctx=ctx)
+            self.info_masks, self.info_views = read_info_from_shared_memory(
+                additional_info, _info_buffer, n=self.num_envs
+            )
+            worker_kwargs = {"info_shared_memory": _info_buffer}
+        else:
+            worker_kwargs = {}
+
+        assert envs_per_worker >= 1
+        self._grouped = envs_per_worker > 1
+        self._group_slices = [
+            (start, min(start + envs_per_worker, self.num_envs))
+            for start in range(0, self.num_envs, envs_per_worker)
+        ]
+        if pin_workers and hasattr(os, "sched_getaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+        else:
+            cpus = None
+
         self.parent_pipes, self.processes = [], []
         self.error_queue = ctx.Queue()
-        target = _worker_shared_memory if self.shared_memory else _worker
+        if self._grouped:
+            target = _worker_group
+        else:
+            target = _worker_shared_memory if self.shared_memory else _worker
         target = worker or target
         with clear_mpi_env_vars():
-            for idx, env_fn in enumerate(self.env_fns):
+            for idx, (start, stop) in enumerate(self._group_slices):
                 parent_pipe, child_pipe = ctx.Pipe()
+                if self._grouped:
+                    env_fn = partial(_create_envs, self.env_fns[start:stop])
+                    kwargs = dict(worker_kwargs, env_indices=range(start, stop))
+                else:
+                    env_fn = self.env_fns[start]
+                    kwargs = dict(worker_kwargs)
+                if cpus is not None:
+                    kwargs["cpu"] = cpus[idx % len(cpus)]
                 process = ctx.Process(
                     target=target,
                     name=f"Worker<{type(self).__name__}>-{idx}",
@@ -170,6 +221,7 @@ class AsyncVectorEnv(VectorEnv):
                         _obs_buffer,
                         self.error_queue,
                     ),
+                    kwargs=kwargs,
                 )
 
                 self.parent_pipes.append(parent_pipe)
@@ -200,8 +252,7 @@ class AsyncVectorEnv(VectorEnv):
                 self._state.value,
             )
 
-        for pipe, single_seed in zip(self.parent_pipes, seed):
-            pipe.send(("seed", single_seed))
+        self._send("seed", seed)
         self._state = AsyncState.WAITING_SEED
 
     def seed_wait(self, timeout: Optional[float] = None):
@@ -223,11 +274,7 @@ class AsyncVectorEnv(VectorEnv):
                 f"The call to `seed_wait` has timed out after {timeout} second(s)."
             )
 
-        successes = []
-        for pipe in self.parent_pipes:
-            _, success = pipe.recv()
-            successes.append(success)
-
+        _, successes = self._recv()
         self._raise_if_errors(successes)
         self._state = AsyncState.DEFAULT
 
@@ -264,14 +311,16 @@ class AsyncVectorEnv(VectorEnv):
                 self._state.value,
             )
 
-        for pipe, single_seed in zip(self.parent_pipes, seed):
+        kwargs = []
+        for single_seed in seed:
             single_kwargs = {}
             if single_seed is not None:
                 single_kwargs["seed"] = single_seed
             if options is not None:
                 single_kwargs["options"] = options
+            kwargs.append(single_kwargs)
 
-            pipe.send(("reset", single_kwargs))
+        self._send("reset", kwargs)
         self._state = AsyncState.WAITING_RESET
 
     def reset_wait(
@@ -308,7 +357,7 @@ class AsyncVectorEnv(VectorEnv):
                 f"The call to `reset_wait` has timed out after {timeout} second(s)."
             )
 
-        results, successes = zip(*[pipe.recv() for pipe in self.parent_pipes])
+        results, successes = self._recv()
         self._raise_if_errors(successes)
         self._state = AsyncState.DEFAULT
 
@@ -316,6 +365,8 @@ class AsyncVectorEnv(VectorEnv):
         results, info_data = zip(*results)
         for i, info in enumerate(info_data):
             infos = self._add_info(infos, info, i)
+        if self.shared_info:
+            infos = self._add_shared_info(infos)
 
         if not self.shared_memory:
             self.observations = concatenate(
@@ -344,9 +395,8 @@ class AsyncVectorEnv(VectorEnv):
                 self._state.value,
             )
 
-        actions = iterate(self.action_space, actions)
-        for pipe, action in zip(self.parent_pipes, actions):
-            pipe.send(("step", action))
+        actions = list(iterate(self.action_space, actions))
+        self._send("step", actions)
         self._state = AsyncState.WAITING_STEP
 
     def step_wait(
@@ -378,23 +428,20 @@ class AsyncVectorEnv(VectorEnv):
                 f"The call to `step_wait` has timed out after {timeout} second(s)."
             )
 
-        observations_list, rewards, terminateds, truncateds, infos = [], [], [], [], {}
-        successes = []
-        for i, pipe in enumerate(self.parent_pipes):
-            result, success = pipe.recv()
-            successes.append(success)
-            if success:
-                obs, rew, terminated, truncated, info = result
-
-                observations_list.append(obs)
-                rewards.append(rew)
-                terminateds.append(terminated)
-                truncateds.append(truncated)
-                infos = self._add_info(infos, info, i)
-
+        results, successes = self._recv()
         self._raise_if_errors(successes)
         self._state = AsyncState.DEFAULT
 
+        observations_list, rewards, terminateds, truncateds, infos = [], [], [], [], {}
+        for i, (obs, rew, terminated, truncated, info) in enumerate(results):
+            observations_list.append(obs)
+            rewards.append(rew)
+            terminateds.append(terminated)
+            truncateds.append(truncated)
+            infos = self._add_info(infos, info, i)
+        if self.shared_info:
+            infos = self._add_shared_info(infos)
+
         if not self.shared_memory:
             self.observations = concatenate(
                 self.single_observation_space,
@@ -430,8 +477,7 @@ class AsyncVectorEnv(VectorEnv):
                 self._state.value,
             )
 
-        for pipe in self.parent_pipes:
-            pipe.send(("_call", (name, args, kwargs)))
+        self._send("_call", [(name, args, kwargs)] * self.num_envs)
         self._state = AsyncState.WAITING_CALL
 
     def call_wait(self, timeout: Optional[Union[int, float]] = None) -> list:
@@ -461,11 +507,11 @@ class AsyncVectorEnv(VectorEnv):
                 f"The call to `call_wait` has timed out after {timeout} second(s)."
             )
 
-        results, successes = zip(*[pipe.recv() for pipe in self.parent_pipes])
+        results, successes = self._recv()
         self._raise_if_errors(successes)
         self._state = AsyncState.DEFAULT
 
-        return results
+        return tuple(results)
 
     def set_attr(self, name: str, values: Union[list, tuple, object]):
         """Sets an attribute of the sub-environments.
@@ -497,9 +543,8 @@ class AsyncVectorEnv(VectorEnv):
                 self._state.value,
             )
 
-        for pipe, value in zip(self.parent_pipes, values):
-            pipe.send(("_setattr", (name, value)))
-        _, successes = zip(*[pipe.recv() for pipe in self.parent_pipes])
+        self._send("_setattr", [(name, value) for value in values])
+        _, successes = self._recv()
         self._raise_if_errors(successes)
 
     def close_extras(
@@ -545,6 +590,45 @@ class AsyncVectorEnv(VectorEnv):
         for process in self.processes:
             process.join()
 
+    def _add_shared_info(self, infos: dict) -> dict:
+        """Add infos written by sub-environments into shared memory to the info dictionary.
+
+        Arrays are batched along the first axis, and states are unbatched into an array of
+        :class:`State` of each sub-environment, which are views of the batched state.
+        """
+        for k, view in self.info_views.items():
+            mask = self.info_masks[k]
+            if not mask.any():
+                continue
+            if self.copy:
+                view = view.copy()
+            if isinstance(view, State):
+                states = np.empty(self.num_envs, dtype=object)
+                for i in range(self.num_envs):
+                    states[i] = view[i]
+                view = states
+            infos[k], infos[f"_{k}"] = view, mask.copy()
+        return infos
+
+    def _send(self, command: str, data: Sequence[Any]):
+        """Send a command with data of each sub-environment, in one message per worker."""
+        for pipe, (start, stop) in zip(self.parent_pipes, self._group_slices):
+            pipe.send((command, data[start:stop] if self._grouped else data[start]))
+
+    def _recv(self) -> Tuple[list, list]:
+        """Receive results of each sub-environment and success of each worker."""
+        results, successes = [], []
+        for pipe, (start, stop) in zip(self.parent_pipes, self._group_slices):
+            result, success = pipe.recv()
+            if not self._grouped:
+                results.append(result)
+            elif success:
+                results.extend(result)
+            else:
+                results.extend([None] * (stop - start))
+            successes.append(success)
+        return results, successes
+
     def _poll(self, timeout=None):
         self._assert_is_running()
         if timeout is None:
@@ -562,9 +646,8 @@ class AsyncVectorEnv(VectorEnv):
     def _check_spaces(self):
         self._assert_is_running()
         spaces = (self.single_observation_space, self.single_action_space)
-        for pipe in self.parent_pipes:
-            pipe.send(("_check_spaces", spaces))
-        results, successes = zip(*[pipe.recv() for pipe in self.parent_pipes])
+        self._send("_check_spaces", [spaces] * self.num_envs)
+        results, successes = self._recv()
         self._raise_if_errors(successes)
         same_observation_spaces, same_action_spaces = zip(*results)
         if not all(same_observation_spaces):
@@ -590,7 +673,7 @@ class AsyncVectorEnv(VectorEnv):
         if all(successes):
             return
 
-        num_errors = self.num_envs - sum(successes)
+        num_errors = len(successes) - sum(successes)
         assert num_errors > 0
         for i in range(num_errors):
             index, exctype, value = self.error_queue.get()
@@ -611,8 +694,10 @@ class AsyncVectorEnv(VectorEnv):
             self.close(terminate=True)
 
 
-def _worker(index, env_fn, pipe, parent_pipe, shared_memory, error_queue):
+def _worker(index, env_fn, pipe, parent_pipe, shared_memory, error_queue, cpu=None):
     assert shared_memory is None
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
     env = env_fn()
     parent_pipe.close()
     try:
@@ -678,10 +763,25 @@ def _worker(index, env_fn, pipe, parent_pipe, shared_memory, error_queue):
         env.close()
 
 
-def _worker_shared_memory(index, env_fn, pipe, parent_pipe, shared_memory, error_queue):
+def _worker_shared_memory(
+    index,
+    env_fn,
+    pipe,
+    parent_pipe,
+    shared_memory,
+    error_queue,
+    info_shared_memory=None,
+    cpu=None,
+):
     assert shared_memory is not None
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
     env = env_fn()
     observation_space = env.observation_space
+    if info_shared_memory is not None:
+        info_masks, info_views = read_info_from_shared_memory(
+            env.additional_info, info_shared_memory, n=None
+        )
     parent_pipe.close()
     try:
         while True:
@@ -691,6 +791,8 @@ def _worker_shared_memory(index, env_fn, pipe, parent_pipe, shared_memory, error
                 write_to_shared_memory(
                     observation_space, index, observation, shared_memory
                 )
+                if info_shared_memory is not None:
+                    info = write_info_to_shared_memory(index, info, info_masks, info_views)
                 pipe.send(((None, info), True))
 
             elif command == "step":
@@ -709,6 +811,8 @@ def _worker_shared_memory(index, env_fn, pipe, parent_pipe, shared_memory, error
                 write_to_shared_memory(
                     observation_space, index, observation, shared_memory
                 )
+                if info_shared_memory is not None:
+                    info = write_info_to_shared_memory(index, info, info_masks, info_views)
                 pipe.send(((None, reward, terminated, truncated, info), True))
             elif command == "seed":
                 env.seed(data)
@@ -747,3 +851,191 @@ def _worker_shared_memory(index, env_fn, pipe, parent_pipe, shared_memory, error
         pipe.send((None, False))
     finally:
         env.close()
+
+
+def _create_envs(env_fns: Sequence[Callable[[], Env]]) -> List[Env]:
+    return [env_fn() for env_fn in env_fns]
+
+
+def _worker_group(
+    index,
+    env_fn,
+    pipe,
+    parent_pipe,
+    shared_memory,
+    error_queue,
+    info_shared_memory=None,
+    env_indices=None,
+    cpu=None,
+):
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    envs = env_fn()
+    observation_space = envs[0].observation_space
+    if info_shared_memory is not None:
+        info_masks, info_views = read_info_from_shared_memory(
+            envs[0].additional_info, info_shared_memory, n=None
+        )
+    parent_pipe.close()
+
+    def write(env_index, observation, info):
+        if shared_memory is not None:
+            write_to_shared_memory(
+                observation_space, env_index, observation, shared_memory
+            )
+            observation = None
+        if info_shared_memory is not None:
+            info = write_info_to_shared_memory(env_index, info, info_masks, info_views)
+        return observation, info
+
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == "reset":
+                results = []
+                for env_index, env, kwargs in zip(env_indices, envs, data):
+                    observation, info = env.reset(**kwargs)
+                    results.append(write(env_index, observation, info))
+                pipe.send((results, True))
+            elif command == "step":
+                results = []
+                for env_index, env, action in zip(env_indices, envs, data):
+                    (
+                        observation,
+                        reward,
+                        terminated,
+                        truncated,
+                        info,
+                    ) = env.step(action)
+                    if terminated or truncated:
+                        old_observation, old_info = observation, info
+                        observation, info = env.reset()
+                        info["final_observation"] = old_observation
+                        info["final_info"] = old_info
+                    observation, info = write(env_index, observation, info)
+                    results.append((observation, reward, terminated, truncated, info))
+                pipe.send((results, True))
+            elif command == "seed":
+                for env, seed in zip(envs, data):
+                    env.seed(seed)
+                pipe.send(([None] * len(envs), True))
+            elif command == "close":
+                pipe.send((None, True))
+                break
+            elif command == "_call":
+                results = []
+                for env, (name, args, kwargs) in zip(envs, data):
+                    if name in ["reset", "step", "seed", "close"]:
+                        raise ValueError(
+                            f"Trying to call function `{name}` with "
+                            f"`_call`. Use `{name}` directly instead."
+                        )
+                    function = getattr(env, name)
+                    if callable(function):
+                        results.append(function(*args, **kwargs))
+                    else:
+                        results.append(function)
+                pipe.send((results, True))
+            elif command == "_setattr":
+                for env, (name, value) in zip(envs, data):
+                    setattr(env, name, value)
+                pipe.send(([None] * len(envs), True))
+            elif command == "_check_spaces":
+                pipe.send(
+                    (
+                        [
+                            (spaces[0] == observation_space, spaces[1] == env.action_space)
+                            for env, spaces in zip(envs, data)
+                        ],
+                        True,
+                    )
+                )
+            else:
+                raise RuntimeError(
+                    f"Received unknown command `{command}`. Must "
+                    "be one of {`reset`, `step`, `seed`, `close`, `_call`, "
+                    "`_setattr`, `_check_spaces`}."
+                )
+    except (KeyboardInterrupt, Exception):
+        error_queue.put((index,) + sys.exc_info()[:2])
+        pipe.send((None, False))
+    finally:
+        for env in envs:
+            env.close()
+
+
+def _state_leaves(state: State) -> list:
+    context_state = state.context_state
+    return [state.robot_state] + [
+        getattr(context_state, field.name) for field in fields(context_state)
+    ]
+
+
+def create_info_shared_memory(additional_info: Dict[str, Any], n: int, ctx=mp) -> dict:
+    """Create shared memory for additional infos of ``n`` sub-environments.
+
+    Each info is either a dict with "shape" and "dtype", or a :class:`State` whose
+    array and scalar fields are shared respectively (``None`` fields are not shared).
+    A boolean mask is shared for each info, telling whether it is written.
+    """
+    def create_array(value):
+        if value is None:
+            return None
+        value = np.asarray(value)
+        return ctx.Array(value.dtype.char, n * int(np.prod(value.shape)))
+
+    info_buffer = {}
+    for k, v in additional_info.items():
+        if isinstance(v, State):
+            buffer = [create_array(leaf) for leaf in _state_leaves(v)]
+        else:
+            buffer = create_array(np.zeros(v["shape"], dtype=v["dtype"]))
+        # bool is not a typecode of multiprocessing, so the mask is shared as uint8
+        info_buffer[k] = (ctx.Array(np.dtype(np.uint8).char, n), buffer)
+    return info_buffer
+
+
+def read_info_from_shared_memory(
+    additional_info: Dict[str, Any], info_buffer: dict, n: Optional[int] = None
+) -> Tuple[dict, dict]:
+    """Get masks and batched views of additional infos in shared memory.
+
+    ``n`` is only used to check the buffer size, and is inferred if ``None``.
+    """
+    def read_array(value, buffer):
+        if buffer is None:
+            return None
+        value = np.asarray(value)
+        array = np.frombuffer(buffer.get_obj(), dtype=value.dtype)
+        return array.reshape((-1,) + value.shape)
+
+    masks, views = {}, {}
+    for k, v in additional_info.items():
+        mask_buffer, buffer = info_buffer[k]
+        masks[k] = np.frombuffer(mask_buffer.get_obj(), dtype=np.bool_)
+        if isinstance(v, State):
+            leaves = [read_array(*e) for e in zip(_state_leaves(v), buffer)]
+            context_state = v.context_state.__class__(*leaves[1:])
+            views[k] = State(robot_state=leaves[0], context_state=context_state)
+        else:
+            views[k] = read_array(np.zeros(v["shape"], dtype=v["dtype"]), buffer)
+        assert n is None or masks[k].shape[0] == n
+    return masks, views
+
+
+def write_info_to_shared_memory(
+    index: int, info: dict, info_masks: dict, info_views: dict
+) -> dict:
+    """Write additional infos of the ``index``-th sub-environment into shared memory.
+
+    Returns:
+        The info without written entries, which is to be sent through pipe.
+    """
+    info = info.copy()
+    for k, view in info_views.items():
+        if k in info:
+            view[index] = info.pop(k)
+            info_masks[k][index] = True
+        else:
+            info_masks[k][index] = False
+    return info
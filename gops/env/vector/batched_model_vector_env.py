@@ -0,0 +1,307 @@
+#  Copyright (c). All Rights Reserved.
+#  General Optimal control Problem Solver (GOPS)
+#  Intelligent Driving Lab(iDLab), Tsinghua University
+
+#  Creator: iDLab
+#  Lab Leader: Prof. Shengbo Eben Li
+#  Email: lisb04@gmail.com
+
+#  Description: Vector environment stepping batched state with environment model
+#  Update Date: 2026-10-19, iDLab: create batched model vector env
+
+
+"""A vector environment stepping all sub-environments with one batched environment model."""
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+from numpy.typing import NDArray
+
+from gymnasium import Env
+from gops.env.env_gen_ocp.pyth_base import ContextState, State
+from gops.env.vector.vector_env import VectorEnv
+
+
+__all__ = ["BatchedModelVectorEnv"]
+
+
+class BatchedModelVectorEnv(VectorEnv):
+    """Vectorized environment keeping states of all sub-environments in one batched
+    :class:`State` of torch tensors, which is stepped by one forward of environment model.
+
+    Sub-environments are only used to reset, i.e. to sample initial robot states and
+    contexts. Reference windows of time-varying contexts are advanced by contexts of
+    sub-environments and then batched, while robot dynamics, reward, termination and
+    constraint are computed by environment model in batch. Sub-environments are reset
+    automatically when terminated or truncated by time limit, and the final observation
+    and info are stored in info, like :class:`SyncVectorEnv`.
+
+    Example:
+        >>> from gops.create_pkg.create_env import create_env
+        >>> env = create_env("veh3dof_tracking", vector_env_num=1000, vector_env_type="batched_model")
+        >>> obs, info = env.reset()
+        >>> obs, reward, terminated, truncated, info = env.step(env.action_space.sample())
+    """
+
+    def __init__(
+        self,
+        env_fns: Iterable[Callable[[], Env]],
+        model_fn: Callable[[], Any],
+        max_episode_steps: Optional[int] = None,
+        reward_scale: float = 1.0,
+    ):
+        """Vectorized environment stepping batched state with environment model.
+
+        Args:
+            env_fns: iterable of callable functions that create the environments.
+            model_fn: callable function that creates the environment model, wrapped in the
+                same way as the environments.
+            max_episode_steps: Maximum number of steps of an episode. If ``None``, the
+                ``max_episode_steps`` attribute of environment is used if it exists.
+            reward_scale: Scale of reward shaping, which also applies to termination penalty.
+        """
+        self.env_fns = env_fns
+        self.envs = [env_fn() for env_fn in env_fns]
+        self.model = model_fn()
+        self.metadata = self.envs[0].metadata
+        if max_episode_steps is None:
+            max_episode_steps = getattr(self.envs[0], "max_episode_steps", None)
+        self.max_episode_steps = max_episode_steps
+        # termination penalty is added by environment, not by model
+        self.termination_penalty = (
+            getattr(self.envs[0].unwrapped, "termination_penalty", 0.0) * reward_scale
+        )
+        super().__init__(
+            num_envs=len(self.envs),
+            observation_space=self.envs[0].observation_space,
+            action_space=self.envs[0].action_space,
+        )
+
+        self._state = None
+        self._obs = None
+        self._dynamic_context = False
+        self._elapsed_steps = np.zeros((self.num_envs,), dtype=np.int64)
+        self._actions = None
+
+    def seed(self, seed: Optional[Union[int, Sequence[int]]] = None):
+        """Sets the seed in all sub-environments.
+
+        Args:
+            seed: The seed
+        """
+        if seed is None:
+            seed = [None for _ in range(self.num_envs)]
+        if isinstance(seed, int):
+            seed = [seed + i for i in range(self.num_envs)]
+        assert len(seed) == self.num_envs
+
+        for env, single_seed in zip(self.envs, seed):
+            env.seed(single_seed)
+
+    def reset_wait(
+        self,
+        seed: Optional[Union[int, List[int]]] = None,
+        options: Optional[dict] = None,
+    ):
+        """Resets all sub-environments and batches their states.
+
+        Args:
+            seed: The reset environment seed
+            options: Option information for the environment reset
+
+        Returns:
+            The reset observation of the environment and reset information
+        """
+        if seed is None:
+            seed = [None for _ in range(self.num_envs)]
+        if isinstance(seed, int):
+            seed = [seed + i for i in range(self.num_envs)]
+        assert len(seed) == self.num_envs
+
+        observations, states = [], []
+        for env, single_seed in zip(self.envs, seed):
+            kwargs = {}
+            if single_seed is not None:
+                kwargs["seed"] = single_seed
+            if options is not None:
+                kwargs["options"] = options
+            observation, info = env.reset(**kwargs)
+            observations.append(observation)
+            states.append(info["state"])
+
+        context_state = states[0].context_state
+        self._dynamic_context = context_state.constraint is not None or (
+            np.ndim(context_state.reference) > 1
+        )
+        self._state = State.stack(states).array2tensor()
+        self._obs = torch.as_tensor(np.stack(observations), dtype=torch.float32)
+        self._elapsed_steps[:] = 0
+        return self._obs.numpy().copy(), self._get_infos(self._state)
+
+    def step_async(self, actions):
+        """Sets :attr:`_actions` for use by the :meth:`step_wait`."""
+        self._actions = torch.as_tensor(np.asarray(actions), dtype=torch.float32)
+
+    def step_wait(self) -> Tuple[Any, NDArray[Any], NDArray[Any], NDArray[Any], dict]:
+        """Steps batched state with environment model and resets finished sub-environments.
+
+        Returns:
+            The batched environment step results
+        """
+        with torch.no_grad():
+            next_obs, reward, terminated, next_info = self.model.forward(
+                self._obs,
+                self._actions,
+                torch.zeros(self.num_envs, dtype=torch.bool),
+                {"state": self._state},
+            )
+        next_state = next_info["state"]
+        if self._dynamic_context:
+            next_state = State(
+                robot_state=next_state.robot_state,
+                context_state=self._step_contexts(),
+            )
+        else:
+            next_state.context_state.t = 0
+        terminated = terminated.reshape(-1).numpy().astype(np.bool_)
+        reward = reward.reshape(-1).numpy().astype(np.float64)
+        reward[terminated] -= self.termination_penalty
+        self._elapsed_steps += 1
+        if self.max_episode_steps is None:
+            truncated = np.zeros((self.num_envs,), dtype=np.bool_)
+        else:
+            truncated = self._elapsed_steps >= self.max_episode_steps
+        truncated &= ~terminated
+
+        infos = self._get_infos(next_state)
+        done_index = np.flatnonzero(terminated | truncated)
+        if done_index.size > 0:
+            infos["final_observation"] = np.full(self.num_envs, None, dtype=object)
+            infos["final_info"] = np.full(self.num_envs, None, dtype=object)
+            for i in done_index:
+                infos["final_observation"][i] = next_obs[i].numpy().copy()
+                infos["final_info"][i] = {
+                    key: value[i] for key, value in infos.items()
+                    if not key.startswith("_") and not key.startswith("final")
+                }
+            infos["_final_observation"] = terminated | truncated
+            infos["_final_info"] = terminated | truncated
+            next_obs, next_state = self._reset_done(done_index, next_obs, next_state)
+            for i in done_index:
+                infos["state"][i] = next_state[i].tensor2array()
+                if "constraint" in infos:
+                    infos["constraint"][i] = self._get_constraint(next_state[[i]])[0]
+
+        self._obs = next_obs
+        self._state = next_state
+        return (
+            next_obs.numpy().copy(),
+            reward,
+            terminated,
+            truncated,
+            infos,
+        )
+
+    def _step_contexts(self) -> ContextState[torch.Tensor]:
+        """Advance contexts of all sub-environments and batch them."""
+        context_states = [env.unwrapped.context.step() for env in self.envs]
+        values = {}
+        for name in ("reference", "constraint"):
+            value = getattr(context_states[0], name)
+            if value is not None:
+                values[name] = torch.as_tensor(
+                    np.stack([getattr(c, name) for c in context_states])
+                )
+        return ContextState(t=0, **values)
+
+    def _reset_done(
+        self, index: NDArray[Any], obs: torch.Tensor, state: State[torch.Tensor]
+    ) -> Tuple[torch.Tensor, State[torch.Tensor]]:
+        """Reset finished sub-environments, and scatter their states into new batched state."""
+        obs = obs.clone()
+        robot_state = state.robot_state.clone()
+        context_state = ContextState(
+            reference=state.context_state.reference.clone(),
+            constraint=None
+            if state.context_state.constraint is None
+            else state.context_state.constraint.clone(),
+            t=state.context_state.t,
+        )
+        for i in index:
+            observation, info = self.envs[i].reset()
+            obs[i] = torch.as_tensor(observation, dtype=torch.float32)
+            robot_state[i] = torch.as_tensor(info["state"].robot_state)
+            context_state.reference[i] = torch.as_tensor(
+                info["state"].context_state.reference
+            )
+            if context_state.constraint is not None:
+                context_state.constraint[i] = torch.as_tensor(
+                    info["state"].context_state.constraint
+                )
+        self._elapsed_steps[index] = 0
+        return obs, State(robot_state=robot_state, context_state=context_state)
+
+    def _get_infos(self, state: State[torch.Tensor]) -> dict:
+        """Unbatch state into info of each sub-environment."""
+        state = state.tensor2array()
+        infos = {"state": np.empty(self.num_envs, dtype=object)}
+        for i in range(self.num_envs):
+            infos["state"][i] = state[i]
+        infos["_state"] = np.ones(self.num_envs, dtype=np.bool_)
+        if self.model.get_constraint is not None:
+            infos["constraint"] = self._get_constraint(state.array2tensor())
+            infos["_constraint"] = np.ones(self.num_envs, dtype=np.bool_)
+        return infos
+
+    def _get_constraint(self, state: State[torch.Tensor]) -> NDArray[Any]:
+        with torch.no_grad():
+            return self.model.get_constraint(state).numpy()
+
+    def call(self, name, *args, **kwargs) -> tuple:
+        """Calls the method with name of sub-environments and applies args and kwargs.
+
+        Args:
+            name: The method name
+            *args: The method args
+            **kwargs: The method kwargs
+
+        Returns:
+            Tuple of results
+        """
+        results = []
+        for env in self.envs:
+            function = getattr(env, name)
+            if callable(function):
+                results.append(function(*args, **kwargs))
+            else:
+                results.append(function)
+
+        return tuple(results)
+
+    def set_attr(self, name: str, values: Union[list, tuple, Any]):
+        """Sets an attribute of the sub-environments.
+
+        Args:
+            name: The property name to change
+            values: Values of the property to be set to. If ``values`` is a list or
+                tuple, then it corresponds to the values for each individual
+                environment, otherwise, a single value is set for all environments.
+
+        Raises:
+            ValueError: Values must be a list or tuple with length equal to the number of environments.
+        """
+        if not isinstance(values, (list, tuple)):
+            values = [values for _ in range(self.num_envs)]
+        if len(values) != self.num_envs:
+            raise ValueError(
+                "Values must be a list or tuple with length equal to the "
+                f"number of environments. Got `{len(values)}` values for "
+                f"{self.num_envs} environments."
+            )
+
+        for env, value in zip(self.envs, values):
+            setattr(env, name, value)
+
+    def close_extras(self, **kwargs):
+        """Close the environments."""
+        [env.close() for env in self.envs]
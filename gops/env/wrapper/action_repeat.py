@@ -8,11 +8,12 @@
 #
 #  Description: action repeat wrappers for data and model type environment
 #  Update: 2022-11-15, Wenxuan Wang: create action repeat wrapper
+#  Update: 2026-10-19, iDLab: add jacobian of transition
 
 
 from __future__ import annotations
 
-from typing import TypeVar, Tuple, Union
+from typing import Optional, TypeVar, Tuple, Union
 
 import gym
 import torch
@@ -85,3 +86,23 @@ class ActionRepeatModel(ModelWrapper):
         if not self.sum_reward:
             sum_reward = reward
         return next_obs, sum_reward, next_done, next_info
+
+    def jacobian(
+        self,
+        state: torch.Tensor,
+        action: torch.Tensor,
+        info: Optional[InfoDict] = None,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        info = {} if info is None else info
+        done = torch.zeros(state.shape[0], dtype=torch.bool, device=state.device)
+        # chain rule over repeated steps
+        for i in range(self.repeat_num):
+            jac_s, jac_a = self.model.jacobian(state, action, info)
+            if i == 0:
+                jac_state, jac_action = jac_s, jac_a
+            else:
+                jac_state, jac_action = jac_s @ jac_state, jac_s @ jac_action + jac_a
+            if i < self.repeat_num - 1:
+                with torch.no_grad():
+                    state, _, _, info = self.model.forward(state, action, done, info)
+        return jac_state, jac_action
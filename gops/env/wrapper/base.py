@@ -9,15 +9,18 @@
 #  Description: base wrapper for model type environments
 #  Update: 2022-09-21, Yuhang Zhang: create base wrapper
 #  Update: 2022-10-26, Yujie Yang: rewrite base wrapper
+#  Update: 2026-10-19, iDLab: add jacobian of transition
+#  Update: 2026-10-19, iDLab: closed-form optimal value of wrapped models
 
 
-from typing import Tuple
+from typing import Optional, Tuple
 
 import gym
 import torch
 
 from gops.env.env_ocp.env_model.pyth_base_model import PythBaseModel
 from gops.utils.gops_typing import InfoDict
+from gops.utils.math_utils import batch_jacobian
 
 
 class ModelWrapper:
@@ -48,7 +51,22 @@ class ModelWrapper:
     def get_reward(self, state: torch.Tensor, action: torch.Tensor) -> torch.Tensor:
         return self.model.get_reward(state, action)
 
+    def jacobian(
+        self,
+        state: torch.Tensor,
+        action: torch.Tensor,
+        info: Optional[InfoDict] = None,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        return self.model.jacobian(state, action, info)
+
+    def robot_model_jacobian(self, robot_state: torch.Tensor, action: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        return self.model.robot_model.jacobian(robot_state, action)
+
     def __getattr__(self, name):
+        if name == "optimal_value":
+            # closed-form optimal value is in observation and reward units of the
+            # wrapped model, so it is only exposed by wrappers defining it
+            raise AttributeError(f"{type(self).__name__} has no optimal_value.")
         return getattr(self.model, name)
 
     @property
@@ -93,5 +111,29 @@ class ActionModelWrapper(ModelWrapper):
             action = self.action(action)
         return super().get_reward(state, action)
 
+    def jacobian(
+        self,
+        state: torch.Tensor,
+        action: torch.Tensor,
+        info: Optional[InfoDict] = None,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        jac_state, jac_action = super().jacobian(state, self.action(action), info)
+        return jac_state, jac_action @ self.action_jacobian(action).to(jac_action.dtype)
+
+    def robot_model_jacobian(self, robot_state: torch.Tensor, action: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        jac_state, jac_action = super().robot_model_jacobian(robot_state, self.action(action))
+        return jac_state, jac_action @ self.action_jacobian(action).to(jac_action.dtype)
+
+    @property
+    def optimal_value(self):
+        # unconstrained optimal value does not depend on parameterization of action
+        return self.model.optimal_value
+
     def action(self, action: torch.Tensor) -> torch.Tensor:
         raise NotImplementedError
+
+    def action_jacobian(self, action: torch.Tensor) -> torch.Tensor:
+        """Jacobian of transformed action w.r.t. action, of shape [B, action_dim, action_dim].
+        Computed by autograd by default.
+        """
+        return batch_jacobian(lambda _, a: self.action(a), action, action)[1]
@@ -8,10 +8,12 @@
 #
 #  Description: model type environment wrapper that clips action to action space
 #  Update: 2022-10-27, Yujie Yang: create action clip wrapper
+#  Update: 2026-10-19, iDLab: add jacobian of transition
+#  Update: 2026-10-19, iDLab: closed-form optimal value of wrapped models
 
 
 import warnings
-from typing import Tuple
+from typing import Optional, Tuple
 
 import torch
 
@@ -38,3 +40,20 @@ class ClipActionModel(ModelWrapper):
             warnings.warn("Action out of space!")
 
         return super().forward(obs, action_clip, done, info)
+
+    def jacobian(
+        self,
+        state: torch.Tensor,
+        action: torch.Tensor,
+        info: Optional[InfoDict] = None,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        low, high = self.model.action_lower_bound, self.model.action_upper_bound
+        jac_state, jac_action = super().jacobian(state, action.clip(low, high), info)
+        # clipped action has zero derivative
+        unclipped = (action >= low) & (action <= high)
+        return jac_state, jac_action * unclipped.unsqueeze(1)
+
+    @property
+    def optimal_value(self):
+        # unconstrained optimal value is not affected by action clipping
+        return self.model.optimal_value
@@ -8,10 +8,12 @@
 #
 #  Description: model type environment wrapper that clips observation to observation space
 #  Update: 2022-10-27, Yujie Yang: create obs clip wrapper
+#  Update: 2026-10-19, iDLab: add jacobian of transition
+#  Update: 2026-10-19, iDLab: closed-form optimal value of wrapped models
 
 
 import warnings
-from typing import Tuple
+from typing import Optional, Tuple
 
 import torch
 
@@ -42,3 +44,27 @@ class ClipObservationModel(ModelWrapper):
             warnings.warn("Observation out of space!")
 
         return next_obs_clip, reward, next_done, next_info
+
+    def jacobian(
+        self,
+        state: torch.Tensor,
+        action: torch.Tensor,
+        info: Optional[InfoDict] = None,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        jac_state, jac_action = super().jacobian(state, action, info)
+        done = torch.zeros(state.shape[0], dtype=torch.bool, device=state.device)
+        with torch.no_grad():
+            next_obs = self.model.forward(
+                state, action, done, {} if info is None else info
+            )[0]
+        # clipped observation has zero derivative
+        unclipped = (
+            (next_obs >= self.model.obs_lower_bound)
+            & (next_obs <= self.model.obs_upper_bound)
+        ).unsqueeze(2)
+        return jac_state * unclipped, jac_action * unclipped
+
+    @property
+    def optimal_value(self):
+        # unconstrained optimal value is not affected by observation clipping
+        return self.model.optimal_value
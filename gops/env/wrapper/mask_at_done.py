@@ -8,6 +8,7 @@
 #
 #  Description: model type environment wrapper
 #  Update: 2022-10-27, Yujie Yang: create mask done wrapper
+#  Update: 2026-10-19, iDLab: closed-form optimal value of wrapped models
 
 
 from typing import Tuple
@@ -38,3 +39,8 @@ class MaskAtDoneModel(ModelWrapper):
         reward = ~done * reward
         next_done = next_done.bool() | done
         return next_obs, reward, next_done, next_info
+
+    @property
+    def optimal_value(self):
+        # unconstrained optimal value is not affected by masking after done
+        return self.model.optimal_value
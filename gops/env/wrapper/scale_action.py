@@ -81,3 +81,10 @@ class ScaleActionModel(ActionModelWrapper):
         )
         action = torch.clip(action, low, high)
         return action
+
+    def action_jacobian(self, action: torch.Tensor) -> torch.Tensor:
+        low = self.model.action_lower_bound
+        high = self.model.action_upper_bound
+        scale = (high - low) / (self.max_action - self.min_action)
+        unclipped = (action >= self.min_action) & (action <= self.max_action)
+        return torch.diag_embed(scale * unclipped)
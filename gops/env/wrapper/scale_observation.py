@@ -9,11 +9,13 @@
 #  Description: data and model type environment wrappers that scale observation
 #  Update: 2022-09-21, Yuhang Zhang: create scale observation wrapper
 #  Update: 2022-10-27, Yujie Yang: rewrite scale observation wrapper
+#  Update: 2026-10-19, iDLab: add jacobian of transition
+#  Update: 2026-10-19, iDLab: closed-form optimal value of wrapped models
 
 
 from __future__ import annotations
 
-from typing import Tuple, Union
+from typing import Callable, Optional, Tuple, Union
 
 import gym
 import numpy as np
@@ -114,3 +116,28 @@ class ScaleObservationModel(ModelWrapper):
         )
         scaled_next_obs = (next_obs + self.shift) * self.scale
         return scaled_next_obs, reward, next_done, next_info
+
+    def jacobian(
+        self,
+        state: torch.Tensor,
+        action: torch.Tensor,
+        info: Optional[InfoDict] = None,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        unscaled_obs = state / self.scale - self.shift
+        jac_state, jac_action = self.model.jacobian(unscaled_obs, action, info)
+        scale = torch.zeros_like(state[0]) + self.scale
+        return (
+            scale.unsqueeze(1) * jac_state / scale,
+            scale.unsqueeze(1) * jac_action,
+        )
+
+    @property
+    def optimal_value(self) -> Callable[..., torch.Tensor]:
+        optimal_value = self.model.optimal_value
+
+        def scaled_optimal_value(
+            obs: torch.Tensor, gamma: float = 0.99, horizon: Optional[int] = None
+        ) -> torch.Tensor:
+            return optimal_value(obs / self.scale - self.shift, gamma, horizon)
+
+        return scaled_optimal_value
@@ -9,11 +9,12 @@
 #  Description: data and model type environment wrappers that scale observation
 #  Update: 2022-09-21, Yuhang Zhang: create scale reward wrapper
 #  Update: 2022-10-27, Yujie Yang: rewrite scale reward wrapper
+#  Update: 2026-10-19, iDLab: closed-form optimal value of wrapped models
 
 
 from __future__ import annotations
 
-from typing import Tuple, Union
+from typing import Callable, Optional, Tuple, Union
 
 import gym
 import torch
@@ -86,3 +87,18 @@ class ShapingRewardModel(ModelWrapper):
         )
         reward_scaled = (reward + self.shift) * self.scale
         return next_obs, reward_scaled, next_done, next_info
+
+    @property
+    def optimal_value(self) -> Callable[..., torch.Tensor]:
+        optimal_value = self.model.optimal_value
+
+        def shaped_optimal_value(
+            obs: torch.Tensor, gamma: float = 0.99, horizon: Optional[int] = None
+        ) -> torch.Tensor:
+            if horizon is None:
+                shift_sum = 1 / (1 - gamma)
+            else:
+                shift_sum = sum(gamma ** k for k in range(horizon))
+            return (optimal_value(obs, gamma, horizon) + self.shift * shift_sum) * self.scale
+
+        return shaped_optimal_value
@@ -8,16 +8,27 @@
 #
 #  Description: Implementation of optimal controller based on MPC
 #  Update: 2022-12-05, Zhilong Zheng: create OptController
+#  Update: 2026-10-19, iDLab: add sparse jacobian and exact hessian
+#  Update: 2026-10-19, iDLab: add real-time iteration mode and latency statistics
+#  Update: 2026-10-19, iDLab: assemble transition jacobian from model jacobian
+#  Update: 2026-10-19, iDLab: fall back to dense hessian for older cyipopt
 
 
 import time
 from typing import Callable, Optional, Tuple, Union
 import warnings
 from gops.env.env_ocp.env_model.pyth_base_model import PythBaseModel
+from gops.sys_simulator.sparse_derivative import (
+    BandedHessian,
+    BandedJacobian,
+    TransitionJacobian,
+    coo_array,
+    sparse_hessian_supported,
+)
 from gops.utils.gops_typing import InfoDict
 import torch
-from functorch import jacrev
 import numpy as np
+import cyipopt
 from cyipopt import minimize_ipopt
 import scipy.optimize as opt
 
@@ -45,6 +56,19 @@ class OptController:
     :param str mode:
         (Optional) Specify method to be used to solve optimal control problem.
         Valid value: {"shooting", "collocation"}. Default to "collocation".
+    :param bool sparse_jac:
+        (Optional) Whether to pass constraint jacobians to IPOPT in sparse format (collocation only).
+        Each rollout state only depends on two neighboring control points, so the jacobian is block banded
+        and computed with a few batched vector-jacobian products, while transition constraint jacobian
+        is assembled from jacobian of model. Requires cyipopt>=1.2. Default to True.
+    :param bool exact_hessian:
+        (Optional) Whether to pass exact hessian of Lagrangian to IPOPT,
+        otherwise IPOPT uses limited-memory approximation. Hessian is passed in sparse format
+        with cyipopt>=1.5 and scipy>=1.13, and in dense format otherwise. Default to False.
+    :param int rti_max_iter:
+        (Optional) Maximum number of IPOPT iterations per control step, for real-time iteration.
+        Except for the first step, each step is warm-started from the shifted previous solution,
+        and the last iterate is applied even if it has not converged. Default to None (solve to convergence).
     """
 
     def __init__(
@@ -58,6 +82,9 @@ class OptController:
         minimize_options: Optional[dict] = None,
         verbose: int = 0,
         mode: str = "collocation",
+        sparse_jac: bool = True,
+        exact_hessian: bool = False,
+        rti_max_iter: Optional[int] = None,
     ):
 
         self.model = model
@@ -80,6 +107,18 @@ class OptController:
             self.rollout_mode = "loop"
         elif self.mode == "collocation":
             self.rollout_mode = "batch"
+        self.sparse_jac = sparse_jac and self.mode == "collocation"
+        self.exact_hessian = exact_hessian
+        self.sparse_hess = sparse_hessian_supported(cyipopt.__version__)
+        # sparsity patterns are built after the first rollout, when rollout mode is fixed
+        self._jac_patterns = {}
+        self._hess_pattern = None
+        # rollout of the latest iterate, shared by cost, constraints and their derivatives
+        self._iterate = None
+        self.rti_max_iter = rti_max_iter
+        # wall-clock time of each control step, kept over calls for latency statistics
+        self.latency_list = []
+        self.unconverged_steps = 0
 
         if use_terminal_cost:
             if terminal_cost is not None:
@@ -126,38 +165,49 @@ class OptController:
 
         Return: optimal control input for current state x
         """
+        start_time = time.time()
         x = torch.tensor(x, dtype=torch.float32)
         if info:
             info = info.copy()
             for (key, value) in info.items():
                 info[key] = torch.tensor(value, dtype=torch.float32)
+        self._iterate = None
+        constraints = [
+            {
+                "type": "ineq",
+                "fun": self._constraint_fcn,
+                "jac": self._constraint_jac,
+                "args": (x, info),
+            },
+            {
+                "type": "eq",
+                "fun": self._trans_constraint_fcn,
+                "jac": self._trans_constraint_jac,
+                "args": (x, info),
+            },
+        ]
+        if self.exact_hessian:
+            constraints[0]["hess"] = self._constraint_hess
+            constraints[1]["hess"] = self._trans_constraint_hess
         res = minimize_ipopt(
             fun=self._cost_fcn_and_jac,
             x0=self.initial_guess,
             args=(x, info),
             jac=True,
+            hess=self._cost_hess if self.exact_hessian else None,
             bounds=opt._constraints.new_bounds_to_old(
                 self.bounds.lb, self.bounds.ub, self.num_ctrl_points * self.optimize_dim
             ),
-            constraints=[
-                {
-                    "type": "ineq",
-                    "fun": self._constraint_fcn,
-                    "jac": self._constraint_jac,
-                    "args": (x, info),
-                },
-                {
-                    "type": "eq",
-                    "fun": self._trans_constraint_fcn,
-                    "jac": self._trans_constraint_jac,
-                    "args": (x, info),
-                },
-            ],
-            options=self.minimize_options,
+            constraints=constraints,
+            options=self._get_minimize_options(),
         )
+        self._iterate = None
         self.initial_guess = np.concatenate(
             (res.x[self.optimize_dim :], res.x[-self.optimize_dim :])
         )
+        self.latency_list.append(time.time() - start_time)
+        if not res.success:
+            self.unconverged_steps += 1
         if self.verbose > 0:
             self._print_statistics(res)
         return res.x.reshape((self.num_ctrl_points, self.optimize_dim))[
@@ -170,72 +220,246 @@ class OptController:
         """
         Compute value and jacobian of cost function
         """
-        inputs = torch.tensor(inputs, dtype=torch.float32, requires_grad=True)
-        cost = self._compute_cost(inputs, x, info)
-        jac = torch.autograd.grad(cost, inputs)[0]
+        iterate = self._get_iterate(inputs, x, info)
+        cost = iterate["cost"]
+        jac = torch.autograd.grad(cost, iterate["inputs"], retain_graph=True)[0]
         return cost.detach().item(), jac.numpy().astype("d")
 
+    def _cost_hess(
+        self, inputs: np.ndarray, x: torch.Tensor, info: InfoDict
+    ) -> Union[np.ndarray, coo_array]:
+        """
+        Compute hessian of cost function
+        """
+        iterate = self._get_iterate(inputs, x, info)
+        hess = self._get_hess_pattern()(iterate["cost"], iterate["inputs"])
+        return hess if self.sparse_hess else hess.toarray()
+
     def _constraint_fcn(
-        self, inputs: Union[np.ndarray, torch.Tensor], x: torch.Tensor, info: InfoDict
+        self, inputs: np.ndarray, x: torch.Tensor, info: InfoDict
     ) -> torch.Tensor:
-
-        if self.model.get_constraint is None:
-            return torch.tensor([0.0])
-        else:
+        if self.model.get_constraint is not None:
             self.constraint_evaluations += 1
-
-            if isinstance(inputs, np.ndarray):
-                inputs = torch.tensor(inputs, dtype=torch.float32)
-            states, _, infos = self._rollout(inputs, x, info)
-            if info:
-                for key in info.keys():
-                    infos[key] = torch.cat(infos[key])
-
-            # model.get_constraint() returns Tensor, each element of which
-            # should be required to be lower than or equal to 0
-            # minimize_ipopt() takes inequality constraints that should be greater than or equal to 0
-            cstr_vector = -self.model.get_constraint(states, infos).reshape(-1)
-            return cstr_vector
+        return self._get_iterate(inputs, x, info)["constraint"].detach()
 
     def _constraint_jac(
         self, inputs: np.ndarray, x: torch.Tensor, info: InfoDict
-    ) -> np.ndarray:
+    ) -> Union[np.ndarray, coo_array]:
         """
         Compute jacobian of constraint function
         """
-        inputs = torch.tensor(inputs, dtype=torch.float32)
-        jac = jacrev(self._constraint_fcn)(inputs, x, info)
-        return jac.numpy().astype("d")
+        iterate = self._get_iterate(inputs, x, info)
+        cstr_vector = iterate["constraint"]
+        # constraints are evaluated on rollout states of timestep 0 to T
+        num_steps = self.num_pred_step + 1
+        if cstr_vector.shape[0] % num_steps == 0:
+            steps = np.arange(cstr_vector.shape[0]) // (
+                cstr_vector.shape[0] // num_steps
+            )
+        else:
+            steps = None
+        jac = self._get_jac_pattern("constraint", steps, cstr_vector.shape[0])(
+            cstr_vector, iterate["inputs"]
+        )
+        return jac if self.sparse_jac else jac.toarray()
+
+    def _constraint_hess(
+        self,
+        inputs: np.ndarray,
+        lagrange: np.ndarray,
+        x: torch.Tensor,
+        info: InfoDict,
+    ) -> Union[np.ndarray, coo_array]:
+        """
+        Compute hessian of constraint function weighted by lagrange multipliers
+        """
+        iterate = self._get_iterate(inputs, x, info)
+        lagrange = torch.tensor(lagrange, dtype=torch.float32)
+        hess = self._get_hess_pattern()(
+            iterate["constraint"] @ lagrange, iterate["inputs"]
+        )
+        return hess if self.sparse_hess else hess.toarray()
 
     def _trans_constraint_fcn(
-        self, inputs: Union[np.ndarray, torch.Tensor], x: torch.Tensor, info: InfoDict
+        self, inputs: np.ndarray, x: torch.Tensor, info: InfoDict
     ) -> torch.Tensor:
         """
         Transition constraint function (collocation only)
         """
-        if self.mode == "shooting":
-            return torch.tensor([0.0])
-        elif self.mode == "collocation":
+        if self.mode == "collocation":
             self.constraint_evaluations += 1
-
-            if isinstance(inputs, np.ndarray):
-                inputs = torch.tensor(inputs, dtype=torch.float32)
-            true_states, _, _ = self._rollout(inputs, x, info)
-            true_states = true_states[1 :: self.ctrl_interval, :].reshape(-1)
-            input_states = inputs.reshape((-1, self.optimize_dim))[
-                :, -self.obs_dim :
-            ].reshape(-1)
-            return true_states - input_states
+        return self._get_iterate(inputs, x, info)["trans_constraint"].detach()
 
     def _trans_constraint_jac(
         self, inputs: np.ndarray, x: torch.Tensor, info: InfoDict
-    ) -> np.ndarray:
+    ) -> Union[np.ndarray, coo_array]:
         """
         Compute jacobian of transition constraint function (collocation only)
         """
-        inputs = torch.tensor(inputs, dtype=torch.float32)
-        jac = jacrev(self._trans_constraint_fcn)(inputs, x, info)
-        return jac.numpy().astype("d")
+        iterate = self._get_iterate(inputs, x, info)
+        trans_cstr = iterate["trans_constraint"]
+        if self.sparse_jac and self.rollout_mode == "batch":
+            # transition k is one model step from state of control point k - 1
+            inputs_tensor = iterate["inputs"].detach().reshape((-1, self.optimize_dim))
+            xs = torch.cat((x.unsqueeze(0), inputs_tensor[:-1, -self.obs_dim :]))
+            us = inputs_tensor[:, : self.action_dim]
+            return self._get_trans_jac_pattern()(*self.model.jacobian(xs, us, {}))
+        if self.mode == "collocation":
+            # transition constraints are evaluated on rollout states of timestep 1, 1 + ctrl_interval, ...
+            steps = np.repeat(
+                np.arange(self.num_ctrl_points) * self.ctrl_interval + 1,
+                self.obs_dim,
+            )
+        else:
+            steps = None
+        jac = self._get_jac_pattern("trans_constraint", steps, trans_cstr.shape[0])(
+            trans_cstr, iterate["inputs"]
+        )
+        return jac if self.sparse_jac else jac.toarray()
+
+    def _trans_constraint_hess(
+        self,
+        inputs: np.ndarray,
+        lagrange: np.ndarray,
+        x: torch.Tensor,
+        info: InfoDict,
+    ) -> Union[np.ndarray, coo_array]:
+        """
+        Compute hessian of transition constraint function weighted by lagrange multipliers
+        """
+        iterate = self._get_iterate(inputs, x, info)
+        lagrange = torch.tensor(lagrange, dtype=torch.float32)
+        hess = self._get_hess_pattern()(
+            iterate["trans_constraint"] @ lagrange, iterate["inputs"]
+        )
+        return hess if self.sparse_hess else hess.toarray()
+
+    def get_latency_statistics(self) -> dict:
+        """
+        Summary statistics of wall-clock time per control step (in seconds) over all calls
+        """
+        latency = np.array(self.latency_list)
+        return {
+            "steps": len(latency),
+            "mean": float(np.mean(latency)),
+            "50%": float(np.percentile(latency, 50)),
+            "95%": float(np.percentile(latency, 95)),
+            "max": float(np.max(latency)),
+            "unconverged_steps": self.unconverged_steps,
+        }
+
+    def _get_minimize_options(self) -> dict:
+        """
+        Get IPOPT options of this control step, with iteration limit in real-time iteration mode
+        """
+        options = dict(self.minimize_options or {})
+        if self.rti_max_iter is not None and self.latency_list:
+            # shifted previous solution is close to optimal, so keep barrier parameter small
+            # and don't push the starting point away from active bounds
+            options.setdefault("mu_strategy", "monotone")
+            options.setdefault("mu_init", 1e-4)
+            options.setdefault("bound_push", 1e-6)
+            options.setdefault("bound_frac", 1e-6)
+            options.pop("maxiter", None)
+            options["max_iter"] = self.rti_max_iter
+        return options
+
+    def _get_iterate(
+        self, inputs: np.ndarray, x: torch.Tensor, info: InfoDict
+    ) -> dict:
+        """
+        Rollout once at an iterate and compute cost and constraints on the same graph,
+        which are shared by all evaluations and derivatives IPOPT requests at this iterate
+        """
+        if self._iterate is not None and np.array_equal(self._iterate["key"], inputs):
+            self.rollouts_saved += 1
+            return self._iterate
+
+        inputs_tensor = torch.tensor(inputs, dtype=torch.float32, requires_grad=True)
+        states, rewards, infos = self._rollout(inputs_tensor, x, info)
+
+        # sum up integral costs from timestep 0 to T-1
+        cost = torch.sum(rewards)
+        # Terminal cost for timestep T
+        if self.terminal_cost is not None:
+            terminal_cost = self.terminal_cost(states[-1, :])
+            cost += terminal_cost * (self.gamma ** self.num_pred_step)
+
+        if self.model.get_constraint is None:
+            cstr_vector = torch.tensor([0.0])
+        else:
+            if info:
+                for key in info.keys():
+                    infos[key] = torch.cat(infos[key])
+            # model.get_constraint() returns Tensor, each element of which
+            # should be required to be lower than or equal to 0
+            # minimize_ipopt() takes inequality constraints that should be greater than or equal to 0
+            cstr_vector = -self.model.get_constraint(states, infos).reshape(-1)
+
+        if self.mode == "shooting":
+            trans_cstr = torch.tensor([0.0])
+        elif self.mode == "collocation":
+            true_states = states[1 :: self.ctrl_interval, :].reshape(-1)
+            input_states = inputs_tensor.reshape((-1, self.optimize_dim))[
+                :, -self.obs_dim :
+            ].reshape(-1)
+            trans_cstr = true_states - input_states
+
+        self._iterate = {
+            "key": inputs.copy(),
+            "inputs": inputs_tensor,
+            "cost": cost,
+            "constraint": cstr_vector,
+            "trans_constraint": trans_cstr,
+        }
+        return self._iterate
+
+    def _get_jac_pattern(
+        self, name: str, steps: Optional[np.ndarray], num_outputs: int
+    ) -> BandedJacobian:
+        """
+        Get sparsity pattern of constraint jacobian,
+        steps are timesteps of rollout states each constraint is evaluated on (None if unknown)
+        """
+        if name not in self._jac_patterns:
+            if self.sparse_jac and self.rollout_mode == "batch" and steps is not None:
+                # states in control interval k only depend on action of control point k
+                # and state of control point k - 1, while state at timestep 0 is given
+                anchors = np.where(steps > 0, (steps - 1) // self.ctrl_interval, -1)
+                width = 2
+            else:
+                anchors = np.full(num_outputs, self.num_ctrl_points - 1)
+                width = self.num_ctrl_points
+            self._jac_patterns[name] = BandedJacobian(
+                anchors, self.num_ctrl_points, self.optimize_dim, width
+            )
+        return self._jac_patterns[name]
+
+    def _get_trans_jac_pattern(self) -> TransitionJacobian:
+        """
+        Get sparsity pattern of transition constraint jacobian assembled from model jacobian
+        """
+        if "model_trans_constraint" not in self._jac_patterns:
+            self._jac_patterns["model_trans_constraint"] = TransitionJacobian(
+                self.num_ctrl_points, self.action_dim, self.obs_dim
+            )
+        return self._jac_patterns["model_trans_constraint"]
+
+    def _get_hess_pattern(self) -> BandedHessian:
+        """
+        Get sparsity pattern of hessian of cost and constraint functions
+        """
+        if self._hess_pattern is None:
+            if self.mode == "collocation" and self.rollout_mode == "batch":
+                # rewards, constraints and states in control interval k
+                # couple control point k and k - 1 only
+                bandwidth = 1
+            else:
+                bandwidth = self.num_ctrl_points - 1
+            self._hess_pattern = BandedHessian(
+                self.num_ctrl_points, self.optimize_dim, bandwidth
+            )
+        return self._hess_pattern
 
     def _rollout(
         self, inputs: torch.Tensor, x: torch.Tensor, info: InfoDict
@@ -301,24 +525,6 @@ class OptController:
         self.system_simulation_time += et - st
         return states, rewards, infos
 
-    def _compute_cost(
-        self, inputs: torch.Tensor, x: torch.Tensor, info: InfoDict
-    ) -> torch.Tensor:
-        """
-        Compute total cost of optimization inputs
-        """
-        # rollout states and rewards
-        states, rewards, _ = self._rollout(inputs, x, info)
-
-        # sum up integral costs from timestep 0 to T-1
-        cost = torch.sum(rewards)
-
-        # Terminal cost for timestep T
-        if self.terminal_cost is not None:
-            terminal_cost = self.terminal_cost(states[-1, :])
-            cost += terminal_cost * (self.gamma ** self.num_pred_step)
-        return cost
-
     def _reset_statistics(self):
         """
         Reset counters for keeping track of statistics
@@ -326,6 +532,7 @@ class OptController:
         self.constraint_evaluations = 0
         self.system_simulations = 0
         self.system_simulation_time = 0
+        self.rollouts_saved = 0
 
     def _print_statistics(self, res: opt.OptimizeResult, reset=True):
         """
@@ -339,6 +546,8 @@ class OptController:
             print("* Constraint calls:", self.constraint_evaluations)
         print("* System simulations:", self.system_simulations)
         print("* System simulation time:", self.system_simulation_time)
+        print("* Rollouts saved by caching:", self.rollouts_saved)
+        print("* Solve time:", self.latency_list[-1])
         print("* Final cost:", res.fun, "\n")
         if reset:
             self._reset_statistics()
@@ -0,0 +1,209 @@
+#  Copyright (c). All Rights Reserved.
+#  General Optimal control Problem Solver (GOPS)
+#  Intelligent Driving Lab(iDLab), Tsinghua University
+#
+#  Creator: iDLab
+#  Lab Leader: Prof. Shengbo Eben Li
+#  Email: lisb04@gmail.com
+#
+#  Description: Sparse jacobian and hessian with banded structure for MPC
+#  Update: 2026-10-19, iDLab: create sparse derivative
+#  Update: 2026-10-19, iDLab: add transition jacobian from model jacobians
+#  Update: 2026-10-19, iDLab: fall back to dense hessian for older cyipopt
+
+
+import re
+from typing import Sequence
+
+import numpy as np
+import torch
+
+try:
+    from scipy.sparse import coo_array
+except ImportError:
+    # coo_array was introduced with scipy 1.8
+    from scipy.sparse import coo_matrix as coo_array
+
+
+def sparse_hessian_supported(cyipopt_version: str) -> bool:
+    """Whether minimize_ipopt takes hessians in sparse format. cyipopt reads sparse
+    hessians through coo_array.coords since 1.5 (coords is available since scipy 1.13),
+    while older versions index dense hessians."""
+    version = tuple(int(v) for v in re.findall(r"\d+", cyipopt_version)[:2])
+    return version >= (1, 5) and hasattr(coo_array((1, 1)), "coords")
+
+
+class BandedJacobian:
+    """Sparse jacobian of outputs depending on a band of consecutive input rows.
+
+    Inputs are viewed as a matrix of shape [num_rows, row_dim], and output i only
+    depends on rows from anchors[i] - width + 1 to anchors[i] (no row if anchors[i] < 0).
+    Outputs whose anchors are congruent modulo width have disjoint dependencies,
+    so they share one seed of vector-jacobian product, and all products are
+    computed in one batched backward pass.
+
+    :param Sequence[int] anchors: Last input row each output depends on.
+    :param int num_rows: Number of input rows.
+    :param int row_dim: Dimension of each input row.
+    :param int width: Number of consecutive input rows each output depends on.
+    """
+
+    def __init__(
+        self, anchors: Sequence[int], num_rows: int, row_dim: int, width: int
+    ):
+        anchors = np.asarray(anchors, dtype=np.int64)
+        self.shape = (anchors.shape[0], num_rows * row_dim)
+
+        # rank of each output among outputs with the same anchor
+        ranks = np.zeros_like(anchors)
+        counts = {}
+        for i, anchor in enumerate(anchors):
+            ranks[i] = counts.get(anchor, 0)
+            counts[anchor] = ranks[i] + 1
+        valid = anchors >= 0
+        groups = np.zeros_like(anchors)
+        _, groups[valid] = np.unique(
+            ranks[valid] * width + anchors[valid] % width, return_inverse=True
+        )
+        num_groups = int(groups[valid].max()) + 1 if valid.any() else 0
+        self.seed = torch.zeros((num_groups, self.shape[0]))
+        self.seed[groups[valid], np.flatnonzero(valid)] = 1.0
+
+        rows, cols = [], []
+        for i in np.flatnonzero(valid):
+            first_col = max(anchors[i] - width + 1, 0) * row_dim
+            last_col = (anchors[i] + 1) * row_dim
+            cols.append(np.arange(first_col, last_col))
+            rows.append(np.full(last_col - first_col, i))
+        self.row = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        self.col = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+        self.entry_group = groups[self.row]
+
+    def __call__(self, outputs: torch.Tensor, inputs: torch.Tensor) -> coo_array:
+        """Compute jacobian of outputs (shape [m]) w.r.t. inputs (shape [n]).
+
+        Graph of outputs is retained, so it can be shared by other derivatives.
+        """
+        if outputs.requires_grad and self.seed.shape[0] > 0:
+            vjps = torch.autograd.grad(
+                outputs,
+                inputs,
+                self.seed,
+                retain_graph=True,
+                allow_unused=True,
+                is_grads_batched=True,
+            )[0]
+        else:
+            vjps = None
+        if vjps is None:
+            data = np.zeros(self.row.shape[0])
+        else:
+            data = vjps[self.entry_group, self.col].detach().numpy().astype("d")
+        return coo_array((data, (self.row, self.col)), shape=self.shape)
+
+
+class BandedHessian:
+    """Sparse hessian of a scalar which is a sum of terms of consecutive input rows.
+
+    Inputs are viewed as a matrix of shape [num_rows, row_dim], and each term only
+    depends on rows no more than bandwidth apart, so the hessian is block banded.
+    Columns whose rows are congruent modulo 2 * bandwidth + 1 share one seed of
+    hessian-vector product, and all products are computed in one batched
+    backward pass. Both triangles are included in the sparsity pattern.
+
+    :param int num_rows: Number of input rows.
+    :param int row_dim: Dimension of each input row.
+    :param int bandwidth: Maximum distance of input rows coupled by one term.
+    """
+
+    def __init__(self, num_rows: int, row_dim: int, bandwidth: int):
+        num_inputs = num_rows * row_dim
+        self.shape = (num_inputs, num_inputs)
+        input_rows = np.arange(num_inputs) // row_dim
+        colors = (
+            input_rows % min(2 * bandwidth + 1, num_rows) * row_dim
+            + np.arange(num_inputs) % row_dim
+        )
+        self.seed = torch.zeros((int(colors.max()) + 1, num_inputs))
+        self.seed[colors, np.arange(num_inputs)] = 1.0
+
+        self.row, self.col = np.nonzero(
+            np.abs(input_rows[:, np.newaxis] - input_rows[np.newaxis, :]) <= bandwidth
+        )
+        self.entry_color = colors[self.col]
+
+    def __call__(self, output: torch.Tensor, inputs: torch.Tensor) -> coo_array:
+        """Compute hessian of output (shape []) w.r.t. inputs (shape [n]).
+
+        Graph of output is retained, so it can be shared by other derivatives.
+        """
+        hvps = None
+        if output.requires_grad:
+            grad = torch.autograd.grad(
+                output, inputs, create_graph=True, allow_unused=True
+            )[0]
+            if grad is not None and grad.requires_grad:
+                hvps = torch.autograd.grad(
+                    grad,
+                    inputs,
+                    self.seed,
+                    retain_graph=True,
+                    allow_unused=True,
+                    is_grads_batched=True,
+                )[0]
+        if hvps is None:
+            data = np.zeros(self.row.shape[0])
+        else:
+            data = hvps[self.entry_color, self.row].detach().numpy().astype("d")
+        return coo_array((data, (self.row, self.col)), shape=self.shape)
+
+
+class TransitionJacobian:
+    """Sparse jacobian of collocation transition constraints from model jacobians.
+
+    Inputs are viewed as a matrix of shape [num_points, action_dim + state_dim], where
+    row k is action u_k followed by state z_k. Transition constraint k is
+    f(z_{k-1}, u_k) - z_k (z_{-1} is the given initial state), so its jacobian w.r.t.
+    u_k and z_{k-1} are blocks of model jacobians, and -I w.r.t. z_k.
+    Sparsity structure is fixed, and entries are assembled without backward pass.
+
+    :param int num_points: Number of control points.
+    :param int action_dim: Dimension of action.
+    :param int state_dim: Dimension of state.
+    """
+
+    def __init__(self, num_points: int, action_dim: int, state_dim: int):
+        row_dim = action_dim + state_dim
+        self.shape = (num_points * state_dim, num_points * row_dim)
+        k, i, j = np.meshgrid(
+            np.arange(num_points), np.arange(state_dim), np.arange(action_dim),
+            indexing="ij",
+        )
+        action_row, action_col = k * state_dim + i, k * row_dim + j
+        k, i, j = np.meshgrid(
+            np.arange(1, num_points), np.arange(state_dim), np.arange(state_dim),
+            indexing="ij",
+        )
+        state_row, state_col = k * state_dim + i, (k - 1) * row_dim + action_dim + j
+        k, i = np.meshgrid(np.arange(num_points), np.arange(state_dim), indexing="ij")
+        eye_row, eye_col = k * state_dim + i, k * row_dim + action_dim + i
+        self.row = np.concatenate(
+            (action_row.reshape(-1), state_row.reshape(-1), eye_row.reshape(-1))
+        )
+        self.col = np.concatenate(
+            (action_col.reshape(-1), state_col.reshape(-1), eye_col.reshape(-1))
+        )
+        self.eye_data = -np.ones(eye_row.size)
+
+    def __call__(self, jac_state: torch.Tensor, jac_action: torch.Tensor) -> coo_array:
+        """Assemble jacobian from model jacobians of each transition, w.r.t. start state
+        (shape [num_points, state_dim, state_dim]) and action (shape [num_points, state_dim, action_dim]).
+        """
+        data = np.concatenate(
+            (
+                jac_action.detach().reshape(-1).numpy().astype("d"),
+                jac_state[1:].detach().reshape(-1).numpy().astype("d"),
+                self.eye_data,
+            )
+        )
+        return coo_array((data, (self.row, self.col)), shape=self.shape)
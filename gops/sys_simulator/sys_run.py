@@ -8,18 +8,26 @@
 #
 #  Description: plot module for trained policy
 #  Update: 2022-12-05, Congsheng Zhang: create plot module
+#  Update: 2026-10-19, iDLab: add multi-scenario MPC baseline
+#  Update: 2026-10-19, iDLab: run policies concurrently and store trajectories in arrays
+#  Update: 2026-10-19, iDLab: add Monte-Carlo robustness sweep
+#  Update: 2026-10-19, iDLab: compute action by shared policy inference
+#  Update: 2026-10-19, iDLab: reset hidden state of recurrent policy at episode start
+#  Update: 2026-10-19, iDLab: fix termination and step limit of robustness sweep
 
 import argparse
 import datetime
 import glob
+import multiprocessing
 import os
 
-from typing import Any, Optional, Tuple
+from typing import Any, Optional, Tuple, Union
 import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
 import torch
 import pandas as pd
+import gym
 from gym import wrappers
 from copy import copy
 
@@ -30,6 +38,7 @@ from gops.env.env_gen_ocp.pyth_base import Env, State
 from gops.utils.plot_evaluation import cm2inch
 from gops.utils.common_utils import get_args_from_json, mp4togif
 from gops.utils.gops_path import gops_path
+from gops.utils.policy_inference import PolicyInference
 
 default_cfg = dict()
 default_cfg["fig_size"] = (12, 9)
@@ -52,6 +61,38 @@ default_cfg["label_font"] = {
 default_cfg["img_fmt"] = "png"
 
 
+class TrajectoryBuffer:
+    """Per-step data of one episode stored in preallocated arrays.
+
+    Arrays are allocated with shape and dtype of the first record,
+    and doubled in length if the episode lasts longer than capacity.
+
+    :param int capacity: number of steps to preallocate.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.size = 0
+        self.data = {}
+
+    def add(self, **record):
+        if self.size == self.capacity:
+            self.capacity *= 2
+            for key, value in self.data.items():
+                self.data[key] = np.resize(value, (self.capacity,) + value.shape[1:])
+        for key, value in record.items():
+            value = np.asarray(value)
+            if key not in self.data:
+                self.data[key] = np.empty(
+                    (self.capacity,) + value.shape, dtype=value.dtype
+                )
+            self.data[key][self.size] = value
+        self.size += 1
+
+    def get_all(self) -> dict:
+        return {key: value[: self.size] for key, value in self.data.items()}
+
+
 class PolicyRunner:
     """Plot module for trained policy
 
@@ -78,6 +119,9 @@ class PolicyRunner:
     :param list action_noise_data: Mean and
         Standard deviation of Normal distribution or Upper
         and Lower bounds of Uniform distribution.
+    :param int num_workers: number of processes to run policies and optimal controller concurrently,
+        run them one by one in current process if 1.
+    :param int verbose: print initial state and step of each episode or not, valid value: {0, 1}.
     """
 
     def __init__(
@@ -101,6 +145,8 @@ class PolicyRunner:
         obs_noise_data: list = None,
         action_noise_type: str = None,
         action_noise_data: list = None,
+        num_workers: int = 1,
+        verbose: int = 1,
     ):
         self.log_policy_dir_list = [
             os.path.join(gops_path, d) for d in log_policy_dir_list
@@ -137,6 +183,8 @@ class PolicyRunner:
         self.action_noise_type = action_noise_type
         self.action_noise_data = action_noise_data
         self.ref_state_num = 0
+        self.num_workers = num_workers
+        self.verbose = verbose
 
         # data for plot
         self.args_list = []
@@ -170,26 +218,25 @@ class PolicyRunner:
         is_opt: bool,
         render: bool = True,
     ) -> Tuple[dict, dict]:
-        state_list = []
-        action_list = []
-        reward_list = []
-        constrain_list = []
-        obs_list = []
-        step = 0
-        step_list = []
-        info_list = [init_info]
         obs, info = env.reset(**init_info)
+        if not is_opt:
+            PolicyInference.of(controller).reset()
         state = env.state
-        print("Initial robot state: ")
-        print(self.__convert_format(np.asarray(state.robot_state)))
+        if self.verbose > 0:
+            print("Initial robot state: ")
+            print(self.__convert_format(np.asarray(state.robot_state)))
+        # trajectories are written into arrays preallocated for the whole episode
+        capacity = get_max_episode_steps(env)
+        episode = TrajectoryBuffer(capacity)
         # plot tracking
-        state_with_ref_error = {}
+        state_with_ref_error = TrajectoryBuffer(capacity)
+        step = 0
         done = False
         info.update({"TimeLimit.truncated": False})
         while not (done or info["TimeLimit.truncated"]):
-            print("step:", step + 1)
-            state_list.append(state.robot_state)
-            obs_list.append(obs)
+            if self.verbose > 0:
+                print("step:", step + 1)
+            record = {"state_list": state.robot_state, "obs_list": obs}
             if is_opt:
                 if isinstance(env.unwrapped, Env):
                     action = controller(state)
@@ -201,33 +248,27 @@ class PolicyRunner:
             if self.use_dist:
                 action = np.hstack((action, env.dist_func(step * env.tau)))
             if self.constrained_env:
-                constrain_list.append(info["constraint"])
+                record["constrain_list"] = info["constraint"]
             if self.is_tracking:
                 reference = get_reference_from_info(info)
-                state_num = len(reference)
                 self.ref_state_num = sum(x is not None for x in reference)
-                if step == 0:
-                    for i in range(state_num):
-                        if reference[i] is not None:
-                            state_with_ref_error["state-{}".format(i)] = []
-                            state_with_ref_error["ref-{}".format(i)] = []
-                            state_with_ref_error["state-{}-error".format(i)] = []
-
                 robot_state = get_robot_state_from_info(info)
-                for i in range(state_num):
+                tracking = {}
+                for i in range(len(reference)):
                     if reference[i] is not None:
-                        state_with_ref_error["state-{}".format(i)].append(robot_state[i])
-                        state_with_ref_error["ref-{}".format(i)].append(reference[i])
-                        state_with_ref_error["state-{}-error".format(i)].append(
+                        tracking["state-{}".format(i)] = robot_state[i]
+                        tracking["ref-{}".format(i)] = reference[i]
+                        tracking["state-{}-error".format(i)] = (
                             reference[i] - robot_state[i]
                         )
+                state_with_ref_error.add(**tracking)
             next_obs, reward, done, info = env.step(action)
 
             # save the real action (without scaling)
-            action_list.append(info.get("raw_action", action))
-            step_list.append(step)
-            reward_list.append(reward)
-            info_list.append(info)
+            record["action_list"] = info.get("raw_action", action)
+            record["step_list"] = step
+            record["reward_list"] = reward
+            episode.add(**record)
 
             obs = next_obs
             state = env.state
@@ -239,33 +280,16 @@ class PolicyRunner:
             if render:
                 env.render()
 
-        eval_dict = {
-            "reward_list": reward_list,
-            "action_list": action_list,
-            "state_list": state_list,
-            "step_list": step_list,
-            "obs_list": obs_list,
-            "info_list": info_list,
-        }
-        if self.constrained_env:
-            eval_dict.update(
-                {"constrain_list": constrain_list,}
-            )
-
+        eval_dict = episode.get_all()
         if self.is_tracking:
-            tracking_dict = state_with_ref_error
+            tracking_dict = state_with_ref_error.get_all()
         else:
             tracking_dict = {}
 
         return eval_dict, tracking_dict
 
     def compute_action(self, obs: np.ndarray, networks: Any) -> np.ndarray:
-        batch_obs = torch.from_numpy(np.expand_dims(obs, axis=0).astype("float32"))
-        logits = networks.policy(batch_obs)
-        action_distribution = networks.create_action_distributions(logits)
-        action = action_distribution.mode()
-        action = action.detach().numpy()[0]
-        return action
+        return PolicyInference.of(networks).act(np.expand_dims(obs, axis=0), "mode")[0][0]
 
     def draw(self):
         fig_size = (
@@ -832,14 +856,15 @@ class PolicyRunner:
                 data_list[i] = "{:.2g}".format(origin_data_list[i])
         return data_list
 
-    def __run_data(self):
-        for i in range(self.policy_num):
-            log_policy_dir = self.log_policy_dir_list[i]
-            trained_policy_iteration = self.trained_policy_iteration_list[i]
+    def _run_closed_loop(self, index: int) -> Tuple[dict, dict, int]:
+        """Run policy of index in closed loop, or optimal controller if index equals policy number."""
+        if index < self.policy_num:
+            log_policy_dir = self.log_policy_dir_list[index]
+            trained_policy_iteration = self.trained_policy_iteration_list[index]
 
-            self.args = self.args_list[i]
+            self.args = self.args_list[index]
             print("===========================================================")
-            print("*** Begin to run policy {} ***".format(i + 1))
+            print("*** Begin to run policy {} ***".format(index + 1))
             env = self.__load_env()
             if hasattr(env, "set_mode"):
                 env.set_mode("test")
@@ -855,11 +880,68 @@ class PolicyRunner:
             eval_dict, tracking_dict = self.run_an_episode(
                 env, networks, self.init_info, is_opt=False, render=False
             )
-            print("Successfully run policy {}".format(i + 1))
+            print("Successfully run policy {}".format(index + 1))
             print("===========================================================\n")
-            # mp4 to gif
+            return eval_dict, tracking_dict, self.ref_state_num
+        else:
+            self.args = self.args_list[self.policy_num - 1]
+            print("GOPS: Use an optimal controller")
+            env = self.__load_env(use_opt=True)
+            print("The environment for opt")
+            if hasattr(env, "set_mode"):
+                env.set_mode("test")
+
+            assert (
+                self.opt_args is not None
+            ), "Choose to use optimal controller, but the opt_args is None."
+
+            if self.opt_args["opt_controller_type"] == "OPT":
+                assert (
+                    env.has_optimal_controller
+                ), "The environment has no theoretical optimal controller."
+                opt_controller = env.control_policy
+            elif self.opt_args["opt_controller_type"] == "MPC":
+                if self.opt_args["use_MPC_for_general_env"] == True:
+                    self.args_list[self.policy_num - 1]["env"] = env
+                    from gops.sys_simulator.opt_controller_for_gen_env import OptController
+                else:
+                    from gops.sys_simulator.opt_controller import OptController
+                model = create_env_model(**self.args_list[self.policy_num - 1], mask_at_done=False)
+                opt_args = self.opt_args.copy()
+                opt_args.pop("opt_controller_type")
+                opt_args.pop("use_MPC_for_general_env")
+                opt_controller = OptController(model, **opt_args,)
+            else:
+                raise ValueError(
+                    "The optimal controller type should be either 'OPT' or 'MPC'."
+                )
+
+            eval_dict_opt, tracking_dict_opt = self.run_an_episode(
+                env, opt_controller, self.init_info, is_opt=True, render=False
+            )
+            print("Successfully run an optimal controller!")
+            print("===========================================================\n")
+            return eval_dict_opt, tracking_dict_opt, self.ref_state_num
+
+    def __run_data(self):
+        # optimal controller is run after policies, unless its result is loaded
+        run_opt = self.use_opt and self.load_opt_path is None
+        run_indexes = list(range(self.policy_num + int(run_opt)))
+        if self.num_workers > 1:
+            # each run builds its own environment and controller, so runs are independent
+            with multiprocessing.Pool(
+                min(self.num_workers, len(run_indexes)),
+                initializer=torch.set_num_threads,
+                initargs=(1,),
+            ) as pool:
+                results = pool.map(self._run_closed_loop, run_indexes)
+        else:
+            results = [self._run_closed_loop(i) for i in run_indexes]
+
+        for eval_dict, tracking_dict, ref_state_num in results[: self.policy_num]:
             self.eval_list.append(eval_dict)
             self.tracking_list.append(tracking_dict)
+            self.ref_state_num = ref_state_num
 
         if self.use_opt:
             if self.load_opt_path is not None:
@@ -872,43 +954,7 @@ class PolicyRunner:
                 print("Successfully load an optimal controller result!")
                 print("===========================================================\n")
             else:
-                self.args = self.args_list[self.policy_num - 1]
-                print("GOPS: Use an optimal controller")
-                env = self.__load_env(use_opt=True)
-                print("The environment for opt")
-                if hasattr(env, "set_mode"):
-                    env.set_mode("test")
-
-                assert (
-                    self.opt_args is not None
-                ), "Choose to use optimal controller, but the opt_args is None."
-
-                if self.opt_args["opt_controller_type"] == "OPT":
-                    assert (
-                        env.has_optimal_controller
-                    ), "The environment has no theoretical optimal controller."
-                    opt_controller = env.control_policy
-                elif self.opt_args["opt_controller_type"] == "MPC":
-                    if self.opt_args["use_MPC_for_general_env"] == True:
-                        self.args_list[self.policy_num - 1]["env"] = env
-                        from gops.sys_simulator.opt_controller_for_gen_env import OptController
-                    else:
-                        from gops.sys_simulator.opt_controller import OptController
-                    model = create_env_model(**self.args_list[self.policy_num - 1], mask_at_done=False)
-                    opt_args = self.opt_args.copy()
-                    opt_args.pop("opt_controller_type")
-                    opt_args.pop("use_MPC_for_general_env")
-                    opt_controller = OptController(model, **opt_args,)
-                else:
-                    raise ValueError(
-                        "The optimal controller type should be either 'OPT' or 'MPC'."
-                    )
-
-                eval_dict_opt, tracking_dict_opt = self.run_an_episode(
-                    env, opt_controller, self.init_info, is_opt=True, render=False
-                )
-                print("Successfully run an optimal controller!")
-                print("===========================================================\n")
+                eval_dict_opt, tracking_dict_opt, self.ref_state_num = results[-1]
 
             if self.opt_args["opt_controller_type"] == "OPT":
                 legend = "OPT"
@@ -964,6 +1010,447 @@ class PolicyRunner:
         self.__save_mp4_as_gif()
         self.draw()
 
+    def run_mpc_scenarios(
+        self, init_info_list: list, num_workers: int = 1, seed: int = 0
+    ) -> pd.DataFrame:
+        """Run MPC in closed loop from multiple initial conditions,
+        and summarize episode cost and solve time into a baseline table.
+
+        Scenarios are independent episodes, so they are distributed to a process pool,
+        where each worker builds its own environment, model and OptController.
+        On platforms starting processes by spawn, call it under `if __name__ == "__main__"`.
+        Set `rti_max_iter` in opt_args to compare real-time iteration with full solves.
+
+        :param list init_info_list: initial information of each scenario, passed to env.reset().
+        :param int num_workers: number of worker processes, run in current process if 1.
+        :param int seed: base random seed of environment, scenario i uses seed + i.
+        :return: summary table with mean and percentiles of episode cost and solve time.
+        """
+        assert (
+            self.use_opt and self.opt_args is not None
+            and self.opt_args["opt_controller_type"] == "MPC"
+        ), "Multi-scenario baseline requires opt_args of MPC controller."
+        args = self.args_list[self.policy_num - 1].copy()
+        # environment instance set for general MPC can not be sent to workers
+        args.pop("env", None)
+        tasks = [
+            (args, self.opt_args, init_info, seed + i, self.use_dist)
+            for i, init_info in enumerate(init_info_list)
+        ]
+        if num_workers > 1:
+            with multiprocessing.Pool(num_workers) as pool:
+                results = pool.starmap(run_mpc_scenario, tasks)
+        else:
+            results = [run_mpc_scenario(*task) for task in tasks]
+
+        scenario_data = pd.DataFrame(data=results)
+        summary = scenario_data.describe(percentiles=[0.5, 0.9, 0.95]).loc[
+            ["mean", "std", "min", "50%", "90%", "95%", "max"]
+        ]
+        scenario_data.to_csv(
+            os.path.join(self.save_path, "MPC-scenarios.csv"), encoding="gbk"
+        )
+        summary.to_csv(os.path.join(self.save_path, "MPC-summary.csv"), encoding="gbk")
+        print("===========================================================")
+        print("GOPS: MPC-{} baseline over {} scenarios".format(
+            self.opt_args["num_pred_step"], len(init_info_list)
+        ))
+        print(summary)
+        return summary
+
+    def run_robustness_sweep(
+        self,
+        num_episodes: int,
+        init_info_list: Optional[list] = None,
+        use_model: bool = True,
+        batch_size: int = 1000,
+        seed: int = 0,
+    ) -> pd.DataFrame:
+        """Evaluate each policy over many episodes with random initial states and noise realizations.
+
+        Episodes are run in lock-step batches with batched policy inference.
+        If a torch model of the environment is registered, a batch is stepped by the model at once,
+        otherwise by a pool of environments. Model rollouts follow reward and termination of the model,
+        which may differ from those of the environment. Observation and action noise follow
+        obs_noise_type and action_noise_type of the runner.
+        Per-episode statistics are saved to Robustness-<legend>.npz, and summarized into
+        Robustness-summary.csv and box plots.
+
+        :param int num_episodes: number of episodes of each policy.
+        :param list init_info_list: initial information passed to env.reset(), episode i uses
+            init_info_list[i % len(init_info_list)]. Initial states are sampled by env if None.
+        :param bool use_model: step episodes by environment model if registered.
+        :param int batch_size: number of episodes run in lock-step.
+        :param int seed: random seed of initial states and noise.
+        :return: summary table with mean and percentiles of episode statistics of each policy.
+        """
+        if init_info_list is None:
+            init_info_list = [{}]
+        init_infos = [init_info_list[i % len(init_info_list)] for i in range(num_episodes)]
+        summary_list = []
+        for i in range(self.policy_num):
+            self.args = self.args_list[i]
+            env = create_env(**self.args)
+            self.args["action_high_limit"] = env.action_space.high
+            self.args["action_low_limit"] = env.action_space.low
+            networks = self.__load_policy(
+                self.log_policy_dir_list[i], self.trained_policy_iteration_list[i]
+            )
+            max_steps = get_max_episode_steps(env)
+
+            model = None
+            # torch model keeps references of the whole episode only for old type environments
+            if use_model and not self.use_dist and not isinstance(env.unwrapped, Env):
+                try:
+                    model = create_env_model(**self.args, mask_at_done=False)
+                except KeyError:
+                    pass
+            if model is None:
+                env_args = {
+                    **self.args,
+                    "obs_noise_type": self.obs_noise_type,
+                    "obs_noise_data": self.obs_noise_data,
+                }
+                envs = [
+                    create_env(**env_args) for _ in range(min(batch_size, num_episodes))
+                ]
+                for j, e in enumerate(envs):
+                    e.seed(seed + j)
+            else:
+                env.seed(seed)
+            generator = torch.Generator().manual_seed(seed)
+
+            stats = []
+            for start in range(0, num_episodes, batch_size):
+                batch_init_infos = init_infos[start:start + batch_size]
+                if model is None:
+                    stats.append(self.__sweep_with_env(
+                        envs, networks, batch_init_infos, max_steps, generator
+                    ))
+                else:
+                    stats.append(self.__sweep_with_model(
+                        env, model, networks, batch_init_infos, max_steps, generator
+                    ))
+            episode_stats = {
+                key: np.concatenate([s[key] for s in stats]) for key in stats[0].keys()
+            }
+            legend = (
+                self.legend_list[i]
+                if self.legend_list is not None and len(self.legend_list) > i
+                else self.algorithm_list[i]
+            )
+            np.savez(
+                os.path.join(self.save_path, "Robustness-{}.npz".format(legend)),
+                **episode_stats,
+            )
+            columns = {"policy": legend}
+            for key, value in episode_stats.items():
+                if value.ndim == 1:
+                    columns[key] = value
+                else:
+                    for j in range(value.shape[1]):
+                        columns["{}-{}".format(key, j)] = value[:, j]
+            summary_list.append(pd.DataFrame(columns))
+
+        episode_data = pd.concat(summary_list, ignore_index=True)
+        summary = episode_data.groupby("policy", sort=False).describe(
+            percentiles=[0.05, 0.5, 0.95]
+        )
+        summary.to_csv(
+            os.path.join(self.save_path, "Robustness-summary.csv"), encoding="gbk"
+        )
+        self.__draw_robustness(episode_data)
+        print("===========================================================")
+        print("GOPS: Robustness sweep over {} episodes".format(num_episodes))
+        print(summary.loc[:, (slice(None), ["mean", "5%", "95%"])].T)
+        return summary
+
+    def __sweep_with_model(
+        self,
+        env: Any,
+        model: Any,
+        networks: Any,
+        init_infos: list,
+        max_steps: int,
+        generator: torch.Generator,
+    ) -> dict:
+        batch_size = len(init_infos)
+        # initial observations and infos are sampled by environment
+        obs_list, info_list = zip(*[env.reset(**init_info) for init_info in init_infos])
+        obs = torch.as_tensor(np.stack(obs_list), dtype=torch.float32)
+        info = {}
+        for key in info_list[0].keys():
+            value = np.stack([np.asarray(i[key]) for i in info_list])
+            if np.issubdtype(value.dtype, np.floating):
+                info[key] = torch.as_tensor(value, dtype=torch.float32)
+            elif np.issubdtype(value.dtype, np.number):
+                info[key] = torch.as_tensor(value)
+        stats = SweepStatistics(batch_size)
+        PolicyInference.of(networks).reset()
+        with torch.no_grad():
+            for _ in range(max_steps):
+                noised_obs = obs + self.__batch_noise(
+                    self.obs_noise_type, self.obs_noise_data, obs.shape, generator
+                )
+                action = self.__batch_action(networks, noised_obs)
+                action = action + self.__batch_noise(
+                    self.action_noise_type, self.action_noise_data, action.shape, generator
+                )
+                constraint = None
+                if self.constrained_env and model.get_constraint is not None:
+                    constraint = model.get_constraint(obs, info)
+                tracking_error = None
+                if self.is_tracking:
+                    if "ref_points" in info:
+                        reference = info["ref_points"][:, 0]
+                    else:
+                        reference = info["ref"]
+                    robot_state = info["state"][:, : reference.shape[1]]
+                    tracking_error = reference - robot_state
+                obs, reward, done, info = model.forward(
+                    obs, action, torch.zeros(batch_size, dtype=torch.bool), info
+                )
+                stats.add(reward, done, constraint, tracking_error)
+                if not stats.alive.any():
+                    break
+        return stats.get_all()
+
+    def __sweep_with_env(
+        self,
+        envs: list,
+        networks: Any,
+        init_infos: list,
+        max_steps: int,
+        generator: torch.Generator,
+    ) -> dict:
+        batch_size = len(init_infos)
+        obs_list, info_list = map(list, zip(*[
+            env.reset(**init_info) for env, init_info in zip(envs, init_infos)
+        ]))
+        reward = np.zeros(batch_size, dtype=np.float32)
+        done = np.zeros(batch_size, dtype=bool)
+        truncated = np.zeros(batch_size, dtype=bool)
+        stats = SweepStatistics(batch_size)
+        PolicyInference.of(networks).reset()
+        for step in range(max_steps):
+            with torch.no_grad():
+                obs = torch.as_tensor(np.stack(obs_list), dtype=torch.float32)
+                action = self.__batch_action(networks, obs)
+                action = action + self.__batch_noise(
+                    self.action_noise_type, self.action_noise_data, action.shape, generator
+                )
+            action = action.numpy()
+            constraint = None
+            if self.constrained_env:
+                constraint = torch.as_tensor(
+                    np.stack([info["constraint"] for info in info_list])
+                )
+            tracking_error = None
+            if self.is_tracking:
+                tracking_error = torch.as_tensor(np.stack([
+                    np.asarray(get_reference_from_info(info), dtype=np.float32)
+                    - get_robot_state_from_info(info)[: len(get_reference_from_info(info))]
+                    for info in info_list
+                ]))
+            for j in np.flatnonzero(stats.alive.numpy()):
+                env_action = action[j]
+                if self.use_dist:
+                    env_action = np.hstack(
+                        (env_action, envs[j].dist_func(step * envs[j].tau))
+                    )
+                obs_list[j], reward[j], done[j], info_list[j] = envs[j].step(env_action)
+                truncated[j] = info_list[j].get("TimeLimit.truncated", False)
+            stats.add(
+                torch.as_tensor(reward),
+                torch.as_tensor(done),
+                constraint,
+                tracking_error,
+                torch.as_tensor(truncated),
+            )
+            if not stats.alive.any():
+                break
+        return stats.get_all()
+
+    @staticmethod
+    def __batch_action(networks: Any, batch_obs: torch.Tensor) -> torch.Tensor:
+        action, _ = PolicyInference.of(networks).act(batch_obs.numpy(), "mode")
+        return torch.as_tensor(action)
+
+    @staticmethod
+    def __batch_noise(
+        noise_type: Optional[str],
+        noise_data: Optional[list],
+        shape: torch.Size,
+        generator: torch.Generator,
+    ) -> Union[torch.Tensor, float]:
+        if noise_type is None:
+            return 0.0
+        noise_data = torch.tensor(noise_data, dtype=torch.float32)
+        if noise_type == "normal":
+            return noise_data[0] + noise_data[1] * torch.randn(shape, generator=generator)
+        elif noise_type == "uniform":
+            return noise_data[0] + (noise_data[1] - noise_data[0]) * torch.rand(
+                shape, generator=generator
+            )
+
+    def __draw_robustness(self, episode_data: pd.DataFrame):
+        fig_size = (
+            default_cfg["fig_size"],
+            default_cfg["fig_size"],
+        )
+        for key in episode_data.columns.drop("policy"):
+            path_fmt = os.path.join(
+                self.save_path, "Robustness-{}.{}".format(key, default_cfg["img_fmt"])
+            )
+            fig, ax = plt.subplots(figsize=cm2inch(*fig_size), dpi=default_cfg["dpi"])
+            sns.boxplot(data=episode_data, x="policy", y=key, ax=ax)
+            plt.tick_params(labelsize=default_cfg["tick_size"])
+            labels = ax.get_xticklabels() + ax.get_yticklabels()
+            [label.set_fontname(default_cfg["tick_label_font"]) for label in labels]
+            plt.xlabel("Policy", default_cfg["label_font"])
+            plt.ylabel(key, default_cfg["label_font"])
+            fig.tight_layout(pad=default_cfg["pad"])
+            plt.savefig(path_fmt, format=default_cfg["img_fmt"], bbox_inches="tight")
+            plt.close()
+
+
+class SweepStatistics:
+    """Running statistics of a batch of episodes run in lock-step.
+
+    Steps after an episode is done or truncated are masked out, including non-finite values
+    of models stepping on after termination. Statistics are episode return and length,
+    whether episode is terminated (done but not truncated), maximum and rate of constraint
+    violation, and root mean square tracking error of each referenced state.
+
+    :param int batch_size: number of episodes.
+    """
+
+    def __init__(self, batch_size: int):
+        self.alive = torch.ones(batch_size, dtype=torch.bool)
+        self.terminated = torch.zeros(batch_size, dtype=torch.bool)
+        self.stats = {
+            "return": torch.zeros(batch_size),
+            "length": torch.zeros(batch_size),
+        }
+
+    def add(
+        self,
+        reward: torch.Tensor,
+        done: torch.Tensor,
+        constraint: Optional[torch.Tensor] = None,
+        tracking_error: Optional[torch.Tensor] = None,
+        truncated: Optional[torch.Tensor] = None,
+    ):
+        mask = self.alive
+        self.stats["return"] += masked(mask, reward.reshape(-1).float())
+        self.stats["length"] += mask.float()
+        if constraint is not None:
+            violation = masked(
+                mask,
+                constraint.reshape(mask.shape[0], -1).max(dim=1).values.clamp(min=0).float(),
+            )
+            zeros = torch.zeros(mask.shape[0], device=mask.device)
+            self.stats["max_violation"] = torch.maximum(
+                self.stats.get("max_violation", zeros), violation
+            )
+            self.stats["violation_steps"] = self.stats.get(
+                "violation_steps", zeros
+            ) + (violation > 0).float()
+        if tracking_error is not None:
+            self.stats["tracking_square_error"] = self.stats.get(
+                "tracking_square_error", 0.0
+            ) + masked(mask[:, None], tracking_error.float() ** 2)
+        done = done.reshape(-1).bool()
+        if truncated is not None:
+            # gym TimeLimit also sets done on truncation, which is no failure
+            truncated = truncated.reshape(-1).bool()
+            self.terminated |= self.alive & done & ~truncated
+            self.alive &= ~truncated
+        else:
+            self.terminated |= self.alive & done
+        self.alive &= ~done
+
+    def get_all(self) -> dict:
+        stats = {
+            "return": self.stats["return"].numpy(),
+            "length": self.stats["length"].numpy(),
+            "terminated": self.terminated.float().numpy(),
+        }
+        length = self.stats["length"].clamp(min=1)
+        if "max_violation" in self.stats:
+            stats["max_violation"] = self.stats["max_violation"].numpy()
+            stats["violation_rate"] = (self.stats["violation_steps"] / length).numpy()
+        if "tracking_square_error" in self.stats:
+            stats["tracking_rmse"] = torch.sqrt(
+                self.stats["tracking_square_error"] / length[:, None]
+            ).numpy()
+        return stats
+
+
+def run_mpc_scenario(
+    args: dict, opt_args: dict, init_info: dict, seed: int, use_dist: bool = False
+) -> dict:
+    """Run one closed-loop MPC episode, return its cost, length and solve time per step."""
+    # scenarios already run in parallel, avoid oversubscribing cores
+    torch.set_num_threads(1)
+    env = create_env(**args)
+    if hasattr(env, "set_mode"):
+        env.set_mode("test")
+    if hasattr(env, "seed"):
+        env.seed(seed)
+
+    opt_args = opt_args.copy()
+    opt_args.pop("opt_controller_type")
+    if opt_args.pop("use_MPC_for_general_env"):
+        from gops.sys_simulator.opt_controller_for_gen_env import OptController
+        model = create_env_model(**args, env=env, mask_at_done=False)
+    else:
+        from gops.sys_simulator.opt_controller import OptController
+        model = create_env_model(**args, mask_at_done=False)
+    controller = OptController(model, **opt_args)
+
+    obs, info = env.reset(**init_info)
+    info.update({"TimeLimit.truncated": False})
+    done = False
+    step = 0
+    cost = 0.0
+    while not (done or info["TimeLimit.truncated"]):
+        if isinstance(env.unwrapped, Env):
+            action = controller(env.state)
+        else:
+            action = controller(obs, info)
+        if use_dist:
+            action = np.hstack((action, env.dist_func(step * env.tau)))
+        obs, reward, done, info = env.step(action)
+        cost -= reward
+        step = step + 1
+        if "TimeLimit.truncated" not in info.keys():
+            info["TimeLimit.truncated"] = False
+
+    latency = controller.get_latency_statistics()
+    return {
+        "cost": float(cost),
+        "steps": step,
+        "mean_solve_time": latency["mean"],
+        "95%_solve_time": latency["95%"],
+        "max_solve_time": latency["max"],
+        "unconverged_steps": latency["unconverged_steps"],
+    }
+
+
+def masked(mask: torch.Tensor, value: torch.Tensor) -> torch.Tensor:
+    return torch.where(mask, value, torch.zeros_like(value))
+
+
+def get_max_episode_steps(env: Any, default: int = 1000) -> int:
+    """Step limit of TimeLimit wrappers of env, which are hidden by outer wrappers."""
+    limits = []
+    while isinstance(env, gym.Wrapper):
+        if isinstance(env, wrappers.TimeLimit):
+            limits.append(env._max_episode_steps)
+        env = env.env
+    return min(limits, default=default)
+
 
 def get_robot_state_from_info(info: dict) -> np.ndarray:
     state = info["state"]
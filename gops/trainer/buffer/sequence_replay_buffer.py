@@ -0,0 +1,147 @@
+#  Copyright (c). All Rights Reserved.
+#  General Optimal control Problem Solver (GOPS)
+#  Intelligent Driving Lab (iDLab), Tsinghua University
+#
+#  Creator: iDLab
+#  Lab Leader: Prof. Shengbo Eben Li
+#  Email: lisb04@gmail.com
+#
+#  Description: Sequence replay buffer for recurrent policies
+#  Update: 2026-10-19, iDLab: create sequence replay buffer
+
+
+import sys
+
+import numpy as np
+import torch
+
+from gops.utils.common_utils import set_seed
+
+__all__ = ["SequenceReplayBuffer"]
+
+
+def stream_shape(shape: tuple, item_shape=None):
+    if item_shape is None:
+        return shape
+    return (*shape, item_shape) if np.isscalar(item_shape) else (*shape, *item_shape)
+
+
+class SequenceReplayBuffer:
+    """
+    Implementation of replay buffer sampling contiguous trajectory chunks with uniform
+    sampling probability, for training recurrent policies.
+
+    Transitions of each environment (sub-environment of vector env) are stored in time
+    order in a stream of their own. A chunk consists of ``burn_in`` steps, on which
+    hidden state of recurrent policy is warmed up, followed by ``seq_len`` training
+    steps. Sampled batch has entries of shape [batch_size, burn_in + seq_len, ...],
+    and a "mask" entry, which is 0 at steps after the end of the first episode in the
+    chunk. A step continues its previous step if the previous step is not terminal and
+    its observation equals next observation of the previous step, so episode ends
+    and gaps between batches of different samplers are both masked.
+    """
+
+    def __init__(self, index=0, **kwargs):
+        set_seed(kwargs["trainer"], kwargs["seed"], index + 100)
+        self.obsv_dim = kwargs["obsv_dim"]
+        self.act_dim = kwargs["action_dim"]
+        self.burn_in = kwargs.get("buffer_burn_in", 0)
+        self.seq_len = kwargs.get("buffer_seq_len", 20)
+        self.chunk_len = self.burn_in + self.seq_len
+        self.num_streams = kwargs.get("vector_env_num", None) or 1
+        self.stream_size = kwargs["buffer_max_size"] // self.num_streams
+        assert self.stream_size >= self.chunk_len, "Buffer is shorter than a chunk."
+        shape = (self.num_streams, self.stream_size)
+        self.buf = {
+            "obs": np.zeros(stream_shape(shape, self.obsv_dim), dtype=np.float32),
+            "obs2": np.zeros(stream_shape(shape, self.obsv_dim), dtype=np.float32),
+            "act": np.zeros(stream_shape(shape, self.act_dim), dtype=np.float32),
+            "rew": np.zeros(shape, dtype=np.float32),
+            "done": np.zeros(shape, dtype=np.float32),
+            "logp": np.zeros(shape, dtype=np.float32),
+        }
+        self.additional_info = kwargs["additional_info"]
+        for k, v in self.additional_info.items():
+            assert isinstance(v, dict), "Only array additional info is supported."
+            self.buf[k] = np.zeros(stream_shape(shape, v["shape"]), dtype=v["dtype"])
+            self.buf["next_" + k] = np.zeros(
+                stream_shape(shape, v["shape"]), dtype=v["dtype"]
+            )
+        # whether a step continues the previous step of its stream
+        self.cont = np.zeros(shape, dtype=np.bool_)
+        self.ptr = np.zeros(self.num_streams, dtype=np.int64)
+        self._sizes = np.zeros(self.num_streams, dtype=np.int64)
+        self._stream = 0
+
+    @property
+    def size(self) -> int:
+        return int(self._sizes.sum())
+
+    def __len__(self):
+        return self.size
+
+    def __get_RAM__(self):
+        return int(sys.getsizeof(self.buf)) * len(self) / (
+            self.num_streams * self.stream_size * 1000000
+        )
+
+    def store(
+        self,
+        obs: np.ndarray,
+        act: np.ndarray,
+        rew: float,
+        done: bool,
+        info: dict,
+        next_obs: np.ndarray,
+        next_info: dict,
+        logp: np.ndarray,
+        stream: int = 0,
+    ) -> None:
+        ptr = self.ptr[stream]
+        if self._sizes[stream] > 0:
+            prev = (ptr - 1) % self.stream_size
+            self.cont[stream, ptr] = not self.buf["done"][stream, prev] and np.array_equal(
+                self.buf["obs2"][stream, prev], obs
+            )
+        else:
+            self.cont[stream, ptr] = False
+        self.buf["obs"][stream, ptr] = obs
+        self.buf["obs2"][stream, ptr] = next_obs
+        self.buf["act"][stream, ptr] = act
+        self.buf["rew"][stream, ptr] = rew
+        self.buf["done"][stream, ptr] = done
+        self.buf["logp"][stream, ptr] = logp
+        for k in self.additional_info.keys():
+            self.buf[k][stream, ptr] = info[k]
+            self.buf["next_" + k][stream, ptr] = next_info[k]
+        self.ptr[stream] = (ptr + 1) % self.stream_size
+        self._sizes[stream] = min(self._sizes[stream] + 1, self.stream_size)
+
+    def add_batch(self, samples: list) -> None:
+        # samples of vector env are ordered by step, then by sub-environment
+        for sample in samples:
+            self.store(*sample, stream=self._stream)
+            self._stream = (self._stream + 1) % self.num_streams
+
+    def sample_batch(self, batch_size: int) -> dict:
+        # chunks start at the oldest step of stream or later, and end at the newest
+        # step or earlier, so they never cross the write pointer
+        num_starts = np.maximum(self._sizes - self.chunk_len + 1, 0)
+        assert num_starts.sum() > 0, "No stream has enough steps for a chunk."
+        streams = np.random.choice(
+            self.num_streams, size=batch_size, p=num_starts / num_starts.sum()
+        )
+        offsets = (np.random.rand(batch_size) * num_starts[streams]).astype(np.int64)
+        oldest = np.where(self._sizes == self.stream_size, self.ptr, 0)[streams]
+        steps = (
+            oldest[:, None] + offsets[:, None] + np.arange(self.chunk_len)
+        ) % self.stream_size
+        streams = streams[:, None]
+
+        batch = {}
+        for k, v in self.buf.items():
+            batch[k] = torch.as_tensor(v[streams, steps], dtype=torch.float32)
+        cont = self.cont[streams, steps]
+        cont[:, 0] = True
+        batch["mask"] = torch.as_tensor(np.cumprod(cont, axis=1), dtype=torch.float32)
+        return batch
@@ -5,14 +5,16 @@
 #  Creator: iDLab
 #  Description: Evaluation of trained policy
 #  Update Date: 2021-05-10, Yang Guan: renew environment parameters
+#  Update Date: 2026-10-19, iDLab: compute action by shared policy inference
+#  Update Date: 2026-10-19, iDLab: reset hidden state of recurrent policy at episode start
 
 
 import numpy as np
-import torch
 
 from gops.create_pkg.create_env import create_env
 from gops.create_pkg.create_alg import create_approx_contrainer
 from gops.utils.common_utils import set_seed
+from gops.utils.policy_inference import PolicyInference
 
 
 class Evaluator:
@@ -28,6 +30,7 @@ class Evaluator:
         _, self.env = set_seed(kwargs["trainer"], kwargs["seed"], index + 400, self.env)
 
         self.networks = create_approx_contrainer(**kwargs)
+        self.inference = PolicyInference(self.networks)
         self.render = kwargs["is_render"]
 
         self.num_eval_episode = kwargs["num_eval_episode"]
@@ -52,14 +55,11 @@ class Evaluator:
         action_list = []
         reward_list = []
         obs, info = self.env.reset()
+        self.inference.reset()
         done = 0
         info["TimeLimit.truncated"] = False
         while not (done or info["TimeLimit.truncated"]):
-            batch_obs = torch.from_numpy(np.expand_dims(obs, axis=0).astype("float32"))
-            logits = self.networks.policy(batch_obs)
-            action_distribution = self.networks.create_action_distributions(logits)
-            action = action_distribution.mode()
-            action = action.detach().numpy()[0]
+            action = self.inference.act(np.expand_dims(obs, axis=0), "mode")[0][0]
             next_obs, reward, done, next_info = self.env.step(action)
             obs_list.append(obs)
             action_list.append(action)
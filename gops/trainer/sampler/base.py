@@ -8,6 +8,8 @@
 #
 #  Description: base class for samplers
 #  Update: 2023-07-22, Zhilong Zheng: create BaseSampler
+#  Update: 2026-10-19, iDLab: compute action by shared policy inference
+#  Update: 2026-10-19, iDLab: reset hidden state of recurrent policy at episode start
 
 
 from abc import ABCMeta, abstractmethod
@@ -15,13 +17,13 @@ from typing import List, NamedTuple, Tuple, Union
 import time
 
 import numpy as np
-import torch
 
 from gops.create_pkg.create_env import create_env
 from gops.create_pkg.create_alg import create_approx_contrainer
 from gops.env.vector.vector_env import VectorEnv
 from gops.utils.common_utils import set_seed
 from gops.utils.explore_noise import GaussNoise, EpsilonGreedy
+from gops.utils.policy_inference import PolicyInference
 from gops.utils.tensorboard_setup import tb_tags
 
 
@@ -47,6 +49,7 @@ class BaseSampler(metaclass=ABCMeta):
         self.env = create_env(**kwargs)
         _, self.env = set_seed(kwargs["trainer"], kwargs["seed"], index + 200, self.env)  #? seed here?
         self.networks = create_approx_contrainer(**kwargs)
+        self.inference = PolicyInference(self.networks)
         self.noise_params = noise_params
         self.sample_batch_size = sample_batch_size
         if isinstance(self.env, VectorEnv):
@@ -101,21 +104,10 @@ class BaseSampler(metaclass=ABCMeta):
     def _step(self) -> List[Experience]:
         # take action using behavior policy
         if not self._is_vector:
-            batch_obs = torch.from_numpy(
-                np.expand_dims(self.obs, axis=0).astype("float32")
-            )
+            action, logp = self.inference.act(np.expand_dims(self.obs, axis=0), "sample")
+            action, logp = action[0], logp[0]
         else:
-            batch_obs = torch.from_numpy(self.obs.astype("float32"))
-        logits = self.networks.policy(batch_obs)
-        action_distribution = self.networks.create_action_distributions(logits)
-        action, logp = action_distribution.sample()
-
-        if self._is_vector:
-            action = action.detach().numpy()
-            logp = logp.detach().numpy()
-        else:
-            action = action.detach()[0].numpy()
-            logp = logp.detach()[0].numpy()
+            action, logp = self.inference.act(self.obs, "sample")
 
         if self.noise_params is not None:
             action = self.noise_processor.sample(action)
@@ -156,6 +148,9 @@ class BaseSampler(metaclass=ABCMeta):
 
             experiences = [Experience(*e) for e in zip(curr_obs, action, reward, terminated, self.info, next_obs, unbatched_infos, logp)]
 
+            # sub-environments are reset automatically, so are their hidden states
+            self.inference.reset(np.where(terminated | truncated)[0])
+
             self.info = unbatched_infos
 
             return experiences
@@ -184,5 +179,6 @@ class BaseSampler(metaclass=ABCMeta):
             self.info = next_info
             if done or next_info["TimeLimit.truncated"]:
                 self.obs, self.info = self.env.reset()
+                self.inference.reset()
 
             return [experience]
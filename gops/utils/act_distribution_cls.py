@@ -8,6 +8,9 @@
 #
 #  Description: Action Distribution Function
 #  Update: 2021-03-05, Wenjun Zou: create action distribution function
+#  Update: 2026-10-19, iDLab: distribution in fp32 under mixed precision
+
+import torch
 
 
 class Action_Distribution:
@@ -18,6 +21,9 @@ class Action_Distribution:
         act_dist_cls = getattr(self, "action_distribution_cls")
         has_act_lim = hasattr(self, "act_high_lim")
 
+        # distribution is computed in fp32 when policy is run under autocast
+        if logits.dtype in (torch.float16, torch.bfloat16):
+            logits = logits.float()
         act_dist = act_dist_cls(logits)
         if has_act_lim:
             act_dist.act_high_lim = getattr(self, "act_high_lim")
@@ -8,14 +8,141 @@
 #
 #  Description: Action Distributions
 #  Update Date: 2021-03-10, Yujie Yang: Revise Codes
+#  Update Date: 2026-10-19, iDLab: fused gauss distributions in tensor math
 
 
+import math
+
 import torch
 
 EPS = 1e-6
+HALF_LOG_2PI = 0.5 * math.log(2 * math.pi)
+
+
+def _gauss_log_prob(x, mean, std):
+    return (
+        -0.5 * torch.square((x - mean) / std) - torch.log(std) - HALF_LOG_2PI
+    ).sum(-1)
+
+
+def _gauss_entropy(std):
+    return (0.5 + HALF_LOG_2PI + torch.log(std)).sum(-1)
+
+
+def _gauss_kl(mean, std, other_mean, other_std):
+    var_ratio = torch.square(std / other_std)
+    t = torch.square((mean - other_mean) / other_std)
+    return (0.5 * (var_ratio + t - 1) - 0.5 * torch.log(var_ratio)).sum(-1)
 
 
 class TanhGaussDistribution:
+    """Tanh squashed diagonal gauss distribution written directly in tensor math,
+    without constructing torch.distributions objects or validating arguments.
+
+    Action limits are [-1, 1] unless set by policy.
+    """
+
+    act_high_lim = None
+    act_low_lim = None
+
+    def __init__(self, logits):
+        self.logits = logits
+        self.mean, self.std = torch.chunk(logits, chunks=2, dim=-1)
+
+    def _squash(self, action):
+        tanh_action = torch.tanh(action)
+        log_det = torch.log(1 + EPS - torch.square(tanh_action)).sum(-1)
+        if self.act_high_lim is None:
+            return tanh_action, log_det
+        half_range = (self.act_high_lim - self.act_low_lim) / 2
+        action_limited = half_range * tanh_action + (
+            self.act_high_lim + self.act_low_lim
+        ) / 2
+        return action_limited, log_det + torch.log(half_range).sum(-1)
+
+    def sample(self):
+        # action is not differentiable, while log probability is
+        with torch.no_grad():
+            action = self.mean + self.std * torch.randn_like(self.mean)
+        action_limited, log_det = self._squash(action)
+        return action_limited, _gauss_log_prob(action, self.mean, self.std) - log_det
+
+    def rsample(self):
+        eps = torch.randn_like(self.mean)
+        action = self.mean + self.std * eps
+        action_limited, log_det = self._squash(action)
+        log_prob = (-0.5 * torch.square(eps) - torch.log(self.std) - HALF_LOG_2PI).sum(
+            -1
+        ) - log_det
+        return action_limited, log_prob
+
+    def log_prob(self, action_limited) -> torch.Tensor:
+        if self.act_high_lim is None:
+            action = torch.atanh((1 - EPS) * action_limited)
+        else:
+            action = torch.atanh(
+                (1 - EPS)
+                * (2 * action_limited - (self.act_high_lim + self.act_low_lim))
+                / (self.act_high_lim - self.act_low_lim)
+            )
+        return _gauss_log_prob(action, self.mean, self.std) - self._squash(action)[1]
+
+    def entropy(self):
+        return _gauss_entropy(self.std)
+
+    def mode(self):
+        return self._squash(self.mean)[0]
+
+    def kl_divergence(self, other: "TanhGaussDistribution") -> torch.Tensor:
+        return _gauss_kl(self.mean, self.std, other.mean, other.std)
+
+
+class GaussDistribution:
+    """Diagonal gauss distribution written directly in tensor math, without
+    constructing torch.distributions objects or validating arguments.
+
+    Mode is clamped to action limits, which are [-1, 1] unless set by policy.
+    """
+
+    act_high_lim = None
+    act_low_lim = None
+
+    def __init__(self, logits):
+        self.logits = logits
+        self.mean, self.std = torch.chunk(logits, chunks=2, dim=-1)
+
+    def sample(self):
+        # action is not differentiable, while log probability is
+        with torch.no_grad():
+            action = self.mean + self.std * torch.randn_like(self.mean)
+        return action, _gauss_log_prob(action, self.mean, self.std)
+
+    def rsample(self):
+        eps = torch.randn_like(self.mean)
+        action = self.mean + self.std * eps
+        log_prob = (-0.5 * torch.square(eps) - torch.log(self.std) - HALF_LOG_2PI).sum(
+            -1
+        )
+        return action, log_prob
+
+    def log_prob(self, action) -> torch.Tensor:
+        return _gauss_log_prob(action, self.mean, self.std)
+
+    def entropy(self):
+        return _gauss_entropy(self.std)
+
+    def mode(self):
+        if self.act_high_lim is None:
+            return torch.clamp(self.mean, -1.0, 1.0)
+        return torch.clamp(self.mean, self.act_low_lim, self.act_high_lim)
+
+    def kl_divergence(self, other: "GaussDistribution") -> torch.Tensor:
+        return _gauss_kl(self.mean, self.std, other.mean, other.std)
+
+
+class TorchTanhGaussDistribution:
+    """Tanh squashed gauss distribution based on torch.distributions."""
+
     def __init__(self, logits):
         self.logits = logits
         self.mean, self.std = torch.chunk(logits, chunks=2, dim=-1)
@@ -70,13 +197,15 @@ class TanhGaussDistribution:
             self.act_high_lim + self.act_low_lim
         ) / 2
 
-    def kl_divergence(self, other: "GaussDistribution") -> torch.Tensor:
+    def kl_divergence(self, other: "TorchTanhGaussDistribution") -> torch.Tensor:
         return torch.distributions.kl.kl_divergence(
             self.gauss_distribution, other.gauss_distribution
         )
 
 
-class GaussDistribution:
+class TorchGaussDistribution:
+    """Gauss distribution based on torch.distributions."""
+
     def __init__(self, logits):
         self.logits = logits
         self.mean, self.std = torch.chunk(logits, chunks=2, dim=-1)
@@ -107,7 +236,7 @@ class GaussDistribution:
     def mode(self):
         return torch.clamp(self.mean, self.act_low_lim, self.act_high_lim)
 
-    def kl_divergence(self, other: "GaussDistribution") -> torch.Tensor:
+    def kl_divergence(self, other: "TorchGaussDistribution") -> torch.Tensor:
         return torch.distributions.kl.kl_divergence(
             self.gauss_distribution, other.gauss_distribution
         )
@@ -158,3 +287,10 @@ class ValueDiracDistribution:
 
     def mode(self):
         return torch.argmax(self.logits, dim=-1)
+
+
+# fused distributions and their torch.distributions based counterparts
+TORCH_DISTRIBUTIONS = {
+    TanhGaussDistribution: TorchTanhGaussDistribution,
+    GaussDistribution: TorchGaussDistribution,
+}
@@ -8,6 +8,8 @@
 #
 #  Description: Utils Function
 #  Update Date: 2021-03-10, Yuhang Zhang: Create codes
+#  Update Date: 2026-10-19, iDLab: switch between fused and torch action distributions
+#  Update Date: 2026-10-19, iDLab: recurrent execution of rnn policies
 
 
 import sys
@@ -73,6 +75,8 @@ def get_apprfunc_dict(key: str, **kwargs):
         var["hidden_sizes"] = kwargs[key + "_hidden_sizes"]
         var["hidden_activation"] = kwargs[key + "_hidden_activation"]
         var["output_activation"] = kwargs[key + "_output_activation"]
+        if apprfunc_type == "RNN":
+            var["recurrent"] = kwargs.get(key + "_recurrent", False)
     elif apprfunc_type == "GAUSS":
         var["num_kernel"] = kwargs[key + "_num_kernel"]
     elif apprfunc_type == "CNN":
@@ -104,6 +108,7 @@ def get_apprfunc_dict(key: str, **kwargs):
         var["local_lips"] = kwargs[key + "_local_lips"]
         var["squash_action"] = kwargs[key + "_squash_action"]
         var["learning_rate"] = kwargs[key + "_learning_rate"]
+        var["jac_type"] = kwargs.get(key + "_jac_type", "analytic")
     else:
         raise NotImplementedError
 
@@ -131,6 +136,12 @@ def get_apprfunc_dict(key: str, **kwargs):
         var["action_distribution_cls"] = getattr(
             sys.modules[__name__], kwargs["policy_act_distribution"]
         )
+    # fused gauss distributions are used unless torch.distributions based ones are required
+    act_dist_cls = var.get("action_distribution_cls", None)
+    if not kwargs.get("policy_act_distribution_fused", True) and (
+        act_dist_cls in TORCH_DISTRIBUTIONS
+    ):
+        var["action_distribution_cls"] = TORCH_DISTRIBUTIONS[act_dist_cls]
 
     return var
 
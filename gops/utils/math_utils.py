@@ -1,5 +1,5 @@
 import math
-from typing import Union
+from typing import Callable, Tuple, Union
 
 import numpy as np
 import torch
@@ -9,3 +9,51 @@ def angle_normalize(
     x: Union[float, np.ndarray, torch.Tensor],
 ) -> Union[float, np.ndarray, torch.Tensor]:
     return ((x + math.pi) % (2 * math.pi)) - math.pi
+
+
+def batch_jacobian(
+    fn: Callable[[torch.Tensor, torch.Tensor], torch.Tensor],
+    state: torch.Tensor,
+    action: torch.Tensor,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Jacobians of batched transition fn(state, action) w.r.t. state and action by autograd.
+
+    Samples in batch are independent, so jacobian of each output dimension summed over
+    batch gives that row for all samples, and all rows are computed in one batched backward.
+    Returned jacobians are detached.
+
+    :param Callable fn: function mapping state of shape [B, n] and action of shape [B, m]
+        to next state of shape [B, n'].
+    :return: jacobians of shape [B, n', n] and [B, n', m].
+    """
+    with torch.enable_grad():
+        state = state.detach().requires_grad_(True)
+        action = action.detach().requires_grad_(True)
+        next_state = fn(state, action)
+        batch_size, out_dim = next_state.shape
+        seed = torch.eye(out_dim, dtype=next_state.dtype, device=next_state.device)
+        seed = seed.unsqueeze(1).expand(out_dim, batch_size, out_dim)
+        try:
+            jac_state, jac_action = torch.autograd.grad(
+                next_state,
+                (state, action),
+                seed,
+                allow_unused=True,
+                is_grads_batched=True,
+            )
+        except RuntimeError:
+            # some operators have no batching rule, compute rows one by one
+            rows = [
+                torch.autograd.grad(
+                    next_state, (state, action), v, allow_unused=True, retain_graph=True
+                )
+                for v in seed
+            ]
+            jac_state, jac_action = (
+                None if r[0] is None else torch.stack(r) for r in zip(*rows)
+            )
+    if jac_state is None:
+        jac_state = torch.zeros((out_dim,) + state.shape, dtype=state.dtype, device=state.device)
+    if jac_action is None:
+        jac_action = torch.zeros((out_dim,) + action.shape, dtype=action.dtype, device=action.device)
+    return jac_state.transpose(0, 1), jac_action.transpose(0, 1)
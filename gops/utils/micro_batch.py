@@ -0,0 +1,158 @@
+#  Copyright (c). All Rights Reserved.
+#  General Optimal control Problem Solver (GOPS)
+#  Intelligent Driving Lab(iDLab), Tsinghua University
+#
+#  Creator: iDLab
+#  Lab Leader: Prof. Shengbo Eben Li
+#  Email: lisb04@gmail.com
+#
+#  Description: Gradient accumulation over micro batches for model-based losses
+#  Update: 2026-10-19, iDLab: create micro batch gradient accumulator
+#  Update: 2026-10-19, iDLab: mixed precision loss and backward
+
+
+from typing import Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+import torch
+
+from gops.env.env_gen_ocp.pyth_base import State
+from gops.utils.mixed_precision import MixedPrecision
+
+
+LossFn = Callable[[dict], Tuple[torch.Tensor, Dict[str, torch.Tensor]]]
+
+
+class MicroBatchAccumulator:
+    """Accumulate gradient of a loss averaged over batch by splitting the batch into
+    micro batches, so that graph of long model rollouts on a large batch fits in memory.
+
+    Size of micro batch is chosen from a memory budget for the graph of one micro batch.
+    Memory per sample is measured by summing tensors saved for backward in each micro
+    batch, and the first micro batch of a loss (identified by a key) is a probe of
+    ``probe_size`` samples. Each micro batch loss is scaled by its fraction of the batch
+    before backward, so accumulated gradient is gradient of the loss on the whole batch.
+
+    Loss function maps a batch to a loss and a dict of statistics, which must be
+    averages over the batch like the loss, so that their weighted average over micro
+    batches is exactly the statistic of the whole batch.
+
+    :param float memory_budget: memory budget in MB of the graph of one micro batch.
+        If None, the whole batch is used at once.
+    :param int probe_size: size of the first micro batch used to measure memory per sample.
+    :param MixedPrecision amp: mixed precision, under whose autocast loss is computed
+        and with whose gradient scaler loss is backward. None for fp32.
+    """
+
+    def __init__(
+        self,
+        memory_budget: Optional[float] = None,
+        probe_size: int = 1024,
+        amp: Optional[MixedPrecision] = None,
+    ):
+        self.memory_budget = memory_budget
+        self.probe_size = probe_size
+        self.amp = amp if amp is not None else MixedPrecision()
+        self._sample_bytes = {}
+
+    def accumulate(
+        self,
+        data: dict,
+        loss_fn: LossFn,
+        key: Hashable = None,
+        backward: bool = True,
+    ) -> Dict[str, torch.Tensor]:
+        """Compute loss on micro batches of data and accumulate its gradient.
+
+        :param dict data: batch, whose tensors and states with the batch size of
+            data["obs"] are split, and other entries are shared by all micro batches.
+            If the batch fits in one micro batch, data itself is passed to loss function.
+        :param Callable loss_fn: function mapping a batch to loss and statistics.
+        :param key: key of the loss, under which memory per sample is recorded.
+        :param bool backward: whether to backward the loss, otherwise only statistics
+            are computed.
+        :return: statistics of the whole batch, detached.
+        """
+        batch_size = data["obs"].shape[0]
+        if self.memory_budget is None:
+            with self.amp.autocast():
+                loss, info = loss_fn(data)
+            if backward:
+                self.amp.backward(loss)
+            return {k: _detach(v) for k, v in info.items()}
+
+        stats = {}
+        start = 0
+        while start < batch_size:
+            end = min(start + self._chunk_size(key), batch_size)
+            if start == 0 and end == batch_size:
+                chunk = data
+            else:
+                chunk = dict(_split(data, batch_size, start, end))
+            weight = (end - start) / batch_size
+
+            saved = _SavedBytes(end - start)
+            with torch.autograd.graph.saved_tensors_hooks(
+                saved.pack, saved.unpack
+            ), self.amp.autocast():
+                loss, info = loss_fn(chunk)
+            self._record(key, saved.nbytes / (end - start), first=start == 0)
+            if backward:
+                self.amp.backward(loss * weight if weight < 1 else loss)
+            for k, v in info.items():
+                v = _detach(v) * weight
+                stats[k] = v if k not in stats else stats[k] + v
+            start = end
+        return stats
+
+    def _chunk_size(self, key: Hashable) -> int:
+        sample_bytes = self._sample_bytes.get(key, None)
+        if not sample_bytes:
+            return self.probe_size
+        return max(1, int(self.memory_budget * 2 ** 20 / sample_bytes))
+
+    def _record(self, key: Hashable, sample_bytes: float, first: bool):
+        # take the largest measurement in one accumulation, and refresh it in next one
+        if first or sample_bytes > self._sample_bytes.get(key, 0):
+            self._sample_bytes[key] = sample_bytes
+
+
+class _SavedBytes:
+    """Hooks summing bytes of distinct tensors with batch dimension saved for backward."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.nbytes = 0
+        self._saved = set()
+
+    def pack(self, tensor: torch.Tensor) -> torch.Tensor:
+        # parameters and constants are shared by all samples, and not counted
+        if (
+            tensor.dim() > 0
+            and tensor.shape[0] == self.batch_size
+            and not (tensor.is_leaf and tensor.requires_grad)
+        ):
+            saved_key = (tensor.data_ptr(), tensor.shape, tensor.stride())
+            if saved_key not in self._saved:
+                self._saved.add(saved_key)
+                self.nbytes += tensor.numel() * tensor.element_size()
+        return tensor
+
+    @staticmethod
+    def unpack(tensor: torch.Tensor) -> torch.Tensor:
+        return tensor
+
+
+def _split(
+    data: dict, batch_size: int, start: int, end: int
+) -> Iterator[Tuple[str, object]]:
+    for k, v in data.items():
+        if isinstance(v, torch.Tensor) and v.dim() > 0 and v.shape[0] == batch_size:
+            yield k, v[start:end]
+        elif isinstance(v, State) and len(v) == batch_size:
+            yield k, v[start:end]
+        else:
+            yield k, v
+
+
+def _detach(value):
+    return value.detach() if isinstance(value, torch.Tensor) else value
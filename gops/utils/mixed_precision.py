@@ -0,0 +1,83 @@
+#  Copyright (c). All Rights Reserved.
+#  General Optimal control Problem Solver (GOPS)
+#  Intelligent Driving Lab(iDLab), Tsinghua University
+#
+#  Creator: iDLab
+#  Lab Leader: Prof. Shengbo Eben Li
+#  Email: lisb04@gmail.com
+#
+#  Description: Mixed precision training with autocast and gradient scaling
+#  Update: 2026-10-19, iDLab: create mixed precision
+
+
+from functools import wraps
+from typing import Callable, Optional
+
+import torch
+
+AMP_DTYPES = {"bf16": torch.bfloat16, "fp16": torch.float16}
+
+
+class MixedPrecision:
+    """Autocast and gradient scaling shared by losses and optimizers of an algorithm.
+
+    Losses are computed under :meth:`autocast`, backward with :meth:`backward`, and
+    optimizers are stepped with :meth:`step` followed by one :meth:`update` per
+    iteration. With fp16, loss is scaled by a GradScaler, and steps with non-finite
+    gradients are skipped. bf16 has the range of fp32 and is not scaled.
+
+    When disabled, all methods fall back to plain fp32 training.
+
+    :param str amp: "bf16", "fp16", or None to disable mixed precision.
+    :param str device_type: "cuda" or "cpu".
+    """
+
+    def __init__(self, amp: Optional[str] = None, device_type: str = "cpu"):
+        assert amp is None or amp in AMP_DTYPES, f"Unknown amp type {amp}."
+        self.enabled = amp is not None
+        self.dtype = AMP_DTYPES.get(amp, torch.float32)
+        self.device_type = device_type
+        self.scaler = _grad_scaler(device_type, enabled=amp == "fp16")
+
+    def autocast(self) -> torch.autocast:
+        return torch.autocast(self.device_type, dtype=self.dtype, enabled=self.enabled)
+
+    def backward(self, loss: torch.Tensor):
+        self.scaler.scale(loss).backward()
+
+    def step(self, optimizer: torch.optim.Optimizer):
+        if self.scaler.is_enabled():
+            self.scaler.step(optimizer)
+        else:
+            optimizer.step()
+
+    def update(self):
+        self.scaler.update()
+
+    def fp32(self, func: Callable) -> Callable:
+        """Run func in fp32 out of autocast, with low precision tensor arguments cast
+        to fp32. Used for environment model dynamics in rollouts.
+        """
+        if not self.enabled:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            args = [_to_fp32(arg) for arg in args]
+            kwargs = {k: _to_fp32(v) for k, v in kwargs.items()}
+            with torch.autocast(self.device_type, enabled=False):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+def _grad_scaler(device_type: str, enabled: bool):
+    if hasattr(torch.amp, "GradScaler"):
+        return torch.amp.GradScaler(device_type, enabled=enabled)
+    return torch.cuda.amp.GradScaler(enabled=enabled)
+
+
+def _to_fp32(value):
+    if isinstance(value, torch.Tensor) and value.dtype in (torch.float16, torch.bfloat16):
+        return value.float()
+    return value
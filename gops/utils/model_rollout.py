@@ -0,0 +1,115 @@
+#  Copyright (c). All Rights Reserved.
+#  General Optimal control Problem Solver (GOPS)
+#  Intelligent Driving Lab(iDLab), Tsinghua University
+#
+#  Creator: iDLab
+#  Lab Leader: Prof. Shengbo Eben Li
+#  Email: lisb04@gmail.com
+#
+#  Description: Model rollout shared by policy evaluation and policy improvement
+#  Update: 2026-10-19, iDLab: create model rollout cache
+
+
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import torch
+from torch import nn
+
+
+@dataclass
+class ModelRollout:
+    """Result of a model rollout with a policy from a batch of observations.
+
+    :param torch.Tensor ret: discounted sum of rewards along the rollout.
+    :param torch.Tensor last_obs: observation after the last model step.
+    :param torch.Tensor last_done: done flag after the last model step.
+    :param torch.Tensor constraints: constraint in info after each model step, stacked
+        along the first dimension, None if absent.
+    """
+    ret: torch.Tensor
+    last_obs: torch.Tensor
+    last_done: torch.Tensor
+    constraints: Optional[torch.Tensor]
+
+
+class RolloutCache:
+    """Model rollout of a policy from a replay batch, shared by value loss and policy loss.
+
+    Rollout computed with graph gives both detached value backup and differentiable
+    policy objective, so one rollout serves both losses. It is reused as long as the replay batch
+    is the same object and parameters of policy have not been updated in place
+    (tracked by version counters of parameters).
+    """
+
+    def __init__(self):
+        self._data = None
+        self._key = None
+        self._rollout = None
+        self._has_graph = False
+
+    def clear(self):
+        self._data = None
+        self._key = None
+        self._rollout = None
+        self._has_graph = False
+
+    def get(
+        self,
+        data: dict,
+        policy: nn.Module,
+        model_step: Callable,
+        forward_step: int,
+        gamma: float,
+        info: Optional[dict] = None,
+        create_graph: bool = True,
+    ) -> ModelRollout:
+        """Get rollout of policy from data["obs"], computing it if not cached.
+
+        :param dict data: replay batch, which must contain "obs" and "done".
+        :param nn.Module policy: policy network mapping observation to action.
+        :param Callable model_step: function like forward of env model, mapping
+            (obs, action, done, info) to (next_obs, reward, next_done, next_info).
+        :param int forward_step: number of model steps.
+        :param float gamma: discount factor.
+        :param dict info: info of the first model step, data is used if None.
+        :param bool create_graph: whether the rollout is used for gradient. A rollout
+            without graph is not reused for requests with graph.
+        """
+        key = (forward_step, gamma, id(policy), _weight_version(policy))
+        if (
+            self._rollout is not None
+            and data is self._data
+            and key == self._key
+            and (self._has_graph or not create_graph)
+        ):
+            return self._rollout
+
+        with torch.set_grad_enabled(create_graph):
+            o, d = data["obs"], data["done"]
+            info = data if info is None else info
+            ret = 0
+            constraints = []
+            for step in range(forward_step):
+                a = policy(o)
+                o, r, d, info = model_step(o, a, d, info)
+                ret = r if step == 0 else ret + gamma ** step * r
+                constraints.append(info.get("constraint", None))
+
+            if len(constraints) > 0 and all(c is not None for c in constraints):
+                constraints = torch.stack(constraints)
+            else:
+                constraints = None
+
+        # hold a reference of data, so that its id is not reused while cached
+        self._data = data
+        self._key = key
+        self._rollout = ModelRollout(
+            ret=ret, last_obs=o, last_done=d, constraints=constraints
+        )
+        self._has_graph = create_graph
+        return self._rollout
+
+
+def _weight_version(module: nn.Module) -> Tuple[int, ...]:
+    return tuple(p._version for p in module.parameters())
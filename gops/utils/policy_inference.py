@@ -0,0 +1,124 @@
+#  Copyright (c). All Rights Reserved.
+#  General Optimal control Problem Solver (GOPS)
+#  Intelligent Driving Lab(iDLab), Tsinghua University
+#
+#  Creator: iDLab
+#  Lab Leader: Prof. Shengbo Eben Li
+#  Email: lisb04@gmail.com
+#
+#  Description: Policy inference shared by samplers, evaluator and simulator
+#  Update: 2026-10-19, iDLab: create policy inference
+#  Update: 2026-10-19, iDLab: hidden state of recurrent policies
+
+
+import weakref
+from typing import Optional, Tuple
+
+import numpy as np
+import torch
+from torch import nn
+
+from gops.utils.act_distribution_type import DiracDistribution
+
+
+class PolicyInference:
+    """Compute actions of a policy from numpy observations.
+
+    Observations are copied into a preallocated input buffer, policy is run under
+    torch.inference_mode, and action distribution is only constructed when it is
+    not deterministic (which is detected at the first call), so per call overhead
+    is a few tensor operations.
+
+    For recurrent policies (rnn policies with ``recurrent`` set), hidden state of each
+    row of the batch is carried between calls of :meth:`act`, so rows must always
+    correspond to the same envs, and :meth:`reset` must be called at episode start.
+
+    :param nn.Module networks: approximate function container with policy and
+        create_action_distributions.
+    """
+
+    _cache = weakref.WeakKeyDictionary()
+
+    def __init__(self, networks: nn.Module):
+        self.networks = networks
+        self.policy = networks.policy
+        self.create_action_distributions = networks.create_action_distributions
+        self.deterministic = None
+        self.recurrent = getattr(self.policy, "recurrent", False)
+        self._hidden = None
+        self.device = next(networks.parameters()).device
+        self._buffer = None
+        self._buffer_np = None
+
+    @classmethod
+    def of(cls, networks: nn.Module) -> "PolicyInference":
+        """Get inference of networks, created at the first call and reused afterwards."""
+        inference = cls._cache.get(networks, None)
+        if inference is None:
+            inference = cls(networks)
+            cls._cache[networks] = inference
+        return inference
+
+    def act(
+        self, obs_batch: np.ndarray, mode: str = "sample"
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Compute actions of a batch of observations.
+
+        :param np.ndarray obs_batch: observations of shape [B, *obs_shape].
+        :param str mode: "sample" to sample from action distribution,
+            "mode" to take mode of action distribution.
+        :return: actions of shape [B, *act_shape], and log probabilities of shape [B]
+            (None for "mode").
+        """
+        assert mode in ("sample", "mode")
+        return self._act_batch(obs_batch, mode)
+
+    def reset(self, index: Optional[np.ndarray] = None):
+        """Reset hidden state of recurrent policy, of all rows or rows in index."""
+        if self._hidden is None:
+            return
+        if index is None:
+            self._hidden = None
+        elif len(index) > 0:
+            with torch.inference_mode():
+                self._hidden[:, torch.as_tensor(index)] = 0
+
+    def _act_batch(
+        self, obs: np.ndarray, mode: str
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        batch_size = obs.shape[0]
+        with torch.inference_mode():
+            if self._buffer is None or self._buffer.shape[0] < batch_size or (
+                self._buffer.shape[1:] != obs.shape[1:]
+            ):
+                self._buffer = torch.empty(
+                    (batch_size,) + obs.shape[1:], dtype=torch.float32
+                )
+                self._buffer_np = self._buffer.numpy()
+            np.copyto(self._buffer_np[:batch_size], obs, casting="unsafe")
+
+            obs_tensor = self._buffer[:batch_size].to(self.device)
+            if self.recurrent:
+                if self._hidden is None or self._hidden.shape[1] != batch_size:
+                    self._hidden = self.policy.init_hidden(batch_size, self.device)
+                logits, self._hidden = self.policy.step(obs_tensor, self._hidden)
+            else:
+                logits = self.policy(obs_tensor)
+            dist = None
+            if self.deterministic is None:
+                dist = self.create_action_distributions(logits)
+                self.deterministic = isinstance(dist, DiracDistribution)
+            if self.deterministic:
+                # action of dirac distribution is logits, no need to construct it
+                action = logits
+                logp = torch.zeros(batch_size) if mode == "sample" else None
+            else:
+                if dist is None:
+                    dist = self.create_action_distributions(logits)
+                if mode == "sample":
+                    action, logp = dist.sample()
+                else:
+                    action, logp = dist.mode(), None
+            action = action.cpu().numpy()
+        return action, None if logp is None else logp.cpu().numpy()
+
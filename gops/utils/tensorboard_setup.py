@@ -8,6 +8,7 @@
 #
 #  Description: Tensorboard Related Function
 #  Update: 2021-03-10, Yuhang Zhang: Create codes
+#  Update: 2026-10-19, iDLab: add optimal gap tag
 
 
 import numpy as np
@@ -161,6 +162,7 @@ tb_tags = {
     "loss_actor": "Loss/Actor loss-RL iter",
     "loss_actor_reward": "Loss/Actor reward loss-RL iter",
     "loss_actor_constraint": "Loss/Actor constraint loss-RL iter",
+    "loss_actor_optimal_gap": "Loss/Actor optimal gap-RL iter",
     "loss_critic": "Loss/Critic loss-RL iter",
     "loss_scenery": "Loss/Scenery loss-RL iter",
     "alg_time": "Time/Algorithm time [ms]-RL iter",
@@ -0,0 +1,129 @@
+import numpy as np
+import torch
+
+from gops.create_pkg.create_alg import create_alg
+from gops.create_pkg.create_buffer import create_buffer
+from gops.create_pkg.create_env import create_env
+from gops.create_pkg.create_sampler import create_sampler
+
+"""
+    DDPG with a recurrent rnn policy is trained on chunks of sequence_replay_buffer,
+    collected by a sampler which carries hidden state over episodes.
+"""
+
+BURN_IN, SEQ_LEN = 3, 5
+
+
+def create_args():
+    args = dict(
+        env_id="gym_pendulum",
+        algorithm="DDPG",
+        trainer="off_serial_trainer",
+        seed=0,
+        vector_env_num=2,
+        vector_env_type="sync",
+        gym2gymnasium=True,
+        max_episode_steps=30,
+        value_func_name="ActionValue",
+        value_func_type="MLP",
+        value_hidden_sizes=[16, 16],
+        value_hidden_activation="relu",
+        policy_func_name="DetermPolicy",
+        policy_func_type="RNN",
+        policy_recurrent=True,
+        policy_act_distribution="default",
+        policy_hidden_sizes=[16, 16],
+        policy_hidden_activation="relu",
+        value_learning_rate=1e-3,
+        policy_learning_rate=1e-3,
+        tau=0.05,
+        buffer_name="sequence_replay_buffer",
+        buffer_max_size=1000,
+        buffer_burn_in=BURN_IN,
+        buffer_seq_len=SEQ_LEN,
+        replay_batch_size=8,
+        sampler_name="off_sampler",
+        sample_batch_size=20,
+        noise_params={"mean": np.zeros(1, np.float32), "std": 0.2 * np.ones(1, np.float32)},
+        cnn_shared=False,
+        use_gpu=False,
+        additional_info={},
+    )
+    env = create_env(args["env_id"])
+    args["obsv_dim"] = env.observation_space.shape[0]
+    args["action_type"] = "continu"
+    args["action_dim"] = env.action_space.shape[0]
+    args["action_high_limit"] = env.action_space.high.astype(np.float32)
+    args["action_low_limit"] = env.action_space.low.astype(np.float32)
+    return args
+
+
+def policy_loss_by_steps(alg, o, mask):
+    # hidden state is advanced frame by frame, as in recurrent execution
+    policy, hidden = alg.networks.policy, None
+    q = []
+    for t in range(o.shape[1]):
+        act, hidden = policy.step(o[:, t], hidden)
+        q.append(alg.networks.q(o[:, t], act))
+    q = torch.stack(q, dim=1)[:, BURN_IN:]
+    return -(mask[:, BURN_IN:] * q).sum() / mask[:, BURN_IN:].sum()
+
+
+def test_sequence_training():
+    args = create_args()
+    alg = create_alg(**args)
+    sampler = create_sampler(**args)
+    buffer = create_buffer(**args)
+    assert alg.sequence_flag and sampler.inference.recurrent
+
+    while buffer.size < 200:
+        samples, _ = sampler.sample()
+        buffer.add_batch(samples)
+    batch = buffer.sample_batch(args["replay_batch_size"])
+    assert batch["obs"].shape == (8, BURN_IN + SEQ_LEN, args["obsv_dim"])
+    with torch.no_grad():
+        loss = alg._compute_loss_policy_seq(batch["obs"], batch["mask"])
+        expected = policy_loss_by_steps(alg, batch["obs"], batch["mask"])
+    assert torch.allclose(loss, expected, rtol=1e-5, atol=1e-6)
+
+    policy_params = [p.clone() for p in alg.networks.policy.parameters()]
+    for iteration in range(5):
+        tb_info = alg.local_update(buffer.sample_batch(args["replay_batch_size"]), iteration)
+        sampler.load_state_dict(alg.networks.state_dict())
+        samples, _ = sampler.sample()
+        buffer.add_batch(samples)
+    assert all(np.isfinite(v) for v in tb_info.values())
+    assert any(
+        not torch.equal(p, p0)
+        for p, p0 in zip(alg.networks.policy.parameters(), policy_params)
+    )
+
+
+def test_masked_steps_have_no_gradient():
+    args = create_args()
+    alg = create_alg(**args)
+    torch.manual_seed(0)
+    batch_size, length, obs_dim = 4, BURN_IN + SEQ_LEN, args["obsv_dim"]
+    data = {
+        "obs": torch.randn(batch_size, length, obs_dim),
+        "act": torch.rand(batch_size, length, 1) * 4 - 2,
+        "rew": torch.randn(batch_size, length),
+        "obs2": torch.randn(batch_size, length, obs_dim),
+        "done": torch.zeros(batch_size, length),
+        "mask": torch.ones(batch_size, length),
+    }
+    data["mask"][:, BURN_IN + 2 :] = 0
+
+    def q_grads(data):
+        alg.networks.q_optimizer.zero_grad()
+        alg._compute_loss_q_seq(*(data[k] for k in ("obs", "act", "rew", "obs2", "done", "mask")))[0].backward()
+        return [p.grad.clone() for p in alg.networks.q.parameters()]
+
+    grads = q_grads(data)
+    # data of masked steps and of burn-in steps are not trained on
+    changed = {k: v.clone() for k, v in data.items()}
+    changed["act"][:, BURN_IN + 2 :] += 1
+    changed["rew"][:, : BURN_IN] += 1
+    changed["rew"][:, BURN_IN + 2 :] += 1
+    for g, g_changed in zip(grads, q_grads(changed)):
+        assert torch.allclose(g, g_changed, atol=1e-6)
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+import torch
+
+from gops.create_pkg.create_alg import create_alg
+from gops.create_pkg.create_env import create_env
+from gops.algorithm.mac import _psd_pinv
+
+"""
+    Pseudo-inverse by eigen decomposition is compared with torch.linalg.pinv, and the
+    iterative bayes estimator of MAC with the former iteration of torch.pinverse.
+"""
+
+DIM = 4
+
+
+def create_mac(**kwargs):
+    env = create_env("gym_cartpoleconti")
+    return create_alg(
+        env_id="gym_cartpoleconti",
+        algorithm="MAC",
+        trainer="off_serial_trainer",
+        seed=0,
+        value_func_name="StateValue",
+        value_func_type="MLP",
+        value_hidden_sizes=[16, 16],
+        value_hidden_activation="elu",
+        policy_func_name="DetermPolicy",
+        policy_func_type="MLP",
+        policy_act_distribution="default",
+        policy_hidden_sizes=[16, 16],
+        policy_hidden_activation="elu",
+        value_learning_rate=1e-3,
+        policy_learning_rate=1e-3,
+        cnn_shared=False,
+        use_gpu=False,
+        obsv_dim=env.observation_space.shape[0],
+        action_type="continu",
+        action_dim=env.action_space.shape[0],
+        action_high_limit=env.action_space.high.astype(np.float32),
+        action_low_limit=env.action_space.low.astype(np.float32),
+        **kwargs,
+    )
+
+
+def create_residual(constant_dim: bool, n=256, dtype=torch.float64):
+    torch.manual_seed(0)
+    data = 0.1 * torch.randn(n, DIM, dtype=dtype) @ torch.randn(DIM, DIM, dtype=dtype)
+    data = data + torch.arange(DIM, dtype=dtype)
+    if constant_dim:
+        # residual of a dimension which the model predicts exactly
+        data[:, 1] = 0
+    return data
+
+
+def reference_estimator(data, basic_mu, basic_var):
+    # former iteration, from diagonal sample variance
+    N = data.shape[0]
+    var = torch.diag(torch.var(data, 0))
+    data_sum = torch.sum(data, 0).unsqueeze(1)
+    basic_mu = basic_mu.unsqueeze(1)
+    for i in range(4):
+        K = torch.pinverse(torch.pinverse(basic_var) + N * torch.pinverse(var))
+        Z = torch.mm(torch.pinverse(basic_var), basic_mu) + torch.mm(
+            torch.pinverse(var), data_sum
+        )
+        mu = torch.mm(K, Z)
+        var = torch.mm((data - mu.t()).t(), data - mu.t()) / N
+    return mu, var
+
+
+@pytest.mark.parametrize("dtype", [torch.float32, torch.float64])
+@pytest.mark.parametrize("kind", ["full", "rank_one_prior", "constant_dim"])
+def test_psd_pinv(kind, dtype):
+    if kind == "full":
+        data = create_residual(False, dtype=dtype)
+        matrix = data.t() @ data / data.shape[0]
+    elif kind == "rank_one_prior":
+        # prior covariance of update_ibe_model
+        matrix = 0.5 * torch.ones(DIM, DIM, dtype=dtype)
+    else:
+        data = create_residual(True, dtype=dtype)
+        matrix = data.t() @ data / data.shape[0]
+    pinv, root = _psd_pinv(matrix)
+    atol = 1e-4 if dtype == torch.float32 else 1e-10
+    assert torch.allclose(pinv, torch.linalg.pinv(matrix, hermitian=True), rtol=1e-4, atol=atol)
+    # samples drawn with the root have no variance in null directions
+    assert torch.allclose(root @ root.t(), matrix, rtol=1e-4, atol=atol)
+
+
+@pytest.mark.parametrize("constant_dim", [False, True])
+def test_cold_start_matches_pinverse_iteration(constant_dim):
+    alg = create_mac()
+    data = create_residual(constant_dim)
+    basic_mu = torch.zeros(DIM, dtype=data.dtype)
+    basic_var = 0.5 * torch.ones(DIM, DIM, dtype=data.dtype)
+    expected_mu, expected_var = reference_estimator(data, basic_mu, basic_var)
+
+    torch.manual_seed(1)
+    sample = alg.iterative_bayes_estimator(data, basic_mu, basic_var)
+    assert torch.allclose(alg.ibe_var, expected_var, rtol=1e-8, atol=1e-11)
+    # samples are mean plus noise transformed by square root of covariance
+    torch.manual_seed(1)
+    noise = torch.randn(data.shape, dtype=data.dtype)
+    root = _psd_pinv(expected_var)[1]
+    assert torch.allclose(sample, expected_mu.t() + noise @ root.t(), atol=1e-6)
+    if constant_dim:
+        assert torch.allclose(sample[:, 1], expected_mu[1], atol=1e-10)
+
+
+@pytest.mark.parametrize("warm_start", [False, True])
+def test_warm_start_is_opt_in(warm_start):
+    alg = create_mac(ibe_warm_start=warm_start)
+    basic_mu = torch.zeros(DIM, dtype=torch.float64)
+    basic_var = 0.5 * torch.ones(DIM, DIM, dtype=torch.float64)
+    alg.iterative_bayes_estimator(create_residual(False), basic_mu, basic_var)
+    data = create_residual(True)
+    alg.iterative_bayes_estimator(data, basic_mu, basic_var)
+    cold_var = reference_estimator(data, basic_mu, basic_var)[1]
+    assert torch.allclose(alg.ibe_var, cold_var, rtol=1e-8, atol=1e-11) != warm_start
@@ -0,0 +1,201 @@
+import numpy as np
+import pytest
+import torch
+
+from gops.create_pkg.create_alg import create_alg
+from gops.create_pkg.create_buffer import create_buffer
+from gops.create_pkg.create_env import create_env
+from gops.create_pkg.create_sampler import create_sampler
+from gops.utils.model_rollout import ModelRollout
+
+"""
+    SPIL shares one model rollout between value loss and policy loss when the batch
+    fits in one micro batch. Gradients are compared with those of separate rollouts,
+    which are used for micro batches. Safe probability and PID multiplier are compared
+    with a NumPy reference of per-step constraint loop and multiplier update.
+"""
+
+FORWARD_STEP = 5
+BATCH_SIZE = 32
+
+
+def create_args():
+    env_args = dict(env_id="pyth_veh2dofconti_errcstr", pre_horizon=10, y_error_tol=0.1)
+    env = create_env(**env_args)
+    return dict(
+        env_args,
+        algorithm="SPIL",
+        trainer="off_serial_trainer",
+        seed=0,
+        constraint_dim=1,
+        value_func_name="StateValue",
+        value_func_type="MLP",
+        value_hidden_sizes=[16, 16],
+        value_hidden_activation="elu",
+        policy_func_name="DetermPolicy",
+        policy_func_type="MLP",
+        policy_act_distribution="default",
+        policy_hidden_sizes=[16, 16],
+        policy_hidden_activation="elu",
+        value_learning_rate=1e-3,
+        policy_learning_rate=1e-3,
+        forward_step=FORWARD_STEP,
+        buffer_name="replay_buffer",
+        buffer_max_size=1000,
+        sampler_name="off_sampler",
+        sample_batch_size=BATCH_SIZE,
+        noise_params={"mean": np.zeros(1, np.float32), "std": 0.2 * np.ones(1, np.float32)},
+        cnn_shared=False,
+        use_gpu=False,
+        obsv_dim=env.observation_space.shape[0],
+        action_type="continu",
+        action_dim=env.action_space.shape[0],
+        action_high_limit=env.action_space.high.astype(np.float32),
+        action_low_limit=env.action_space.low.astype(np.float32),
+        additional_info=env.additional_info,
+    )
+
+
+@pytest.fixture(scope="module")
+def setup():
+    args = create_args()
+    sampler = create_sampler(**args)
+    buffer = create_buffer(**args)
+    samples, _ = sampler.sample()
+    buffer.add_batch(samples)
+    return args, buffer.sample_batch(BATCH_SIZE)
+
+
+class CountingForward:
+    def __init__(self, forward):
+        self.forward = forward
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.forward(*args, **kwargs)
+
+
+def compute_gradient(alg, data):
+    alg.envmodel.forward = CountingForward(alg.envmodel.forward)
+    alg._compute_gradient(data, 0)
+    grads = {
+        name: [p.grad.clone() for p in net.parameters()]
+        for name, net in alg.networks.net_dict.items()
+    }
+    return grads, alg.envmodel.forward.calls
+
+
+def compute_separate_gradient(alg, data):
+    # value loss and policy loss with a rollout of their own each
+    alg.envmodel.forward = CountingForward(alg.envmodel.forward)
+    alg.networks.v.zero_grad()
+    loss_v, info = alg._compute_loss_v(data, batch=None)
+    loss_v.backward()
+    alg.safe_prob = info["safe_prob"]
+    weight = alg._spil_get_weight()
+    alg.rollout_cache.clear()
+    alg.networks.policy.zero_grad()
+    alg._compute_loss_policy(data, weight)[0].backward()
+    grads = {
+        name: [p.grad.clone() for p in net.parameters()]
+        for name, net in alg.networks.net_dict.items()
+    }
+    return grads, alg.envmodel.forward.calls
+
+
+def assert_grads_close(grads, expected):
+    for name in expected:
+        for g, g_expected in zip(grads[name], expected[name]):
+            assert torch.allclose(g, g_expected, rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("micro_batch_memory", [None, 1000.0, 0.001])
+def test_shared_rollout(setup, micro_batch_memory):
+    args, data = setup
+    torch.manual_seed(0)
+    expected, separate_calls = compute_separate_gradient(create_alg(**args), data)
+    assert separate_calls == 2 * FORWARD_STEP
+    torch.manual_seed(0)
+    alg = create_alg(**args, micro_batch_memory=micro_batch_memory)
+    if micro_batch_memory == 0.001:
+        alg.micro_batch.probe_size = 8
+    grads, calls = compute_gradient(alg, data)
+    assert_grads_close(grads, expected)
+    if micro_batch_memory != 0.001:
+        # batch fits in one micro batch, and one rollout with graph serves both losses
+        assert calls == separate_calls // 2
+    else:
+        # micro batches are rolled out without graph for value loss, and with graph
+        # for policy loss
+        assert calls >= 2 * (BATCH_SIZE // 8) * FORWARD_STEP
+
+
+class NumpyPID:
+    """PID multiplier of SPIL updated in NumPy, as before it was kept in torch."""
+
+    def __init__(self, constraint_dim):
+        self.delta_i = np.array([0.0] * constraint_dim)
+        self.Kp, self.Ki, self.Kd = 60, 0.02, 0
+        self.safe_prob_pre = np.array([0.0] * constraint_dim)
+        self.chance_thre = np.array([0.97] * constraint_dim)
+
+    def get_weight(self, safe_prob):
+        delta_p = self.chance_thre - safe_prob
+        delta_p_sepa = np.where(np.abs(delta_p) > 0.1, delta_p * 0.7, delta_p)
+        delta_p_sepa = np.where(np.abs(delta_p) > 0.2, delta_p * 0, delta_p_sepa)
+        self.delta_i = np.clip(self.delta_i + delta_p_sepa, 0, 99999)
+        delta_d = np.clip(self.safe_prob_pre - safe_prob, 0, 3333)
+        lam = np.clip(
+            self.Ki * self.delta_i + self.Kp * delta_p + self.Kd * delta_d, 0, 3333
+        )
+        self.safe_prob_pre = safe_prob
+        return 1 / (1 + lam.sum()), lam / (1 + lam.sum())
+
+
+def numpy_safe_prob(constraints):
+    traj_issafe = np.ones(constraints.shape[1:])
+    for c in constraints:
+        traj_issafe *= c <= 0
+    return traj_issafe.mean(0)
+
+
+def test_safe_prob_and_weight(setup):
+    args, data = setup
+    constraint_dim = 3
+    alg = create_alg(**dict(args, constraint_dim=constraint_dim))
+    reference = NumpyPID(constraint_dim)
+    rng = np.random.default_rng(0)
+    # |chance_thre - safe_prob| below 0.1, between 0.1 and 0.2, and above 0.2, in turn
+    # for each constraint, and safe probability decreasing for derivative term
+    safe_probs = [
+        np.array([0.95, 0.82, 0.5]),
+        np.array([0.82, 0.5, 0.99]),
+        np.array([0.5, 0.99, 0.85]),
+        np.array([0.99, 0.6, 0.75]),
+        np.array([1.0, 1.0, 1.0]),
+    ]
+    for safe_prob in safe_probs:
+        # constraints [T, B, constraint_dim] with given fraction of safe trajectories
+        T, B = FORWARD_STEP, BATCH_SIZE
+        constraints = rng.uniform(-1, 0, (T, B, constraint_dim))
+        for k in range(constraint_dim):
+            unsafe = rng.permutation(B)[: int(round((1 - safe_prob[k]) * B))]
+            constraints[rng.integers(T, size=len(unsafe)), unsafe, k] = 0.5
+        rollout = ModelRollout(
+            ret=torch.zeros(B),
+            last_obs=data["obs"],
+            last_done=data["done"],
+            constraints=torch.as_tensor(constraints, dtype=torch.float32),
+        )
+        alg.rollout_cache.get = lambda *args, **kwargs: rollout
+
+        alg.safe_prob = alg._compute_loss_v(data, batch=data)[1]["safe_prob"]
+        expected_safe_prob = numpy_safe_prob(constraints)
+        assert np.allclose(alg.safe_prob.numpy(), expected_safe_prob, atol=1e-6)
+
+        w_r, w_c = alg._spil_get_weight()
+        expected_w_r, expected_w_c = reference.get_weight(expected_safe_prob)
+        assert np.allclose(w_r.item(), expected_w_r, rtol=1e-5, atol=1e-7)
+        assert np.allclose(w_c.numpy(), expected_w_c, rtol=1e-5, atol=1e-7)
+        assert np.allclose(alg.delta_i.numpy(), reference.delta_i, rtol=1e-5, atol=1e-6)
@@ -0,0 +1,187 @@
+import copy
+
+import numpy as np
+import pytest
+import torch
+from torch.nn.utils.convert_parameters import parameters_to_vector, vector_to_parameters
+
+from gops.create_pkg.create_alg import create_alg
+from gops.create_pkg.create_env import create_env
+
+"""
+    Fisher-vector product reusing the KL gradient graph is compared with the former
+    double backward product, and the batched line search with a sequential one.
+"""
+
+BATCH_SIZE = 64
+
+
+def create_trpo(**kwargs):
+    env = create_env("gym_pendulum")
+    torch.manual_seed(0)
+    return create_alg(
+        env_id="gym_pendulum",
+        algorithm="TRPO",
+        trainer="on_serial_trainer",
+        seed=0,
+        value_func_name="StateValue",
+        value_func_type="MLP",
+        value_hidden_sizes=[16, 16],
+        value_hidden_activation="tanh",
+        policy_func_name="StochaPolicy",
+        policy_func_type="MLP",
+        policy_act_distribution="GaussDistribution",
+        policy_hidden_sizes=[16, 16],
+        policy_hidden_activation="tanh",
+        policy_std_type="parameter",
+        policy_min_log_std=-20,
+        policy_max_log_std=1,
+        value_learning_rate=1e-3,
+        rtol=1e-5,
+        atol=1e-8,
+        damping_factor=0.01,
+        max_cg=10,
+        alpha=0.8,
+        max_search=10,
+        train_v_iters=1,
+        cnn_shared=False,
+        use_gpu=False,
+        obsv_dim=env.observation_space.shape[0],
+        action_type="continu",
+        action_dim=env.action_space.shape[0],
+        action_high_limit=env.action_space.high.astype(np.float32),
+        action_low_limit=env.action_space.low.astype(np.float32),
+        **kwargs,
+    )
+
+
+def create_data(alg):
+    torch.manual_seed(1)
+    env = create_env("gym_pendulum")
+    obs_dim = env.observation_space.shape[0]
+    act_dim = env.action_space.shape[0]
+    return {
+        "obs": torch.randn(BATCH_SIZE, obs_dim),
+        "act": torch.randn(BATCH_SIZE, act_dim),
+        "adv": torch.randn(BATCH_SIZE),
+        "ret": torch.randn(BATCH_SIZE),
+    }
+
+
+def kl_to_current(alg, obs):
+    policy = alg.networks.policy
+    with torch.no_grad():
+        pi_old = alg.networks.create_action_distributions(logits=policy(obs))
+    pi = alg.networks.create_action_distributions(logits=policy(obs))
+    return pi.kl_divergence(pi_old).mean(), pi_old
+
+
+def reference_fvp(d_kl, params, x, damping_factor):
+    # former product, KL gradient graph rebuilt for every vector
+    g = torch.autograd.grad(d_kl, params, create_graph=True)
+    g_vec = torch.cat([t.reshape(-1) for t in g])
+    hvp = torch.autograd.grad(torch.dot(g_vec, x), params, retain_graph=True)
+    return torch.cat([t.reshape(-1) for t in hvp]) + damping_factor * x
+
+
+def test_fisher_vector_product():
+    alg = create_trpo(delta=0.01)
+    obs = create_data(alg)["obs"]
+    params = list(alg.networks.policy.parameters())
+    d_kl, _ = kl_to_current(alg, obs)
+    cg_func = alg._fisher_vector_product(d_kl, params)
+
+    torch.manual_seed(2)
+    numel = parameters_to_vector(params).numel()
+    # product is evaluated several times on the same graph, as in conjugate gradient
+    for _ in range(3):
+        x = torch.randn(numel)
+        expected = reference_fvp(d_kl, params, x, alg.damping_factor)
+        assert torch.allclose(cg_func(x), expected, rtol=1e-5, atol=1e-6)
+
+
+def test_batched_policy_forward():
+    alg = create_trpo(delta=0.01)
+    data = create_data(alg)
+    obs, act, adv = data["obs"], data["act"], data["adv"]
+    policy = alg.networks.policy
+    _, pi_old = kl_to_current(alg, obs)
+    logp_old = pi_old.log_prob(act)
+
+    weight_old = parameters_to_vector(policy.parameters()).detach()
+    torch.manual_seed(3)
+    step = 0.1 * torch.randn_like(weight_old)
+    step_sizes = alg.alpha ** torch.arange(alg.max_search, dtype=weight_old.dtype)
+    candidates = weight_old + step_sizes.unsqueeze(1) * step
+
+    with torch.no_grad():
+        pi_new = alg.networks.create_action_distributions(
+            logits=alg._batched_policy_forward(candidates, obs)
+        )
+        logp_new = pi_new.log_prob(act)
+        surrogate = torch.mean(torch.exp(logp_new - logp_old) * adv, dim=-1)
+        kl = pi_new.kl_divergence(pi_old).mean(dim=-1)
+    assert surrogate.shape == kl.shape == (alg.max_search,)
+
+    new_policy = copy.deepcopy(policy)
+    for i in range(alg.max_search):
+        vector_to_parameters(candidates[i], new_policy.parameters())
+        with torch.no_grad():
+            pi = alg.networks.create_action_distributions(logits=new_policy(obs))
+            logp = pi.log_prob(act)
+            expected_surrogate = torch.mean(torch.exp(logp - logp_old) * adv)
+            expected_kl = pi.kl_divergence(pi_old).mean()
+        assert torch.allclose(surrogate[i], expected_surrogate, rtol=1e-5, atol=1e-6)
+        assert torch.allclose(kl[i], expected_kl, rtol=1e-5, atol=1e-7)
+
+
+def reference_policy_update(alg, data):
+    # former policy update, with double backward product and sequential line search
+    obs, act, adv = data["obs"], data["act"], data["adv"]
+    adv = (adv - adv.mean()) / (adv.std() + 1e-8)
+    policy = alg.networks.policy
+    params = list(policy.parameters())
+    with torch.no_grad():
+        pi_old = alg.networks.create_action_distributions(logits=policy(obs))
+    logp_old = pi_old.log_prob(act)
+    pi = alg.networks.create_action_distributions(logits=policy(obs))
+    surrogate = torch.mean(torch.exp(pi.log_prob(act) - logp_old) * adv)
+    g_vec = torch.cat(
+        [t.reshape(-1) for t in torch.autograd.grad(surrogate, params, retain_graph=True)]
+    )
+    d_kl = pi.kl_divergence(pi_old).mean()
+    x_vec, _ = alg._conjugate_gradient(
+        lambda x: reference_fvp(d_kl, params, x, alg.damping_factor),
+        g_vec,
+        torch.zeros_like(g_vec),
+        alg.rtol,
+        alg.atol,
+        alg.max_cg,
+    )
+    weight_old = parameters_to_vector(params).detach()
+    trpo_step = torch.sqrt(2 * alg.delta / (torch.dot(g_vec, x_vec) + 1e-8)) * x_vec
+    new_policy = copy.deepcopy(policy)
+    for i in range(alg.max_search):
+        vector_to_parameters(weight_old + alg.alpha**i * trpo_step, new_policy.parameters())
+        with torch.no_grad():
+            pi_new = alg.networks.create_action_distributions(logits=new_policy(obs))
+            surrogate_new = torch.mean(torch.exp(pi_new.log_prob(act) - logp_old) * adv)
+            kl_new = pi_new.kl_divergence(pi_old).mean()
+        if surrogate_new > 0 and kl_new < alg.delta:
+            return parameters_to_vector(new_policy.parameters()).detach()
+    return weight_old
+
+
+# full step is accepted with the small KL constraint, backtracked with the large one
+@pytest.mark.parametrize("delta", [1e-2, 0.5])
+def test_local_update_policy_step(delta):
+    alg = create_trpo(delta=delta)
+    data = create_data(alg)
+    weight_old = parameters_to_vector(alg.networks.policy.parameters()).detach()
+    expected = reference_policy_update(alg, data)
+    alg.local_update(data, 0)
+    weight = parameters_to_vector(alg.networks.policy.parameters()).detach()
+    # same backtracking step is accepted, up to float32 drift of conjugate gradient
+    expected_step = torch.linalg.norm(expected - weight_old)
+    assert expected_step > 0
+    assert torch.linalg.norm(weight - expected) < 1e-3 * expected_step
@@ -0,0 +1,77 @@
+import pytest
+import torch
+import torch.nn as nn
+
+from gops.apprfunc.lipsnet import LipsNet, activation_grad
+
+"""
+    Jacobian of LipsNet chained in its forward pass is compared with
+    torch.func.jacrev for every supported activation.
+"""
+
+ACTIVATIONS = {
+    "identity": nn.Identity,
+    "relu": nn.ReLU,
+    "leaky_relu": lambda: nn.LeakyReLU(0.2),
+    "tanh": nn.Tanh,
+    "sigmoid": nn.Sigmoid,
+    "elu": lambda: nn.ELU(0.5),
+    "selu": nn.SELU,
+    "gelu": nn.GELU,
+    # large beta so that some inputs exceed the linear threshold
+    "softplus": lambda: nn.Softplus(beta=10),
+}
+
+
+def create_lipsnet(sizes, activation, output_activation=nn.Identity, **kwargs):
+    torch.manual_seed(0)
+    return LipsNet(sizes, activation, output_activation, lips_auto_adjust=False, **kwargs)
+
+
+def reference_jacobian(mlp, x):
+    return torch.func.vmap(torch.func.jacrev(mlp))(x)
+
+
+# input narrower than output and the reverse, to cover both contraction orders
+@pytest.mark.parametrize("sizes", [[3, 16, 16, 5], [6, 16, 16, 2]])
+@pytest.mark.parametrize("output_activation", ["identity", "tanh"])
+@pytest.mark.parametrize("activation", list(ACTIVATIONS))
+def test_forward_with_jacobian(activation, output_activation, sizes):
+    net = create_lipsnet(sizes, ACTIVATIONS[activation], ACTIVATIONS[output_activation])
+    assert net.jac_type == "analytic"
+    x = 2 * torch.randn(32, sizes[0])
+    out, jacobi = net.forward_with_jacobian(x)
+    assert torch.allclose(out, net.mlp(x))
+    assert jacobi.shape == (32, sizes[-1], sizes[0])
+    assert torch.allclose(jacobi, reference_jacobian(net.mlp, x), rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("activation", list(ACTIVATIONS))
+def test_activation_grad(activation):
+    act = ACTIVATIONS[activation]()
+    z = 3 * torch.randn(256)
+    grad = activation_grad(act, z, act(z))
+    expected = torch.func.vmap(torch.func.grad(act))(z)
+    if grad is None:
+        assert isinstance(act, nn.Identity)
+        grad = torch.ones_like(z)
+    assert torch.allclose(grad, expected, rtol=1e-5, atol=1e-6)
+
+
+def test_forward_matches_jacrev():
+    net = create_lipsnet([3, 16, 16, 2], nn.ELU)
+    x = torch.randn(32, 3)
+    out = net(x)
+    net.jac_type = "jacrev"
+    assert torch.allclose(out, net(x), rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("activation", [nn.Mish, lambda: nn.GELU("tanh")])
+def test_unsupported_activation_fallback(activation):
+    assert activation_grad(activation(), torch.zeros(1), torch.zeros(1)) is NotImplemented
+    net = create_lipsnet([3, 16, 16, 2], activation)
+    assert net.jac_type == "jacrev"
+    x = torch.randn(32, 3)
+    norm = torch.norm(reference_jacobian(net.mlp, x), 2, dim=(1, 2)).unsqueeze(1)
+    expected = net.K(x) * net.mlp(x) / (norm + net.eps)
+    assert torch.allclose(net(x), expected, rtol=1e-5, atol=1e-6)
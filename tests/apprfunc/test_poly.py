@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+import torch
+
+from gops.apprfunc.poly import (
+    count_features_dim,
+    create_features,
+    get_features_dim,
+    make_features,
+    monomial_index,
+)
+from gops.create_pkg.create_apprfunc import create_apprfunc
+from gops.utils.act_distribution_type import DiracDistribution
+
+"""
+    Polynomial features gathered by monomial index table are compared with
+    monomials listed in closed form.
+"""
+
+OBS_DIM, ACT_DIM = 4, 2
+
+
+def closed_form_monomials(x, order):
+    # all products x_i x_j ... with i <= j <= ..., in lexicographic order
+    n = x.shape[1]
+    if order == 1:
+        return [x[:, i] for i in range(n)]
+    if order == 2:
+        return [x[:, i] * x[:, j] for i in range(n) for j in range(i, n)]
+    if order == 3:
+        return [
+            x[:, i] * x[:, j] * x[:, k]
+            for i in range(n)
+            for j in range(i, n)
+            for k in range(j, n)
+        ]
+    raise ValueError("Not set order properly")
+
+
+def legacy_create_features(x):
+    # former degree 2 features, whose column order saved networks rely on
+    obs_dim = x.shape[1]
+    features = torch.zeros((x.shape[0], count_features_dim(obs_dim, 2)))
+    k = 0
+    for i in range(0, obs_dim):
+        for j in range(i, obs_dim):
+            features[:, k : k + 1] = torch.mul(x[:, i : i + 1], x[:, j : j + 1])
+            k = k + 1
+    return features
+
+
+def create_obs():
+    torch.manual_seed(0)
+    return torch.randn(8, OBS_DIM)
+
+
+@pytest.mark.parametrize("degree", [1, 2, 3])
+def test_make_features(degree):
+    x = create_obs()
+    expected = torch.stack(
+        [m for d in range(1, degree + 1) for m in closed_form_monomials(x, d)], 1
+    )
+    features_dim = sum(count_features_dim(OBS_DIM, d) for d in range(1, degree + 1))
+    assert get_features_dim(OBS_DIM, degree) == features_dim
+    assert make_features(x, degree).shape == (8, features_dim)
+    assert torch.allclose(make_features(x, degree), expected, rtol=1e-6, atol=1e-6)
+
+
+@pytest.mark.parametrize("degree", [1, 2, 3])
+def test_create_features(degree):
+    x = create_obs()
+    expected = torch.stack(closed_form_monomials(x, degree), 1)
+    features = create_features(x, degree)
+    assert features.shape == (8, count_features_dim(OBS_DIM, degree))
+    assert torch.allclose(features, expected, rtol=1e-6, atol=1e-6)
+
+
+def test_create_features_legacy_order():
+    x = create_obs()
+    assert torch.equal(create_features(x, 2), legacy_create_features(x))
+
+
+def test_monomial_index():
+    index = monomial_index(OBS_DIM, 3)
+    # every row is a unique monomial, padded with the constant index
+    rows = {tuple(row) for row in index.tolist()}
+    assert len(rows) == index.shape[0]
+    assert index.max().item() == OBS_DIM
+    assert monomial_index(OBS_DIM, 3) is index
+
+
+@pytest.mark.parametrize("degree", [1, 2, 3])
+def test_poly_policy(degree):
+    policy = create_apprfunc(
+        apprfunc="POLY",
+        name="DetermPolicy",
+        obs_dim=OBS_DIM,
+        act_dim=ACT_DIM,
+        degree=degree,
+        add_bias=True,
+        act_high_lim=np.ones(ACT_DIM, dtype=np.float32),
+        act_low_lim=-np.ones(ACT_DIM, dtype=np.float32),
+        action_distribution_cls=DiracDistribution,
+    )
+    x = create_obs()
+    expected = policy.pi(make_features(x, degree))
+    assert policy(x).shape == (8, ACT_DIM)
+    assert torch.equal(policy(x), expected)
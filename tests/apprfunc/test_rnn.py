@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+import torch
+
+from gops.create_pkg.create_apprfunc import create_apprfunc
+from gops.utils.act_distribution_type import DiracDistribution, TanhGaussDistribution
+
+"""
+    Recurrent execution of rnn policies frame by frame is compared with their
+    execution on whole sequences.
+"""
+
+OBS_DIM, ACT_DIM = 3, 2
+
+
+def create_policy(name, recurrent=True, obs_dim=OBS_DIM):
+    torch.manual_seed(0)
+    return create_apprfunc(
+        apprfunc="RNN",
+        name=name,
+        obs_dim=obs_dim,
+        act_dim=ACT_DIM,
+        hidden_sizes=[16, 16],
+        hidden_activation="relu",
+        output_activation="linear",
+        act_high_lim=np.ones(ACT_DIM, dtype=np.float32),
+        act_low_lim=-np.ones(ACT_DIM, dtype=np.float32),
+        min_log_std=-20,
+        max_log_std=2,
+        recurrent=recurrent,
+        action_distribution_cls=TanhGaussDistribution
+        if name == "StochaPolicy"
+        else DiracDistribution,
+    )
+
+
+@pytest.mark.parametrize("name", ["DetermPolicy", "StochaPolicy"])
+def test_step_matches_forward_sequence(name):
+    policy = create_policy(name)
+    assert policy.recurrent
+    obs_seq = torch.randn(4, 7, OBS_DIM)
+    with torch.no_grad():
+        expected, expected_hidden = policy.forward_sequence(obs_seq)
+        # continuation from a given hidden state
+        hidden = policy.init_hidden(4)
+        outputs = []
+        for t in range(obs_seq.shape[1]):
+            output, hidden = policy.step(obs_seq[:, t], hidden)
+            outputs.append(output)
+        # a window only contributes its latest frame to recurrent execution
+        window_output, _ = policy.step(obs_seq, policy.init_hidden(4))
+        frame_output, _ = policy.step(obs_seq[:, -1], policy.init_hidden(4))
+        # forward reruns the window from zero hidden state
+        forward_output = policy(obs_seq)
+    assert torch.allclose(torch.stack(outputs, dim=1), expected, atol=1e-6)
+    assert torch.allclose(hidden, expected_hidden, atol=1e-6)
+    assert torch.allclose(window_output, frame_output, atol=1e-6)
+    assert torch.allclose(forward_output, expected[:, -1], atol=1e-6)
+
+
+def test_finite_horizon_policy():
+    policy = create_policy("FiniteHorizonPolicy", recurrent=False, obs_dim=(5, OBS_DIM))
+    obs = torch.randn(4, 5, OBS_DIM)
+    with torch.no_grad():
+        action = policy(obs, virtual_t=3)
+        frame_action = policy(obs[:, 0])
+    assert action.shape == frame_action.shape == (4, ACT_DIM)
+    assert torch.all(action.abs() <= 1)
+    # virtual time step is an input of policy
+    assert not torch.allclose(action, policy(obs, virtual_t=1))
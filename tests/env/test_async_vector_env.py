@@ -0,0 +1,124 @@
+from dataclasses import fields
+from functools import partial
+
+import numpy as np
+import pytest
+
+from gops.create_pkg.create_env import create_env
+from gops.env.env_gen_ocp.pyth_base import State
+from gops.env.vector.async_vector_env import AsyncVectorEnv
+from gops.env.vector.sync_vector_env import SyncVectorEnv
+
+"""
+    Async vector env is compared with sync vector env of the same sub-environments,
+    stepped with the same actions from the same seeds, including infos transported
+    through shared memory, worker groups of several envs, and automatic resets
+    after termination and time limit.
+"""
+
+ENV_ID = "veh3dof_tracking_surrcstr"
+NUM_ENVS = 5
+NUM_STEPS = 45
+
+
+def assert_state_equal(state, expected):
+    assert isinstance(state, State)
+    assert np.array_equal(state.robot_state, expected.robot_state)
+    for field in fields(expected.context_state):
+        assert np.array_equal(
+            getattr(state.context_state, field.name),
+            getattr(expected.context_state, field.name),
+        )
+
+
+def assert_value_equal(value, expected):
+    if isinstance(expected, State):
+        assert_state_equal(value, expected)
+    elif isinstance(expected, dict):
+        # final info of autoreset is sent through pipe
+        assert set(value.keys()) == set(expected.keys())
+        for k, v in expected.items():
+            assert_value_equal(value[k], v)
+    else:
+        assert np.array_equal(value, expected)
+
+
+def assert_info_equal(info, expected):
+    assert set(info.keys()) == set(expected.keys())
+    for k, v in expected.items():
+        if k.startswith("_"):
+            assert np.array_equal(info[k], v)
+        else:
+            for i in np.flatnonzero(expected[f"_{k}"]):
+                assert_value_equal(info[k][i], v[i])
+
+
+def create_vector_envs(**kwargs):
+    env_fns = [
+        partial(
+            create_env,
+            ENV_ID,
+            pre_horizon=10,
+            max_episode_steps=20,
+            gym2gymnasium=True,
+        )
+    ] * NUM_ENVS
+    return SyncVectorEnv(env_fns), AsyncVectorEnv(env_fns, **kwargs)
+
+
+# worker groups of 2 and 3 envs do not divide the number of envs evenly
+test_cases = [
+    {"shared_memory": True, "shared_info": True, "envs_per_worker": 1},
+    {"shared_memory": True, "shared_info": False, "envs_per_worker": 1},
+    {"shared_memory": True, "shared_info": True, "envs_per_worker": 2},
+    {"shared_memory": True, "shared_info": False, "envs_per_worker": 3},
+    {"shared_memory": False, "shared_info": False, "envs_per_worker": 2},
+    {"shared_memory": True, "shared_info": True, "envs_per_worker": 3, "pin_workers": True},
+]
+
+
+@pytest.mark.parametrize(
+    "case", test_cases, ids=["-".join(f"{k}={v}" for k, v in c.items()) for c in test_cases]
+)
+def test_async_vs_sync(case):
+    sync_env, async_env = create_vector_envs(**case)
+    shared_info = case["shared_memory"] and case["shared_info"]
+    try:
+        assert async_env.shared_info == shared_info
+        assert len(async_env.processes) == -(-NUM_ENVS // case["envs_per_worker"])
+        sync_obs, sync_info = sync_env.reset(seed=3)
+        async_obs, async_info = async_env.reset(seed=3)
+        assert np.array_equal(sync_obs, async_obs)
+        assert_info_equal(async_info, sync_info)
+
+        rng = np.random.default_rng(0)
+        sync_results, async_results = [], []
+        num_dones = 0
+        for _ in range(NUM_STEPS):
+            action = rng.uniform(
+                -1, 1, (NUM_ENVS,) + sync_env.single_action_space.shape
+            ).astype(np.float32)
+            sync_results.append(sync_env.step(action))
+            async_results.append(async_env.step(action))
+            num_dones += np.sum(sync_results[-1][2] | sync_results[-1][3])
+        assert num_dones > 0
+
+        # results are compared after all steps, so that returned infos must not be
+        # overwritten by later steps
+        for sync_result, async_result in zip(sync_results, async_results):
+            obs, rew, term, trunc, info = async_result
+            assert np.array_equal(obs, sync_result[0])
+            assert np.array_equal(rew, sync_result[1])
+            assert np.array_equal(term, sync_result[2])
+            assert np.array_equal(trunc, sync_result[3])
+            assert_info_equal(info, sync_result[4])
+            if shared_info:
+                assert isinstance(info["constraint"], np.ndarray)
+                assert info["constraint"].dtype != object
+
+        # commands of grouped workers are sent to and received from envs in order
+        async_env.set_attr("test_value", list(range(NUM_ENVS)))
+        assert list(async_env.get_attr("test_value")) == list(range(NUM_ENVS))
+    finally:
+        sync_env.close()
+        async_env.close()
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from gops.create_pkg.create_env import create_env
+
+"""
+    Batched model vector env is compared with sync vector env of the same
+    sub-environments, stepped with the same actions from the same seeds, including
+    automatic resets after termination and time limit.
+"""
+
+test_cases = [
+    {"env_id": "idpendulum", "num_steps": 45},
+    {"env_id": "veh3dof_tracking", "pre_horizon": 10, "num_steps": 45},
+    {"env_id": "veh3dof_tracking_surrcstr", "pre_horizon": 10, "num_steps": 35},
+]
+
+
+@pytest.mark.parametrize("case", test_cases, ids=[c["env_id"] for c in test_cases])
+def test_batched_model_vs_sync(case):
+    case = dict(case)
+    num_steps = case.pop("num_steps")
+    num_envs = 6
+    envs = [
+        create_env(
+            vector_env_num=num_envs,
+            vector_env_type=vector_env_type,
+            reward_scale=0.1,
+            max_episode_steps=20,
+            gym2gymnasium=True,
+            **case,
+        )
+        for vector_env_type in ("sync", "batched_model")
+    ]
+    sync_obs, _ = envs[0].reset(seed=3)
+    batched_obs, _ = envs[1].reset(seed=3)
+    assert np.allclose(sync_obs, batched_obs, atol=1e-5)
+
+    rng = np.random.default_rng(0)
+    num_dones = 0
+    for _ in range(num_steps):
+        action = rng.uniform(
+            -1, 1, (num_envs,) + envs[0].single_action_space.shape
+        ).astype(np.float32)
+        sync_obs, sync_rew, sync_term, sync_trunc, sync_info = envs[0].step(action)
+        batched_obs, batched_rew, batched_term, batched_trunc, batched_info = envs[1].step(
+            action
+        )
+        assert np.array_equal(sync_term, batched_term)
+        assert np.array_equal(sync_trunc, batched_trunc)
+        assert np.allclose(sync_obs, batched_obs, rtol=1e-4, atol=1e-4)
+        assert np.allclose(sync_rew, batched_rew, rtol=1e-4, atol=1e-4)
+        if "constraint" in sync_info:
+            assert np.allclose(
+                np.stack(sync_info["constraint"]),
+                np.stack(batched_info["constraint"]),
+                rtol=1e-4,
+                atol=1e-4,
+            )
+        done = sync_term | sync_trunc
+        num_dones += done.sum()
+        for i in np.flatnonzero(done):
+            assert np.allclose(
+                sync_info["final_observation"][i],
+                batched_info["final_observation"][i],
+                rtol=1e-4,
+                atol=1e-4,
+            )
+    assert num_dones > 0
@@ -0,0 +1,48 @@
+import pytest
+import torch
+
+from gops.create_pkg.create_env_model import create_env_model
+
+"""
+    Closed-form finite horizon optimal value of wrapped LQ models is compared with
+    the return of a rollout of the time-varying optimal controller through wrappers.
+"""
+
+GAMMA = 0.99
+HORIZON = 20
+
+
+@pytest.mark.parametrize(
+    "wrapper_kwargs",
+    [
+        {},
+        {"reward_scale": 0.1, "reward_shift": 0.5},
+        {"obs_scale": [1, 2, 0.5], "obs_shift": [0.1, 0, 0]},
+    ],
+)
+def test_optimal_value_through_wrappers(wrapper_kwargs):
+    model = create_env_model("pyth_lq", lq_config="s3a1", **wrapper_kwargs)
+    dynamics = model.unwrapped.dynamics
+    low, high = model.unwrapped.action_lower_bound, model.unwrapped.action_upper_bound
+    obs_scale = torch.as_tensor(wrapper_kwargs.get("obs_scale", 1.0))
+    obs_shift = torch.as_tensor(wrapper_kwargs.get("obs_shift", 0.0))
+
+    torch.manual_seed(0)
+    state = 0.05 * torch.randn(4, 3)
+    obs = (state + obs_shift) * obs_scale
+    value = model.optimal_value(obs, GAMMA, HORIZON)
+
+    o, d, ret = obs, torch.zeros(4, dtype=torch.bool), 0
+    for t in range(HORIZON):
+        K, _ = dynamics.riccati(GAMMA, HORIZON - t)
+        raw_action = -(o / obs_scale - obs_shift) @ K.T
+        # actions are scaled to [-1, 1] by default
+        action = (raw_action - low) / (high - low) * 2 - 1
+        o, r, d, _ = model.forward(o, action, d, {})
+        ret = ret + r * GAMMA ** t
+    assert torch.allclose(value, ret, rtol=1e-4, atol=1e-5)
+
+
+def test_no_optimal_value_through_action_repeat():
+    model = create_env_model("pyth_lq", lq_config="s3a1", repeat_num=2)
+    assert not hasattr(model, "optimal_value")
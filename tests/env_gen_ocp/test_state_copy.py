@@ -0,0 +1,72 @@
+from copy import deepcopy
+from dataclasses import fields
+
+import numpy as np
+import pytest
+import torch
+
+from gops.create_pkg.create_env import create_env
+from gops.env.env_gen_ocp.pyth_base import ContextState, State
+
+"""
+    State infos returned by envs are copied field by field, and must not change when
+    the state of the env is changed afterwards.
+"""
+
+ENV_IDS = ["veh2dof_tracking", "veh3dof_tracking", "veh3dof_tracking_surrcstr"]
+
+
+def state_leaves(state):
+    return [state.robot_state] + [
+        getattr(state.context_state, field.name) for field in fields(state.context_state)
+    ]
+
+
+def assert_state_equal(state, expected):
+    for leaf, expected_leaf in zip(state_leaves(state), state_leaves(expected)):
+        if isinstance(expected_leaf, torch.Tensor):
+            assert torch.equal(leaf, expected_leaf)
+        else:
+            assert np.array_equal(leaf, expected_leaf)
+
+
+@pytest.mark.parametrize("array", [np.array, torch.tensor])
+def test_state_copy(array):
+    state = State(
+        robot_state=array([1.0, 2.0]),
+        context_state=ContextState(
+            reference=array([[3.0, 4.0], [5.0, 6.0]]), constraint=None, t=2
+        ),
+    )
+    copied = state.copy()
+    assert type(copied.robot_state) is type(state.robot_state)
+    assert copied.context_state.constraint is None
+    assert_state_equal(copied, state)
+
+    expected = deepcopy(state)
+    state.robot_state[0] = 0
+    state.context_state.reference[1] = 0
+    state.context_state.t = 3
+    assert_state_equal(copied, expected)
+
+
+@pytest.mark.parametrize("env_id", ENV_IDS)
+def test_info_state_not_aliased(env_id):
+    env = create_env(env_id, pre_horizon=10)
+    _, info = env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    infos = [info]
+    expected = [deepcopy(info["state"])]
+    for _ in range(5):
+        action = rng.uniform(-1, 1, env.action_space.shape).astype(np.float32)
+        _, _, _, info = env.step(action)
+        infos.append(info)
+        expected.append(deepcopy(info["state"]))
+
+    # state of env is changed in place after infos are returned
+    env_state = env.unwrapped._state
+    for leaf in state_leaves(env_state):
+        if isinstance(leaf, np.ndarray):
+            leaf += 1
+    for info, expected_state in zip(infos, expected):
+        assert_state_equal(info["state"], expected_state)
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import torch
+
+from gops.create_pkg.create_env import create_env
+from gops.create_pkg.create_env_model import create_env_model
+from gops.utils.math_utils import batch_jacobian
+
+"""
+    Transition jacobians assembled from analytic model jacobians, used by sparse
+    collocation in OptController, are compared with autograd through the model.
+    cartpoleconti has float64 robot states and float32 actions.
+"""
+
+
+def get_cartpole():
+    env = create_env("cartpoleconti")
+    model = create_env_model("cartpoleconti")
+    env.reset(seed=0)
+    return env, model
+
+
+def test_robot_model_jacobian_mixed_dtype():
+    env, model = get_cartpole()
+    robot_state = env.state.array2tensor().robot_state
+    assert robot_state.dtype == torch.float64
+    xs = robot_state + 0.01 * torch.randn(4, robot_state.shape[0], dtype=torch.float64)
+    us = torch.rand(4, model.action_dim) * 2 - 1
+
+    jac_state, jac_action = model.robot_model_jacobian(xs, us)
+    ref_state, ref_action = batch_jacobian(model.robot_model_get_next_state, xs, us)
+    assert np.allclose(jac_state, ref_state, rtol=1e-5, atol=1e-6)
+    assert np.allclose(jac_action, ref_action, rtol=1e-5, atol=1e-6)
+
+
+def test_sparse_collocation_jacobian():
+    pytest.importorskip("cyipopt")
+    from gops.sys_simulator.opt_controller_for_gen_env import OptController
+
+    env, model = get_cartpole()
+    x = env.state.array2tensor()
+    controllers = [
+        OptController(model, num_pred_step=10, mode="collocation", sparse_jac=sparse_jac)
+        for sparse_jac in (True, False)
+    ]
+    inputs = np.random.default_rng(0).uniform(
+        -0.1, 0.1, 10 * controllers[0].optimize_dim
+    ).astype(np.float32)
+    sparse_jac = controllers[0]._trans_constraint_jac(inputs, x).toarray()
+    dense_jac = controllers[1]._trans_constraint_jac(inputs, x)
+    assert np.allclose(sparse_jac, dense_jac, rtol=1e-4, atol=1e-5)
+
+
+@pytest.mark.parametrize(
+    "version, supported", [("1.2.0", False), ("1.4.1", False), ("1.5.0", True), ("2.0", True)]
+)
+def test_sparse_hessian_supported(version, supported):
+    from gops.sys_simulator.sparse_derivative import coo_array, sparse_hessian_supported
+
+    has_coords = hasattr(coo_array((1, 1)), "coords")
+    assert sparse_hessian_supported(version) == (supported and has_coords)
+
+
+def test_dense_constraint_jacobian_of_any_length():
+    pytest.importorskip("cyipopt")
+    from gops.sys_simulator.opt_controller_for_gen_env import OptController
+
+    env, model = get_cartpole()
+    # constraints on rollout states of timestep 1 to T only
+    model.get_constraint = lambda state: state.robot_state[1:, :2].reshape(-1)
+    x = env.state.array2tensor()
+    controller = OptController(model, num_pred_step=10, mode="collocation", sparse_jac=False)
+    inputs = np.random.default_rng(0).uniform(
+        -0.1, 0.1, 10 * controller.optimize_dim
+    ).astype(np.float32)
+    jac = controller._constraint_jac(inputs, x)
+    assert isinstance(jac, np.ndarray) and jac.shape == (20, inputs.shape[0])
@@ -0,0 +1,70 @@
+import numpy as np
+import torch
+from torch import nn
+
+from gops.apprfunc import mlp
+from gops.sys_simulator.sys_run import PolicyRunner, SweepStatistics
+from gops.utils.act_distribution_type import GaussDistribution
+
+"""
+    Statistics of robustness sweep are checked on a batch of three episodes, and
+    batched sweep actions are compared with modes of action distribution.
+"""
+
+
+def test_sweep_statistics():
+    stats = SweepStatistics(3)
+    # episode 0 runs 3 steps, episode 1 terminates at step 1, and episode 2 is truncated
+    # at step 0, values after episode end are masked
+    rewards = [[1.0, 2.0, 3.0], [1.0, 1.0, float("nan")], [1.0, 5.0, 5.0]]
+    constraints = [[-1.0, 0.5, 0.2], [0.3, -1.0, 9.0], [-1.0, 9.0, 9.0]]
+    dones = [[False, False, False], [False, True, True], [True, True, True]]
+    truncated = [[False, False, False], [False, False, False], [True, True, True]]
+    for t in range(3):
+        stats.add(
+            torch.tensor([r[t] for r in rewards]),
+            torch.tensor([d[t] for d in dones]),
+            torch.tensor([[c[t]] for c in constraints], dtype=torch.float64),
+            truncated=torch.tensor([tr[t] for tr in truncated]),
+        )
+    assert stats.stats["max_violation"].dtype == torch.float32
+    assert stats.stats["violation_steps"].dtype == torch.float32
+    result = stats.get_all()
+    assert np.allclose(result["return"], [6.0, 2.0, 1.0])
+    assert np.allclose(result["length"], [3, 2, 1])
+    assert np.allclose(result["terminated"], [0, 1, 0])
+    assert np.allclose(result["max_violation"], [0.5, 0.3, 0.0])
+    assert np.allclose(result["violation_rate"], [2 / 3, 1 / 2, 0.0])
+
+
+class Networks(nn.Module):
+    def __init__(self, policy: nn.Module):
+        super().__init__()
+        self.policy = policy
+
+    def create_action_distributions(self, logits):
+        return self.policy.get_act_dist(logits)
+
+
+def test_batch_action():
+    torch.manual_seed(0)
+    policy = mlp.StochaPolicy(
+        obs_dim=3,
+        act_dim=2,
+        hidden_sizes=[16],
+        hidden_activation="relu",
+        output_activation="linear",
+        act_high_lim=np.ones(2, dtype=np.float32),
+        act_low_lim=-np.ones(2, dtype=np.float32),
+        min_log_std=-20,
+        max_log_std=2,
+        std_type="mlp_shared",
+        action_distribution_cls=GaussDistribution,
+    )
+    networks = Networks(policy)
+    obs = 3 * torch.randn(10, 3)
+    action = PolicyRunner._PolicyRunner__batch_action(networks, obs)
+    with torch.no_grad():
+        expected = networks.create_action_distributions(policy(obs)).mode()
+    assert isinstance(action, torch.Tensor)
+    assert torch.allclose(action, expected, atol=1e-6)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from gops.create_pkg.create_buffer import create_buffer
+
+"""
+    Transitions of two sub-environments are stored in steps 0..14, with an episode
+    end on stream 0 after step 6 and a gap on stream 1 before step 10 (next
+    observation of step 9 differs from observation of step 10). Observations are
+    (stream, step), so chunks can be checked against their source steps.
+"""
+
+NUM_STEPS = 15
+
+
+def create_sequence_buffer(vector_env_num=2):
+    return create_buffer(
+        buffer_name="sequence_replay_buffer",
+        trainer="off_serial_trainer",
+        seed=0,
+        obsv_dim=2,
+        action_dim=1,
+        buffer_max_size=40,
+        buffer_burn_in=2,
+        buffer_seq_len=3,
+        vector_env_num=vector_env_num,
+        additional_info={},
+    )
+
+
+def fill(buffer):
+    for t in range(NUM_STEPS):
+        samples = []
+        for k in range(2):
+            obs = np.array([k, t], dtype=np.float32)
+            next_obs = np.array([k, t + 1], dtype=np.float32)
+            if k == 1 and t == 9:
+                next_obs[1] = -1
+            done = k == 0 and t == 6
+            samples.append((obs, np.zeros(1), 1.0, done, {}, next_obs, {}, 0.0))
+        buffer.add_batch(samples)
+
+
+def test_size():
+    buffer = create_sequence_buffer()
+    assert buffer.size == 0
+    fill(buffer)
+    assert isinstance(buffer.size, int)
+    assert buffer.size == len(buffer) == 2 * NUM_STEPS
+    # warm-up loop of off_serial_trainer compares size with an int
+    assert not buffer.size < 2 * NUM_STEPS
+    fill(buffer)
+    assert buffer.size == 40
+
+
+@pytest.mark.parametrize("refill", [False, True])
+def test_chunks_and_mask(refill):
+    buffer = create_sequence_buffer()
+    fill(buffer)
+    if refill:
+        # streams wrap around, chunks must not cross the write pointer
+        fill(buffer)
+    batch = buffer.sample_batch(256)
+    obs, mask = batch["obs"].numpy(), batch["mask"].numpy()
+    assert obs.shape == (256, 5, 2) and mask.shape == (256, 5)
+    for chunk_obs, chunk_mask in zip(obs, mask):
+        stream, steps = chunk_obs[0, 0], chunk_obs[:, 1]
+        assert np.all(chunk_obs[:, 0] == stream)
+        # consecutive steps of one stream, possibly wrapping to the refilled steps
+        assert np.all((np.diff(steps) == 1) | (np.diff(steps) == 1 - NUM_STEPS))
+        breaks = (np.diff(steps) != 1) | ((stream == 0) & (steps[1:] == 7)) | (
+            (stream == 1) & (steps[1:] == 10)
+        )
+        expected = np.cumprod(np.concatenate(([True], ~breaks)))
+        assert np.array_equal(chunk_mask, expected)
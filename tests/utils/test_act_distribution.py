@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+import torch
+
+from gops.utils.act_distribution_type import (
+    GaussDistribution,
+    TanhGaussDistribution,
+    TorchGaussDistribution,
+    TorchTanhGaussDistribution,
+)
+from gops.utils.common_utils import get_apprfunc_dict
+
+"""
+    Fused gauss distributions are compared with their torch.distributions based
+    counterparts, with default [-1, 1] and policy-set action limits.
+"""
+
+ACT_DIM = 3
+PAIRS = [
+    (TanhGaussDistribution, TorchTanhGaussDistribution),
+    (GaussDistribution, TorchGaussDistribution),
+]
+
+
+def create_logits(batch_size=64, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    mean = torch.randn(batch_size, ACT_DIM, generator=generator)
+    std = torch.rand(batch_size, ACT_DIM, generator=generator) + 0.1
+    return torch.cat((mean, std), dim=-1).requires_grad_()
+
+
+def create_dists(fused_cls, torch_cls, logits, limits):
+    dists = fused_cls(logits), torch_cls(logits)
+    if limits:
+        # set by policy in Action_Distribution.get_act_dist
+        for dist in dists:
+            dist.act_high_lim = torch.tensor([2.0, 1.0, 0.5])
+            dist.act_low_lim = torch.tensor([-1.0, -1.0, -0.5])
+    return dists
+
+
+def assert_close(x, y):
+    assert x.shape == y.shape
+    assert torch.allclose(x, y, rtol=1e-5, atol=1e-5)
+
+
+@pytest.mark.parametrize("limits", [False, True])
+@pytest.mark.parametrize("fused_cls, torch_cls", PAIRS)
+def test_sample(fused_cls, torch_cls, limits):
+    logits = create_logits()
+    results = []
+    for dist in create_dists(fused_cls, torch_cls, logits, limits):
+        torch.manual_seed(1)
+        action, log_prob = dist.sample()
+        (log_prob_grad,) = torch.autograd.grad(log_prob.sum(), logits)
+        results.append((action, log_prob, log_prob_grad))
+    (action, log_prob, grad), (expected_action, expected_log_prob, expected_grad) = results
+    assert_close(action, expected_action)
+    assert_close(log_prob, expected_log_prob)
+    assert_close(grad, expected_grad)
+
+
+@pytest.mark.parametrize("limits", [False, True])
+@pytest.mark.parametrize("fused_cls, torch_cls", PAIRS)
+def test_rsample(fused_cls, torch_cls, limits):
+    logits = create_logits()
+    results = []
+    for dist in create_dists(fused_cls, torch_cls, logits, limits):
+        torch.manual_seed(1)
+        action, log_prob = dist.rsample()
+        grad = torch.autograd.grad((action ** 2).sum() + log_prob.sum(), logits)[0]
+        results.append((action, log_prob, grad))
+    (action, log_prob, grad), (expected_action, expected_log_prob, expected_grad) = results
+    assert_close(action, expected_action)
+    assert_close(log_prob, expected_log_prob)
+    assert_close(grad, expected_grad)
+
+
+@pytest.mark.parametrize("limits", [False, True])
+@pytest.mark.parametrize("fused_cls, torch_cls", PAIRS)
+def test_statistics(fused_cls, torch_cls, limits):
+    logits, other_logits = create_logits(), create_logits(seed=1)
+    fused, reference = create_dists(fused_cls, torch_cls, logits, limits)
+    fused_other, reference_other = create_dists(fused_cls, torch_cls, other_logits, limits)
+    torch.manual_seed(1)
+    action, _ = reference.sample()
+    assert_close(fused.log_prob(action), reference.log_prob(action))
+    assert_close(fused.entropy(), reference.entropy())
+    assert_close(fused.mode(), reference.mode())
+    assert_close(
+        fused.kl_divergence(fused_other), reference.kl_divergence(reference_other)
+    )
+
+
+@pytest.mark.parametrize("fused", [True, False])
+@pytest.mark.parametrize(
+    "policy_act_distribution, expected",
+    [
+        ("default", (GaussDistribution, TorchGaussDistribution)),
+        ("TanhGaussDistribution", (TanhGaussDistribution, TorchTanhGaussDistribution)),
+        ("GaussDistribution", (GaussDistribution, TorchGaussDistribution)),
+        ("TorchTanhGaussDistribution", (TorchTanhGaussDistribution,) * 2),
+    ],
+)
+def test_fused_option(policy_act_distribution, expected, fused):
+    kwargs = dict(
+        policy_func_type="MLP",
+        policy_func_name="StochaPolicy",
+        obsv_dim=4,
+        policy_hidden_sizes=[16],
+        policy_hidden_activation="relu",
+        action_type="continu",
+        action_high_limit=np.ones(ACT_DIM, dtype=np.float32),
+        action_low_limit=-np.ones(ACT_DIM, dtype=np.float32),
+        action_dim=ACT_DIM,
+        policy_act_distribution=policy_act_distribution,
+    )
+    if not fused:
+        kwargs["policy_act_distribution_fused"] = False
+    var = get_apprfunc_dict("policy", **kwargs)
+    assert var["action_distribution_cls"] is expected[0 if fused else 1]
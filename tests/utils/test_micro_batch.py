@@ -0,0 +1,54 @@
+import torch
+from torch import nn
+
+from gops.utils.micro_batch import MicroBatchAccumulator
+
+"""
+    Gradient and statistics accumulated over micro batches are compared with those of
+    the whole batch.
+"""
+
+
+def loss_fn(data):
+    # model rollout of a policy, like model-based policy losses
+    obs, ret = data["obs"], 0
+    for step in range(5):
+        action = data["policy"](obs)
+        ret = ret + data["gamma"] ** step * (-(obs ** 2).sum(-1) - (action ** 2).sum(-1))
+        obs = torch.tanh(0.9 * obs + action)
+    loss = -ret.mean()
+    return loss, {"loss": loss, "ret_mean": ret.mean()}
+
+
+def compute(accumulator, data, policy):
+    policy.zero_grad()
+    info = accumulator.accumulate(data, loss_fn, key="policy")
+    return info, [p.grad.clone() for p in policy.parameters()]
+
+
+def test_micro_batch_matches_full_batch():
+    torch.manual_seed(0)
+    policy = nn.Sequential(nn.Linear(3, 16), nn.Tanh(), nn.Linear(16, 3))
+    data = {"obs": torch.randn(1000, 3), "policy": policy, "gamma": 0.9}
+
+    full_info, full_grad = compute(MicroBatchAccumulator(), data, policy)
+    # budget of a few kB gives micro batches of a few dozen samples after the probe
+    accumulator = MicroBatchAccumulator(memory_budget=0.01, probe_size=64)
+    for _ in range(2):
+        micro_info, micro_grad = compute(accumulator, data, policy)
+        for k in full_info:
+            assert torch.allclose(micro_info[k], full_info[k], rtol=1e-5, atol=1e-6)
+        for g_micro, g_full in zip(micro_grad, full_grad):
+            assert torch.allclose(g_micro, g_full, rtol=1e-4, atol=1e-6)
+    assert 1 <= accumulator._chunk_size("policy") < 64
+
+
+def test_statistics_without_backward():
+    torch.manual_seed(0)
+    policy = nn.Linear(3, 3)
+    data = {"obs": torch.randn(100, 3), "policy": policy, "gamma": 0.9}
+    info = MicroBatchAccumulator(memory_budget=0.001, probe_size=16).accumulate(
+        data, loss_fn, key="policy", backward=False
+    )
+    assert all(p.grad is None for p in policy.parameters())
+    assert torch.allclose(info["loss"], loss_fn(data)[0].detach(), rtol=1e-5)
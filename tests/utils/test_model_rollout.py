@@ -0,0 +1,71 @@
+import torch
+from torch import nn
+
+from gops.utils.model_rollout import RolloutCache
+
+"""
+    RolloutCache is checked to reuse a rollout for the same replay batch and policy
+    weights, and to recompute it when either changes or a graph is required.
+"""
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, obs, action, done, info):
+        self.calls += 1
+        next_obs = 0.9 * obs + action
+        reward = -(obs ** 2).sum(-1) - (action ** 2).sum(-1)
+        return next_obs, reward, done, info
+
+
+def create_batch():
+    return {"obs": torch.randn(8, 2), "done": torch.zeros(8, dtype=torch.bool)}
+
+
+def test_rollout_value():
+    torch.manual_seed(0)
+    policy, model, data = nn.Linear(2, 2), CountingModel(), create_batch()
+    rollout = RolloutCache().get(data, policy, model, 3, 0.9, create_graph=False)
+    o, ret = data["obs"], 0
+    with torch.no_grad():
+        for step in range(3):
+            a = policy(o)
+            ret = ret + 0.9 ** step * (-(o ** 2).sum(-1) - (a ** 2).sum(-1))
+            o = 0.9 * o + a
+    assert torch.allclose(rollout.ret, ret) and torch.allclose(rollout.last_obs, o)
+    assert rollout.constraints is None
+
+
+def test_hit_and_miss():
+    torch.manual_seed(0)
+    policy, model, data = nn.Linear(2, 2), CountingModel(), create_batch()
+    optimizer = torch.optim.SGD(policy.parameters(), lr=0.1)
+    cache = RolloutCache()
+
+    rollout = cache.get(data, policy, model, 3, 0.9, create_graph=True)
+    assert model.calls == 3
+    # the same batch and weights hit, with or without graph
+    assert cache.get(data, policy, model, 3, 0.9, create_graph=False) is rollout
+    assert cache.get(data, policy, model, 3, 0.9, create_graph=True) is rollout
+    assert model.calls == 3
+
+    # weight update changes parameter versions
+    (-rollout.ret.mean()).backward()
+    optimizer.step()
+    rollout = cache.get(data, policy, model, 3, 0.9, create_graph=False)
+    assert model.calls == 6
+    # rollout without graph is not reused for gradient
+    assert cache.get(data, policy, model, 3, 0.9, create_graph=True) is not rollout
+    assert model.calls == 9
+
+    # another batch, horizon or discount misses
+    cache.get(create_batch(), policy, model, 3, 0.9)
+    cache.get(data, policy, model, 2, 0.9)
+    cache.get(data, policy, model, 2, 0.8)
+    assert model.calls == 9 + 3 + 2 + 2
+
+    cache.clear()
+    cache.get(data, policy, model, 2, 0.8)
+    assert model.calls == 18
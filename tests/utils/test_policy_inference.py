@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+import torch
+from torch import nn
+
+from gops.apprfunc import mlp
+from gops.utils.act_distribution_type import DiracDistribution, TanhGaussDistribution
+from gops.utils.policy_inference import PolicyInference
+
+"""
+    Actions computed by PolicyInference from numpy observations are compared with
+    actions computed from the policy and its action distribution directly.
+"""
+
+OBS_DIM, ACT_DIM = 3, 2
+
+
+class Networks(nn.Module):
+    def __init__(self, policy: nn.Module):
+        super().__init__()
+        self.policy = policy
+
+    def create_action_distributions(self, logits):
+        return self.policy.get_act_dist(logits)
+
+
+def create_networks(stochastic: bool) -> Networks:
+    kwargs = dict(
+        obs_dim=OBS_DIM,
+        act_dim=ACT_DIM,
+        hidden_sizes=[16, 16],
+        hidden_activation="relu",
+        output_activation="linear",
+        act_high_lim=np.ones(ACT_DIM, dtype=np.float32),
+        act_low_lim=-np.ones(ACT_DIM, dtype=np.float32),
+        min_log_std=-20,
+        max_log_std=2,
+        std_type="mlp_shared",
+    )
+    torch.manual_seed(0)
+    if stochastic:
+        policy = mlp.StochaPolicy(action_distribution_cls=TanhGaussDistribution, **kwargs)
+    else:
+        policy = mlp.DetermPolicy(action_distribution_cls=DiracDistribution, **kwargs)
+    return Networks(policy)
+
+
+@pytest.mark.parametrize("stochastic", [False, True])
+def test_mode_action(stochastic):
+    networks = create_networks(stochastic)
+    inference = PolicyInference(networks)
+    # input buffer is reallocated for larger batches and reused for smaller ones
+    for batch_size in (1, 8, 3):
+        obs = np.random.randn(batch_size, OBS_DIM)
+        action, logp = inference.act(obs, "mode")
+        with torch.no_grad():
+            logits = networks.policy(torch.as_tensor(obs, dtype=torch.float32))
+            expected = networks.create_action_distributions(logits).mode().numpy()
+        assert logp is None
+        assert action.shape == (batch_size, ACT_DIM)
+        assert np.allclose(action, expected, atol=1e-6)
+
+
+@pytest.mark.parametrize("stochastic", [False, True])
+def test_sample_action(stochastic):
+    networks = create_networks(stochastic)
+    obs = np.random.randn(4, OBS_DIM)
+    torch.manual_seed(1)
+    action, logp = PolicyInference(networks).act(obs, "sample")
+    torch.manual_seed(1)
+    with torch.no_grad():
+        logits = networks.policy(torch.as_tensor(obs, dtype=torch.float32))
+        expected, expected_logp = networks.create_action_distributions(logits).sample()
+    assert np.allclose(action, expected.numpy(), atol=1e-6)
+    assert np.allclose(logp, expected_logp.numpy(), atol=1e-5)
+
+
+def test_inference_is_shared_per_networks():
+    networks = create_networks(False)
+    assert PolicyInference.of(networks) is PolicyInference.of(networks)
+    assert PolicyInference.of(networks) is not PolicyInference.of(create_networks(False))